@@ -0,0 +1,307 @@
+import discord
+import re
+import asyncio
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from discord.ext import commands
+from config import EMBED_COLOR
+from .core.dispatch import POKETWO_ID, get_dispatcher
+from .core.outbound import ALREADY_POSTED, DROPPED, QUEUED, get_post_queue
+
+DURATION_PATTERN = re.compile(r"(\d+)([mhd])")
+DURATION_UNITS = {'m': 'minutes', 'h': 'hours', 'd': 'days'}
+
+
+def parse_time_bound(text, now=None):
+    """Turn "6h", "2d", "90m" (that long ago) or an ISO date/time (UTC) into an aware datetime"""
+    now = now or datetime.now(timezone.utc)
+    match = DURATION_PATTERN.fullmatch(text.lower())
+    if match:
+        return now - timedelta(**{DURATION_UNITS[match.group(2)]: int(match.group(1))})
+
+    try:
+        bound = datetime.fromisoformat(text)
+    except ValueError:
+        raise ValueError(f"`{text}` isn't a duration like `6h`/`2d` or a date like `2025-10-01T12:00`")
+    return bound if bound.tzinfo else bound.replace(tzinfo=timezone.utc)
+
+
+class BackfillJob:
+    """One backfill run: scans channels oldest first, replaying Poketwo messages through the dispatcher"""
+
+    def __init__(self, guild_id, channel_windows, dispatcher, post_queue, db, batch_size=50, max_inflight=8, max_channels=2):
+        self.guild_id = guild_id
+        # [(channel, after, before)]; after is a datetime or a discord.Object checkpoint
+        self.channel_windows = channel_windows
+        self.dispatcher = dispatcher
+        self.post_queue = post_queue
+        self.db = db
+        self.batch_size = batch_size
+        self.max_inflight = max_inflight
+        self.channel_slots = asyncio.Semaphore(max_channels)
+        self.counts = Counter()
+        self.channel_counts = Counter()
+        self.started = time.monotonic()
+        self.finished = None
+        self.task = None
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.monotonic()) - self.started
+
+    def rate(self):
+        return self.counts['scanned'] / self.elapsed if self.elapsed else 0.0
+
+    async def save_checkpoint(self, channel, before, last_message_id, done=False, after=None):
+        if self.db is None:
+            return
+        checkpoint = {
+            "guild_id": self.guild_id,
+            "before": before,
+            "last_message_id": last_message_id,
+            "done": done,
+            "updated_at": datetime.utcnow()
+        }
+        if after is not None:
+            checkpoint["after"] = after
+        try:
+            await self.db.backfill_checkpoints.update_one({"_id": channel.id}, {"$set": checkpoint}, upsert=True)
+        except Exception as e:
+            print(f"Error saving backfill checkpoint for {channel.id}: {e}")
+
+    async def replay_batch(self, batch):
+        # Bounded concurrency within a batch; the batch finishes before its checkpoint is written
+        slots = asyncio.Semaphore(self.max_inflight)
+
+        async def replay(message):
+            async with slots:
+                try:
+                    # A post dropped by a full queue would be lost, as its checkpoint moves past it.
+                    # Replay only while half the queue is free, which also leaves room for live posts.
+                    await self.post_queue.wait_for_capacity(self.post_queue.max_pending // 2)
+                    message_class, result = await self.dispatcher.replay(message)
+                    self.counts[message_class or 'irrelevant'] += 1
+                    if result:
+                        self.counts[result] += 1
+                except Exception as e:
+                    print(f"Error replaying message {message.id}: {e}")
+                    self.counts['errors'] += 1
+
+        await asyncio.gather(*(replay(message) for message in batch))
+
+    async def scan_channel(self, channel, after, before):
+        async with self.channel_slots:
+            batch = []
+            last_message_id = None
+            if isinstance(after, datetime):
+                # A fresh window replaces whatever an earlier run left for this channel
+                await self.save_checkpoint(channel, before, None, after=after)
+            else:
+                last_message_id = after.id
+            async for message in channel.history(limit=None, after=after, before=before, oldest_first=True):
+                self.counts['scanned'] += 1
+                self.channel_counts[channel.id] += 1
+                last_message_id = message.id
+                if message.author.id == POKETWO_ID:
+                    self.counts['poketwo'] += 1
+                    batch.append(message)
+
+                if len(batch) >= self.batch_size:
+                    await self.replay_batch(batch)
+                    batch = []
+                    await self.save_checkpoint(channel, before, last_message_id)
+
+            if batch:
+                await self.replay_batch(batch)
+            await self.save_checkpoint(channel, before, last_message_id, done=True)
+
+    async def run(self):
+        try:
+            results = await asyncio.gather(
+                *(self.scan_channel(channel, after, before) for channel, after, before in self.channel_windows),
+                return_exceptions=True
+            )
+            for (channel, _, _), result in zip(self.channel_windows, results):
+                if isinstance(result, Exception):
+                    print(f"Error scanning #{channel}: {result}")
+                    self.counts['failed_channels'] += 1
+        finally:
+            self.finished = time.monotonic()
+
+    def create_embed(self):
+        status = "Running" if self.finished is None else ("Cancelled" if self.task and self.task.cancelled() else "Finished")
+        embed = discord.Embed(
+            title=f"🔁 Backfill {status}",
+            color=EMBED_COLOR,
+            timestamp=datetime.utcnow()
+        )
+        embed.add_field(
+            name="Progress",
+            value=f"Scanned: {self.counts['scanned']}\n"
+                  f"Pokétwo messages: {self.counts['poketwo']}\n"
+                  f"Throughput: {self.rate():.0f} msgs/s over {self.elapsed:.0f}s",
+            inline=True
+        )
+        embed.add_field(
+            name="Replayed",
+            value=f"Catches: {self.counts['catch']}\n"
+                  f"MissingNo.: {self.counts['missingno']}\n"
+                  f"Hatches: {self.counts['hatch']}\n"
+                  f"Boxes: {self.counts['box']}\n"
+                  f"Errors: {self.counts['errors']}",
+            inline=True
+        )
+        embed.add_field(
+            name="Starboard",
+            value=f"Posted: {self.counts[QUEUED]}\n"
+                  f"Already posted: {self.counts[ALREADY_POSTED]}\n"
+                  f"Dropped: {self.counts[DROPPED]}"
+                  + ("\nRun the same window again to post the dropped ones" if self.counts[DROPPED] else ""),
+            inline=True
+        )
+        embed.add_field(
+            name="Channels",
+            value="\n".join(
+                f"<#{channel.id}>: {self.channel_counts[channel.id]}" for channel, _, _ in self.channel_windows
+            )[:1024],
+            inline=False
+        )
+        return embed
+
+
+class Backfill(commands.Cog):
+    """Replays Poketwo channel history after an outage"""
+
+    # Seconds between progress message edits
+    PROGRESS_INTERVAL = 10
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.dispatcher = get_dispatcher(bot)
+        self.post_queue = get_post_queue(bot)
+        # guild_id -> that guild's current or last job; guilds backfill independently
+        self.jobs = {}
+
+    async def cog_unload(self):
+        for job in self.jobs.values():
+            if job.task:
+                job.task.cancel()
+
+    def running_job(self, guild_id):
+        job = self.jobs.get(guild_id)
+        return job if job and job.finished is None else None
+
+    @property
+    def db(self):
+        """Get database from main module"""
+        import __main__
+        return getattr(__main__, 'db', None)
+
+    async def run_job(self, ctx, job):
+        self.jobs[job.guild_id] = job
+        job.task = asyncio.create_task(job.run())
+        progress = await ctx.reply(embed=job.create_embed(), mention_author=False)
+
+        # Report throughput while the scan runs, then the final totals
+        while not job.task.done():
+            await asyncio.wait([job.task], timeout=self.PROGRESS_INTERVAL)
+            try:
+                await progress.edit(embed=job.create_embed())
+            except discord.HTTPException as e:
+                print(f"Error updating backfill progress: {e}")
+
+    @commands.group(name="backfill", invoke_without_command=True)
+    @commands.guild_only()
+    @commands.has_permissions(administrator=True)
+    async def backfill_group(self, ctx, channels: commands.Greedy[discord.TextChannel], since=None, until=None):
+        """Replay Poketwo messages from channels through the starboard, e.g. `backfill #spawns #eggs 6h`"""
+        if not channels or since is None:
+            await ctx.reply("❌ Usage: `backfill #channel [#channel...] <since> [until]`, e.g. `backfill #spawns 6h` "
+                            "or `backfill #spawns 2025-10-01T12:00 2025-10-01T18:00`\n"
+                            "Also: `backfill resume`, `backfill status`, `backfill cancel`")
+            return
+
+        if self.running_job(ctx.guild.id):
+            await ctx.reply("❌ A backfill is already running in this server. Use `backfill status` or `backfill cancel`.")
+            return
+
+        try:
+            after = parse_time_bound(since)
+            before = parse_time_bound(until) if until else datetime.now(timezone.utc)
+        except ValueError as e:
+            await ctx.reply(f"❌ {e}")
+            return
+
+        if after >= before:
+            await ctx.reply("❌ The start of the window must be before its end.")
+            return
+
+        job = BackfillJob(ctx.guild.id, [(channel, after, before) for channel in channels], self.dispatcher, self.post_queue, self.db)
+        await self.run_job(ctx, job)
+
+    @backfill_group.command(name="resume")
+    @commands.guild_only()
+    @commands.has_permissions(administrator=True)
+    async def backfill_resume(self, ctx):
+        """Pick up unfinished channels from their last checkpoint"""
+        if self.db is None:
+            await ctx.reply("Database not available")
+            return
+
+        if self.running_job(ctx.guild.id):
+            await ctx.reply("❌ A backfill is already running in this server. Use `backfill status` or `backfill cancel`.")
+            return
+
+        checkpoints = await self.db.backfill_checkpoints.find(
+            {"guild_id": ctx.guild.id, "done": False}
+        ).to_list(length=None)
+
+        channel_windows = []
+        for checkpoint in checkpoints:
+            channel = ctx.guild.get_channel(checkpoint["_id"])
+            if channel is None:
+                continue
+
+            # Continue after the last message a finished batch covered, or from the window's start
+            if checkpoint.get("last_message_id"):
+                after = discord.Object(id=checkpoint["last_message_id"])
+            elif checkpoint.get("after"):
+                after = checkpoint["after"].replace(tzinfo=timezone.utc)
+            else:
+                continue
+            channel_windows.append((channel, after, checkpoint["before"].replace(tzinfo=timezone.utc)))
+
+        if not channel_windows:
+            await ctx.reply("Nothing to resume.")
+            return
+
+        job = BackfillJob(ctx.guild.id, channel_windows, self.dispatcher, self.post_queue, self.db)
+        await self.run_job(ctx, job)
+
+    @backfill_group.command(name="status")
+    @commands.guild_only()
+    @commands.has_permissions(administrator=True)
+    async def backfill_status(self, ctx):
+        """Show this server's current or last backfill's progress"""
+        job = self.jobs.get(ctx.guild.id)
+        if job is None:
+            await ctx.reply("No backfill has run in this server since the bot started.")
+            return
+        await ctx.reply(embed=job.create_embed(), mention_author=False)
+
+    @backfill_group.command(name="cancel")
+    @commands.guild_only()
+    @commands.has_permissions(administrator=True)
+    async def backfill_cancel(self, ctx):
+        """Stop this server's running backfill; `backfill resume` continues from its checkpoints"""
+        job = self.running_job(ctx.guild.id)
+        if job is None:
+            await ctx.reply("No backfill is running in this server.")
+            return
+        job.task.cancel()
+        await ctx.reply("Backfill cancelled. Use `backfill resume` to continue from the last checkpoints.")
+
+
+async def setup(bot):
+    await bot.add_cog(Backfill(bot))
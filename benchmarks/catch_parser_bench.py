@@ -0,0 +1,116 @@
+"""Microbenchmark: Starboard.parse_poketwo_catch_message against the previous regex chain
+
+Run from the bot directory (so config.py is importable):
+    python benchmarks/catch_parser_bench.py [iterations]
+"""
+import importlib
+import json
+import os
+import re
+import sys
+import timeit
+
+COGS_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+# The cogs import their helpers from the core package, so they load as a package from the bot directory
+sys.path.insert(0, os.path.dirname(COGS_DIR))
+COGS_PACKAGE = os.path.basename(COGS_DIR)
+
+import discord
+from discord.ext import commands
+
+Starboard = importlib.import_module(f'{COGS_PACKAGE}.starboard').Starboard
+
+CORPUS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus', 'catch_messages.json')
+
+
+def legacy_parse_catch_message(message_content):
+    """The catch parser as it was before the single-pass rewrite, kept as the reference"""
+    catch_pattern = r"Congratulations <@!?(\d+)>! You caught a Level (\d+) (.+?)(?:\s+\((\d+\.?\d*)%\))?!"
+
+    match = re.search(catch_pattern, message_content)
+    if not match:
+        return None
+
+    user_id = match.group(1)
+    level = match.group(2)
+    pokemon_name_with_gender = match.group(3).strip()
+    iv_str = match.group(4)
+
+    if iv_str:
+        iv = iv_str
+    else:
+        iv = "Hidden"
+
+    gender = None
+    pokemon_name = pokemon_name_with_gender
+
+    if re.search(r'<:male:\d+>', message_content):
+        gender = 'male'
+        pokemon_name = re.sub(r'<:male:\d+>', '', pokemon_name_with_gender).strip()
+    elif re.search(r'<:female:\d+>', message_content):
+        gender = 'female'
+        pokemon_name = re.sub(r'<:female:\d+>', '', pokemon_name_with_gender).strip()
+    elif re.search(r'<:unknown:\d+>', message_content):
+        gender = 'unknown'
+        pokemon_name = re.sub(r'<:unknown:\d+>', '', pokemon_name_with_gender).strip()
+
+    is_shiny = "These colors seem unusual... ✨" in message_content
+    is_gigantamax = "Woah! It seems that this pokémon has the Gigantamax Factor..." in message_content
+
+    shiny_chain = None
+    chain_pattern = r"Shiny streak reset\. \(\*\*(\d+)\*\*\)"
+    chain_match = re.search(chain_pattern, message_content)
+    if chain_match:
+        shiny_chain = chain_match.group(1)
+
+    return {
+        'user_id': user_id,
+        'level': level,
+        'pokemon_name': pokemon_name,
+        'iv': iv,
+        'is_shiny': is_shiny,
+        'is_gigantamax': is_gigantamax,
+        'shiny_chain': shiny_chain,
+        'gender': gender,
+        'message_type': 'catch'
+    }
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    with open(CORPUS_FILE, 'r', encoding='utf-8') as f:
+        corpus = json.load(f)
+
+    cog = Starboard(commands.Bot(command_prefix='m!', intents=discord.Intents.none()))
+
+    mismatches = 0
+    for message_content in corpus:
+        expected = legacy_parse_catch_message(message_content)
+        actual = cog.parse_poketwo_catch_message(message_content)
+        if expected != actual:
+            mismatches += 1
+            print(f"MISMATCH: {message_content[:80]!r}\n  legacy: {expected}\n  current: {actual}")
+
+    def run_legacy():
+        for message_content in corpus:
+            legacy_parse_catch_message(message_content)
+
+    def run_current():
+        for message_content in corpus:
+            cog.parse_poketwo_catch_message(message_content)
+
+    parses = iterations * len(corpus)
+    legacy_seconds = min(timeit.repeat(run_legacy, number=iterations, repeat=3))
+    current_seconds = min(timeit.repeat(run_current, number=iterations, repeat=3))
+
+    print(f"Corpus: {len(corpus)} messages, {parses} parses per run, {mismatches} mismatches")
+    print(f"legacy:  {legacy_seconds / parses * 1e6:.2f} us/parse")
+    print(f"current: {current_seconds / parses * 1e6:.2f} us/parse")
+    print(f"speedup: {legacy_seconds / current_seconds:.2f}x")
+
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,419 @@
+"""Microbenchmark: template-based starboard embeds against the previous if/elif builders
+
+Builds every embed type for catches, MissingNo., hatches and unboxes, checks the rendered
+embeds match the old builders field for field, then times a burst of posts through each.
+
+Run from the bot directory (so config.py is importable):
+    python benchmarks/embed_bench.py [burst size]
+"""
+import asyncio
+import contextlib
+import importlib
+import io
+import os
+import sys
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+COGS_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+# The cogs import their helpers from the core package, so they load as a package from the bot directory
+sys.path.insert(0, os.path.dirname(COGS_DIR))
+COGS_PACKAGE = os.path.basename(COGS_DIR)
+
+import discord
+from discord.ext import commands
+
+from config import EMBED_COLOR
+Egg = importlib.import_module(f'{COGS_PACKAGE}.egg').Egg
+Starboard = importlib.import_module(f'{COGS_PACKAGE}.starboard').Starboard
+Unbox = importlib.import_module(f'{COGS_PACKAGE}.unbox').Unbox
+
+
+def legacy_create_catch_embed(cog, catch_data, embed_type, message=None):
+    """create_catch_embed as it was before the template table, kept as the reference"""
+    message_type = catch_data.get('message_type', 'catch')
+    pokemon_name = catch_data['pokemon_name']
+    level = catch_data['level']
+    iv = catch_data['iv']
+    is_shiny = catch_data['is_shiny']
+    is_gigantamax = catch_data['is_gigantamax']
+    gender = catch_data.get('gender')
+
+    # Format IV display
+    if iv == "Hidden":
+        iv_display = "Hidden"
+    elif iv == "???":
+        iv_display = "???"
+    else:
+        iv_display = f"{iv}%"
+
+    # Get gender emoji
+    gender_emoji = cog.get_gender_emoji(gender)
+
+    # Special handling for Eternatus with Gigantamax factor
+    display_pokemon_name = pokemon_name
+    if is_gigantamax and pokemon_name.lower() == "eternatus":
+        display_pokemon_name = "Eternamax Eternatus"
+    elif is_gigantamax:
+        display_pokemon_name = f"Gigantamax {pokemon_name}"
+
+    # Format Pokemon name with gender emoji - always include if we have gender info
+    if gender_emoji:
+        pokemon_display = f"{display_pokemon_name} {gender_emoji}"
+    else:
+        pokemon_display = display_pokemon_name
+
+    # Get Pokemon image URL with gender and Gigantamax support
+    image_url = cog.find_pokemon_image_url(pokemon_name, is_shiny, gender, is_gigantamax)
+
+    embed = discord.Embed(color=EMBED_COLOR, timestamp=datetime.utcnow())
+
+    if message_type == 'catch':
+        user_id = catch_data['user_id']
+        shiny_chain = catch_data.get('shiny_chain')
+
+        # Determine embed type and title based on all combinations
+        if embed_type == 'shiny_gigantamax_rare_iv_high':
+            # Triple combo - Shiny + Gigantamax + High IV
+            if pokemon_name.lower() == "eternatus":
+                embed.title = "✨ <:gigantamax:1420708122267226202> 📈 Shiny Eternamax High IV Catch Detected 📈 <:gigantamax:1420708122267226202> ✨"
+            else:
+                embed.title = "✨ <:gigantamax:1420708122267226202> 📈 Shiny Gmax High IV Catch Detected 📈 <:gigantamax:1420708122267226202> ✨"
+
+        elif embed_type == 'shiny_gigantamax_rare_iv_low':
+            # Triple combo - Shiny + Gigantamax + Low IV
+            if pokemon_name.lower() == "eternatus":
+                embed.title = "✨ <:gigantamax:1420708122267226202> 📉 Shiny Eternamax Low IV Catch Detected 📉 <:gigantamax:1420708122267226202> ✨"
+            else:
+                embed.title = "✨ <:gigantamax:1420708122267226202> 📉 Shiny Gmax Low IV Catch Detected 📉 <:gigantamax:1420708122267226202> ✨"
+
+        elif embed_type == 'shiny_gigantamax':
+            # Shiny + Gigantamax
+            if pokemon_name.lower() == "eternatus":
+                embed.title = "✨ <:gigantamax:1420708122267226202> Shiny Eternamax Catch Detected <:gigantamax:1420708122267226202> ✨"
+            else:
+                embed.title = "✨ <:gigantamax:1420708122267226202> Shiny Gigantamax Catch Detected <:gigantamax:1420708122267226202> ✨"
+
+        elif embed_type == 'shiny_rare_iv_high':
+            # Shiny + High IV
+            embed.title = "✨ 📈 Shiny High IV Catch Detected 📈 ✨"
+
+        elif embed_type == 'shiny_rare_iv_low':
+            # Shiny + Low IV
+            embed.title = "✨ 📉 Shiny Low IV Catch Detected 📉 ✨"
+
+        elif embed_type == 'gigantamax_rare_iv_high':
+            # Gigantamax + High IV
+            if pokemon_name.lower() == "eternatus":
+                embed.title = "<:gigantamax:1420708122267226202> 📈 Eternamax High IV Catch Detected 📈 <:gigantamax:1420708122267226202>"
+            else:
+                embed.title = "<:gigantamax:1420708122267226202> 📈 Gigantamax High IV Catch Detected 📈 <:gigantamax:1420708122267226202>"
+
+        elif embed_type == 'gigantamax_rare_iv_low':
+            # Gigantamax + Low IV
+            if pokemon_name.lower() == "eternatus":
+                embed.title = "<:gigantamax:1420708122267226202> 📉 Eternamax Low IV Catch Detected 📉 <:gigantamax:1420708122267226202>"
+            else:
+                embed.title = "<:gigantamax:1420708122267226202> 📉 Gigantamax Low IV Catch Detected 📉 <:gigantamax:1420708122267226202>"
+
+        elif embed_type == 'gigantamax':
+            # Gigantamax only
+            if pokemon_name.lower() == "eternatus":
+                embed.title = "<:gigantamax:1420708122267226202> Eternamax Catch Detected <:gigantamax:1420708122267226202>"
+            else:
+                embed.title = "<:gigantamax:1420708122267226202> Gigantamax Catch Detected <:gigantamax:1420708122267226202>"
+
+        elif embed_type == 'shiny':
+            # Shiny only
+            embed.title = "✨ Shiny Catch Detected ✨"
+
+        elif embed_type == 'iv_high':
+            # High IV only
+            embed.title = "📈 High IV Catch Detected 📈"
+
+        elif embed_type == 'iv_low':
+            # Low IV only
+            embed.title = "📉 Low IV Catch Detected 📉"
+
+        # Standard description for all catch types
+        embed.description = f"**Caught By:** <@{user_id}>\n**Pokémon:** {pokemon_display}\n**Level:** {level}\n**IV:** {iv_display}"
+        if shiny_chain:
+            embed.description += f"\n**Chain:** {shiny_chain}"
+
+    elif message_type == 'missingno':
+        user_id = catch_data['user_id']
+
+        # Handle shiny MissingNo.
+        if is_shiny:
+            embed.title = "✨ Shiny MissingNo. Detected ✨"
+        else:
+            embed.title = "<:missingno:1420713960465760357> MissingNo. Detected <:missingno:1420713960465760357>"
+
+        embed.description = f"**Caught By:** <@{user_id}>\n**Pokémon:** {pokemon_display}\n**Level:** ???\n**IV:** {iv_display}"
+
+    if image_url:
+        embed.set_thumbnail(url=image_url)
+
+    # Create view with jump to message button
+    view = discord.ui.View()
+    if message:
+        jump_button = discord.ui.Button(
+            label="Jump to Message",
+            url=message.jump_url,
+            emoji="🔗",
+            style=discord.ButtonStyle.link
+        )
+        view.add_item(jump_button)
+
+    return embed, view
+
+
+def legacy_create_hatch_embed(cog, hatch_data, embed_type, message=None):
+    """create_hatch_embed as it was before the template table, kept as the reference"""
+    pokemon_name = hatch_data['pokemon_name']
+    level = hatch_data['level']
+    iv = hatch_data['iv']
+    is_shiny = hatch_data['is_shiny']
+    is_gigantamax = hatch_data['is_gigantamax']
+    gender = hatch_data.get('gender')
+    hatched_by_id = hatch_data.get('hatched_by_id')
+
+    # Format IV display
+    if iv == "Hidden":
+        iv_display = "Hidden"
+    else:
+        iv_display = f"{iv}%"
+
+    # Get gender emoji
+    gender_emoji = cog.get_gender_emoji(gender)
+
+    # Format Pokemon name with gender emoji - always include if we have gender info
+    if gender_emoji:
+        pokemon_display = f"{pokemon_name} {gender_emoji}"
+    else:
+        pokemon_display = pokemon_name
+
+    # Debug print to help troubleshoot
+    print(f"DEBUG: Creating hatch embed - Pokemon: '{pokemon_name}', Gender: '{gender}', Type: '{embed_type}'")
+
+    # Get Pokemon image URL with gender and Gigantamax support
+    image_url = cog.find_pokemon_image_url(pokemon_name, is_shiny, gender, is_gigantamax)
+
+    embed = discord.Embed(color=EMBED_COLOR, timestamp=datetime.utcnow())
+
+    # Base description builder
+    base_description = f"**Pokémon:** {pokemon_display}\n**Level:** {level}\n**IV:** {iv_display}"
+    if hatched_by_id:
+        description = f"**Hatched By:** <@{hatched_by_id}>\n{base_description}"
+    else:
+        description = base_description
+
+    # Set title and description based on embed type
+    embed_titles = {
+        'shiny_gmax_high_iv': "<:egg:1427226230352117825><:gigantamax:1420708122267226202> ✨ 📈 Ultimate Hatch - Shiny Gigantamax High IV! 📈 ✨ <:gigantamax:1420708122267226202><:egg:1427226230352117825>",
+        'shiny_gmax_low_iv': "<:egg:1427226230352117825><:gigantamax:1420708122267226202> ✨ 📉 Ultimate Hatch - Shiny Gigantamax Low IV! 📉 ✨ <:gigantamax:1420708122267226202><:egg:1427226230352117825>",
+        'shiny_gmax': "<:egg:1427226230352117825><:gigantamax:1420708122267226202> ✨ Gigantamax Sparkling Hatch Detected ✨ <:gigantamax:1420708122267226202><:egg:1427226230352117825>",
+        'shiny_high_iv': "<:egg:1427226230352117825>✨ 📈 Sparkling High IV Hatch Detected 📈 ✨<:egg:1427226230352117825>",
+        'shiny_low_iv': "<:egg:1427226230352117825>✨ 📉 Sparkling Low IV Hatch Detected 📉 ✨<:egg:1427226230352117825>",
+        'gmax_high_iv': "<:egg:1427226230352117825><:gigantamax:1420708122267226202> 📈 Gigantamax High IV Hatch Detected 📈 <:gigantamax:1420708122267226202><:egg:1427226230352117825>",
+        'gmax_low_iv': "<:egg:1427226230352117825><:gigantamax:1420708122267226202> 📉 Gigantamax Low IV Hatch Detected 📉 <:gigantamax:1420708122267226202><:egg:1427226230352117825>",
+        'gigantamax': "<:egg:1427226230352117825><:gigantamax:1420708122267226202> Gigantamax Hatch Detected <:gigantamax:1420708122267226202><:egg:1427226230352117825>",
+        'shiny': "<:egg:1427226230352117825>✨ Sparkling Hatch Detected ✨<:egg:1427226230352117825>",
+        'iv_high': "<:egg:1427226230352117825>📈 Rare IV Hatch Detected 📈<:egg:1427226230352117825>",
+        'iv_low': "<:egg:1427226230352117825>📉 Rare IV Hatch Detected 📉<:egg:1427226230352117825>"
+    }
+
+    embed.title = embed_titles.get(embed_type, "Rare Hatch Detected")
+    embed.description = description
+
+    if image_url:
+        embed.set_thumbnail(url=image_url)
+
+    # Create view with jump to message button
+    view = discord.ui.View()
+    if message:
+        jump_button = discord.ui.Button(
+            label="Jump to Message",
+            url=message.jump_url,
+            emoji="🔗",
+            style=discord.ButtonStyle.link
+        )
+        view.add_item(jump_button)
+
+    return embed, view
+
+
+def legacy_create_unbox_embed(cog, pokemon_data, embed_type, message=None):
+    """create_unbox_embed as it was before the template table, kept as the reference"""
+    pokemon_name = pokemon_data['pokemon_name']
+    level = pokemon_data['level']
+    iv = pokemon_data['iv']
+    is_shiny = pokemon_data['is_shiny']
+    is_gigantamax = pokemon_data['is_gigantamax']
+    gender = pokemon_data.get('gender')
+    unboxed_by_id = pokemon_data.get('unboxed_by_id')
+
+    # Format IV display
+    iv_display = f"{iv}%"
+
+    # Get gender emoji
+    gender_emoji = cog.get_gender_emoji(gender)
+
+    # Format Pokemon name with gender emoji - always include if we have gender info
+    if gender_emoji:
+        pokemon_display = f"{pokemon_name} {gender_emoji}"
+    else:
+        pokemon_display = pokemon_name
+
+    # Debug print to help troubleshoot
+    print(f"DEBUG: Creating unbox embed - Pokemon: '{pokemon_name}', Gender: '{gender}', Gender Emoji: '{gender_emoji}', Display: '{pokemon_display}'")
+
+    # Get Pokemon image URL with gender and Gigantamax support
+    image_url = cog.find_pokemon_image_url(pokemon_name, is_shiny, gender, is_gigantamax)
+
+    embed = discord.Embed(color=EMBED_COLOR, timestamp=datetime.utcnow())
+
+    if embed_type == 'gigantamax_shiny':
+        embed.title = "<:gigantamax:1420708122267226202> ✨ Gigantamax Shiny Unbox Detected ✨ <:gigantamax:1420708122267226202>"
+    elif embed_type == 'gigantamax':
+        embed.title = "<:gigantamax:1420708122267226202> Gigantamax Unbox Detected <:gigantamax:1420708122267226202>"
+    elif embed_type == 'shiny':
+        embed.title = "<a:animatedgiftbox:1421047436625055754>  ✨ Shiny Unbox Detected ✨ <a:animatedgiftbox:1421047436625055754> "
+    elif embed_type == 'iv_high':
+        embed.title = "<:giftbox:1421047453511323658> 📈 High IV Unboxed 📈 <:giftbox:1421047453511323658>"
+    elif embed_type == 'iv_low':
+        embed.title = "<:giftbox:1421047453511323658> 📉 Low IV Unboxed 📉 <:giftbox:1421047453511323658>"
+
+    # Build description
+    base_description = f"**Pokémon:** {pokemon_display}\n**Level:** {level}\n**IV:** {iv_display}"
+    if unboxed_by_id:
+        embed.description = f"**Unboxed By:** <@{unboxed_by_id}>\n{base_description}"
+    else:
+        embed.description = base_description
+
+    if image_url:
+        embed.set_thumbnail(url=image_url)
+
+    # Create view with jump to message button
+    view = discord.ui.View()
+    if message:
+        jump_button = discord.ui.Button(
+            label="Jump to Message",
+            url=message.jump_url,
+            emoji="🔗",
+            style=discord.ButtonStyle.link
+        )
+        view.add_item(jump_button)
+
+    return embed, view
+
+
+def legacy_cog(cog):
+    """Stand-in for a cog as the old builders saw it: every sprite lookup goes to the index"""
+    return SimpleNamespace(
+        get_gender_emoji=cog.get_gender_emoji,
+        find_pokemon_image_url=lambda *args: cog.sprites.index._find(*args)
+    )
+
+
+def build_cases(starboard, egg, unbox):
+    """(label, legacy builder, current builder, legacy cog, event data, embed type, message) for every embed type"""
+    message = SimpleNamespace(jump_url="https://discord.com/channels/1/2/3")
+    legacy_starboard, legacy_egg, legacy_unbox = legacy_cog(starboard), legacy_cog(egg), legacy_cog(unbox)
+    cases = []
+
+    for pokemon_name in ("Pikachu", "Eternatus"):
+        for is_shiny in (False, True):
+            for is_gigantamax in (False, True):
+                for iv, shiny_chain in (("95.16", None), ("4.30", "12"), ("50.00", None), ("Hidden", None)):
+                    catch_data = {
+                        'user_id': '123', 'level': '35', 'pokemon_name': pokemon_name, 'iv': iv,
+                        'is_shiny': is_shiny, 'is_gigantamax': is_gigantamax, 'shiny_chain': shiny_chain,
+                        'gender': 'female', 'message_type': 'catch'
+                    }
+                    embed_type = starboard.determine_embed_type(catch_data)
+                    if embed_type:
+                        cases.append(('catch', legacy_create_catch_embed, starboard.create_catch_embed, legacy_starboard, catch_data, embed_type, message))
+
+    for is_shiny in (False, True):
+        missingno_data = {
+            'user_id': '123', 'level': '???', 'pokemon_name': 'MissingNo.', 'iv': '???',
+            'is_shiny': is_shiny, 'is_gigantamax': False, 'gender': None, 'message_type': 'missingno'
+        }
+        cases.append(('missingno', legacy_create_catch_embed, starboard.create_catch_embed, legacy_starboard, missingno_data, 'missingno', message))
+
+    for is_shiny in (False, True):
+        for is_gigantamax in (False, True):
+            for iv in (97.85, 3.12, 50.0):
+                for hatched_by_id in (None, 456):
+                    hatch_data = {
+                        'pokemon_name': 'Charmander', 'level': '1', 'iv': iv, 'is_shiny': is_shiny,
+                        'is_gigantamax': is_gigantamax, 'gender': 'male', 'hatched_by_id': hatched_by_id,
+                        'message_type': 'hatch'
+                    }
+                    embed_type = egg.determine_embed_type(hatch_data)
+                    if embed_type:
+                        cases.append(('hatch', legacy_create_hatch_embed, egg.create_hatch_embed, legacy_egg, hatch_data, embed_type, message))
+
+                    pokemon_data = {
+                        'pokemon_name': 'Bulbasaur', 'level': '20', 'iv': iv, 'is_shiny': is_shiny,
+                        'is_gigantamax': is_gigantamax, 'gender': 'unknown', 'unboxed_by_id': hatched_by_id,
+                        'message_type': 'unbox'
+                    }
+                    for embed_type in unbox.determine_embed_types(pokemon_data):
+                        cases.append(('unbox', legacy_create_unbox_embed, unbox.create_unbox_embed, legacy_unbox, pokemon_data, embed_type, message))
+
+    return cases
+
+
+def comparable(embed, view):
+    embed_dict = embed.to_dict()
+    embed_dict.pop('timestamp', None)
+    buttons = [(item.label, item.url, str(item.emoji), item.style) for item in view.children]
+    return embed_dict, buttons
+
+
+async def main():
+    burst = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+
+    bot = commands.Bot(command_prefix='m!', intents=discord.Intents.none())
+    starboard, egg, unbox = Starboard(bot), Egg(bot), Unbox(bot)
+    cases = build_cases(starboard, egg, unbox)
+
+    # The hatch and unbox builders print debug lines; keep them out of the results
+    with contextlib.redirect_stdout(io.StringIO()):
+        mismatches = []
+        for label, legacy, current, cog, data, embed_type, message in cases:
+            expected = comparable(*legacy(cog, data, embed_type, message))
+            actual = comparable(*current(data, embed_type, message))
+            if expected != actual:
+                mismatches.append((label, embed_type, expected, actual))
+
+        # Alternate the two builders between rounds so neither gets a warmer cache; keep the best round
+        builders = {
+            'legacy': [lambda case=case: case[1](case[3], case[4], case[5], case[6]) for case in cases],
+            'current': [lambda case=case: case[2](case[4], case[5], case[6]) for case in cases]
+        }
+        timings = {}
+        for _ in range(5):
+            for name, name_builders in builders.items():
+                start = time.perf_counter()
+                for i in range(burst):
+                    name_builders[i % len(name_builders)]()
+                elapsed = time.perf_counter() - start
+                timings[name] = min(timings.get(name, elapsed), elapsed)
+
+    for label, embed_type, expected, actual in mismatches:
+        print(f"MISMATCH {label}/{embed_type}:\n  legacy: {expected}\n  current: {actual}")
+
+    print(f"Cases: {len(cases)} embed variants, burst of {burst} embeds, {len(mismatches)} mismatches")
+    for name, seconds in timings.items():
+        print(f"{name + ':':8} {seconds / burst * 1e6:.2f} us/embed, {burst / seconds:,.0f} embeds/s")
+    print(f"speedup: {timings['legacy'] / timings['current']:.2f}x")
+
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,120 @@
+"""Stub Discord gateway and REST API for offline benchmarks
+
+A real commands.Bot is given guilds, channels and members through the same ConnectionState
+parsers the gateway feeds, so messages reach listeners and commands exactly as in production.
+REST calls never leave the process: each one is recorded, answered with a plausible payload
+after an optional simulated round trip, and sent messages are kept so fetch_message works.
+"""
+import asyncio
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+import discord
+from discord.ext import commands
+
+POKETWO = {'id': '716390085896962058', 'username': 'Pokétwo', 'discriminator': '8236', 'avatar': None, 'bot': True}
+TIMESTAMP = '2026-01-01T00:00:00+00:00'
+
+
+def user_payload(user_id, name=None, bot=False):
+    return {'id': str(user_id), 'username': name or f"user{user_id}", 'discriminator': '0', 'avatar': None, 'bot': bot}
+
+
+class FakeGateway:
+    """Drives a bot offline; http_latency is the simulated REST round trip in seconds"""
+
+    def __init__(self, command_prefix='!', http_latency=0.0):
+        self.bot = commands.Bot(command_prefix=command_prefix, intents=discord.Intents.all())
+        self.state = self.bot._connection
+        self.http_latency = http_latency
+        self.me = user_payload(1, 'starboard', bot=True)
+        self.http_calls = Counter()
+        # message_id -> payload, for everything dispatched or sent
+        self.messages = {}
+        # (channel_id, payload, monotonic time) for every message the bot sent
+        self.sent = []
+        self._last_id = 0
+
+    async def start(self):
+        await self.bot._async_setup_hook()
+        self.state.user = discord.ClientUser(state=self.state, data=self.me)
+        self.bot.http.request = self._request
+
+    def next_id(self):
+        # Snowflakes that sort by time, like Discord's, and never repeat
+        self._last_id = max(self._last_id + 1, discord.utils.time_snowflake(datetime.now(timezone.utc)))
+        return self._last_id
+
+    def add_guild(self, guild_id, channel_ids, member_ids):
+        """Create a guild as GUILD_CREATE would, with the bot and Poketwo as members"""
+        everyone = {'id': str(guild_id), 'name': '@everyone', 'permissions': str(discord.Permissions.all().value),
+                    'position': 0, 'color': 0, 'hoist': False, 'managed': False, 'mentionable': False}
+        members = [self.me, POKETWO] + [user_payload(member_id) for member_id in member_ids]
+        self.state.parse_guild_create({
+            'id': str(guild_id), 'name': f"guild{guild_id}", 'owner_id': str(member_ids[0] if member_ids else 1),
+            'roles': [everyone],
+            'channels': [{'id': str(channel_id), 'type': 0, 'name': f"channel{channel_id}", 'position': index,
+                          'permission_overwrites': []} for index, channel_id in enumerate(channel_ids)],
+            'members': [{'user': user, 'roles': [], 'joined_at': TIMESTAMP, 'deaf': False, 'mute': False, 'flags': 0}
+                        for user in members],
+            'emojis': [], 'stickers': [], 'features': [], 'member_count': len(members),
+            'large': False, 'unavailable': False,
+        })
+
+    def dispatch_message(self, guild_id, channel_id, author, content='', embeds=None, reference=None,
+                         include_referenced=True):
+        """Feed a MESSAGE_CREATE through the state, as the gateway would; returns the message ID"""
+        message_id = self.next_id()
+        payload = {
+            'id': str(message_id), 'channel_id': str(channel_id), 'guild_id': str(guild_id),
+            'author': author, 'content': content, 'embeds': embeds or [],
+            'attachments': [], 'mentions': [], 'mention_roles': [], 'pinned': False, 'mention_everyone': False,
+            'tts': False, 'timestamp': TIMESTAMP, 'edited_timestamp': None, 'type': 0, 'flags': 0,
+        }
+        if not author.get('bot'):
+            payload['member'] = {'roles': [], 'joined_at': TIMESTAMP, 'deaf': False, 'mute': False, 'flags': 0}
+        if reference is not None:
+            payload['message_reference'] = {'message_id': str(reference), 'channel_id': str(channel_id),
+                                            'guild_id': str(guild_id)}
+            if include_referenced and reference in self.messages:
+                payload['referenced_message'] = self.messages[reference]
+            payload['type'] = 19
+        self.messages[message_id] = payload
+        self.state.parse_message_create(payload)
+        return message_id
+
+    async def _request(self, route, **kwargs):
+        self.http_calls[f"{route.method} {route.path}"] += 1
+        if self.http_latency:
+            await asyncio.sleep(self.http_latency)
+
+        if route.method == 'POST' and route.path == '/channels/{channel_id}/messages':
+            payload = kwargs.get('json') or {}
+            self.sent.append((route.channel_id, payload, time.monotonic()))
+            message_id = self.next_id()
+            message = {
+                'id': str(message_id), 'channel_id': str(route.channel_id), 'author': self.me,
+                'content': payload.get('content') or '', 'embeds': payload.get('embeds') or [],
+                'components': [], 'attachments': [], 'mentions': [], 'mention_roles': [], 'pinned': False,
+                'mention_everyone': False, 'tts': False, 'timestamp': TIMESTAMP, 'edited_timestamp': None,
+                'type': 0, 'flags': 0,
+            }
+            self.messages[message_id] = message
+            return message
+
+        if route.method == 'GET' and route.path == '/channels/{channel_id}/messages/{message_id}':
+            message = self.messages.get(int(route.message_id))
+            if message is None:
+                raise discord.NotFound(FakeResponse(404), {'message': 'Unknown Message', 'code': 10008})
+            return message
+
+        return {}
+
+
+class FakeResponse:
+    """Just enough of an aiohttp response for discord.HTTPException"""
+
+    def __init__(self, status):
+        self.status = status
+        self.reason = 'Not Found' if status == 404 else ''
@@ -0,0 +1,492 @@
+"""In-memory stand-in for the Motor database the cogs use, for offline benchmarks
+
+Covers the calls the bot makes: find_one, find (sort/skip/limit/to_list/async for/explain),
+insert_one/many, update_one/many, replace_one, delete_one/many, find_one_and_update,
+count_documents, create_index and simple aggregate pipelines, with the query and update
+operators the cogs use.
+Every call is counted per collection and can be given a simulated round trip.
+"""
+import asyncio
+import copy
+import re
+from collections import Counter
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+MISSING = object()
+
+
+def get_path(document, path):
+    value = document
+    for part in path.split('.'):
+        if isinstance(value, dict) and part in value:
+            value = value[part]
+        else:
+            return MISSING
+    return value
+
+
+def set_path(document, path, value):
+    parts = path.split('.')
+    for part in parts[:-1]:
+        document = document.setdefault(part, {})
+    document[parts[-1]] = value
+
+
+def unset_path(document, path):
+    parts = path.split('.')
+    for part in parts[:-1]:
+        document = document.get(part)
+        if not isinstance(document, dict):
+            return
+    document.pop(parts[-1], None)
+
+
+def compare(value, operator, operand):
+    if operator == '$eq':
+        if operand is None:
+            # null matches missing fields too
+            return value is None or value is MISSING
+        return value == operand or (isinstance(value, list) and operand in value)
+    if operator == '$ne':
+        return not compare(value, '$eq', operand)
+    if operator == '$in':
+        return any(compare(value, '$eq', candidate) for candidate in operand)
+    if operator == '$nin':
+        return not compare(value, '$in', operand)
+    if operator == '$all':
+        return all(compare(value, '$eq', candidate) for candidate in operand)
+    if operator == '$exists':
+        return (value is not MISSING) == bool(operand)
+    if operator == '$regex':
+        return isinstance(value, str) and re.search(operand, value) is not None
+    if value is MISSING or value is None:
+        return False
+    try:
+        if operator == '$gt':
+            return value > operand
+        if operator == '$gte':
+            return value >= operand
+        if operator == '$lt':
+            return value < operand
+        if operator == '$lte':
+            return value <= operand
+    except TypeError:
+        return False
+    raise NotImplementedError(f"query operator {operator}")
+
+
+def matches(document, query):
+    for key, condition in query.items():
+        if key == '$or':
+            if not any(matches(document, clause) for clause in condition):
+                return False
+        elif key == '$and':
+            if not all(matches(document, clause) for clause in condition):
+                return False
+        else:
+            value = get_path(document, key)
+            if isinstance(condition, dict) and condition and all(op.startswith('$') for op in condition):
+                flags = re.IGNORECASE if 'i' in condition.get('$options', '') else 0
+                for operator, operand in condition.items():
+                    if operator == '$options':
+                        continue
+                    if operator == '$regex':
+                        operand = re.compile(operand, flags)
+                    if not compare(value, operator, operand):
+                        return False
+            elif isinstance(condition, re.Pattern):
+                if not isinstance(value, str) or not condition.search(value):
+                    return False
+            elif not compare(value, '$eq', condition):
+                return False
+    return True
+
+
+def project(document, projection):
+    if not projection:
+        return copy.deepcopy(document)
+
+    slices = {key: spec['$slice'] for key, spec in projection.items() if isinstance(spec, dict) and '$slice' in spec}
+    flags = {key: spec for key, spec in projection.items() if key not in slices}
+    included = [key for key, spec in flags.items() if spec and key != '_id']
+
+    if included:
+        result = {}
+        for key in included:
+            value = get_path(document, key)
+            if value is not MISSING:
+                set_path(result, key, copy.deepcopy(value))
+        for key in slices:
+            value = get_path(document, key)
+            if value is not MISSING:
+                set_path(result, key, copy.deepcopy(value))
+    else:
+        result = copy.deepcopy(document)
+        for key, spec in flags.items():
+            if not spec:
+                unset_path(result, key)
+
+    if flags.get('_id', 1) and '_id' in document:
+        result['_id'] = document['_id']
+    elif not flags.get('_id', 1):
+        result.pop('_id', None)
+
+    for key, spec in slices.items():
+        value = get_path(result, key)
+        if isinstance(value, list):
+            if isinstance(spec, list):
+                skip, limit = spec
+                value = value[skip:][:limit]
+            else:
+                value = value[:spec] if spec >= 0 else value[spec:]
+            set_path(result, key, value)
+    return result
+
+
+def apply_update(document, update, inserting=False):
+    if not any(key.startswith('$') for key in update):
+        raise ValueError("update only works with $ operators; use replace_one")
+    for operator, fields in update.items():
+        for path, value in fields.items():
+            if operator == '$set':
+                set_path(document, path, copy.deepcopy(value))
+            elif operator == '$setOnInsert':
+                if inserting:
+                    set_path(document, path, copy.deepcopy(value))
+            elif operator == '$unset':
+                unset_path(document, path)
+            elif operator == '$inc':
+                current = get_path(document, path)
+                set_path(document, path, (0 if current is MISSING else current) + value)
+            elif operator == '$max':
+                current = get_path(document, path)
+                set_path(document, path, value if current is MISSING else max(current, value))
+            elif operator == '$push':
+                current = get_path(document, path)
+                items = value['$each'] if isinstance(value, dict) and '$each' in value else [value]
+                set_path(document, path, ([] if current is MISSING else current) + copy.deepcopy(items))
+            else:
+                raise NotImplementedError(f"update operator {operator}")
+
+
+def sort_key(keys):
+    def key(document):
+        parts = []
+        for field, direction in keys:
+            value = get_path(document, field)
+            # MongoDB orders missing and null values before everything else
+            rank = (0, 0) if value is MISSING or value is None else (1, value)
+            parts.append(Reverse(rank) if direction < 0 else rank)
+        return parts
+    return key
+
+
+class Reverse:
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+
+def normalize_keys(keys, direction=1):
+    if isinstance(keys, str):
+        return [(keys, direction)]
+    return list(keys)
+
+
+class FakeCursor:
+    def __init__(self, collection, query, projection):
+        self.collection = collection
+        self.query = query
+        self.projection = projection
+        self._sort = None
+        self._skip = 0
+        self._limit = 0
+
+    def sort(self, keys, direction=1):
+        self._sort = normalize_keys(keys, direction)
+        return self
+
+    def skip(self, count):
+        self._skip = count
+        return self
+
+    def limit(self, count):
+        self._limit = count
+        return self
+
+    def _results(self):
+        self.collection.stats['documents_scanned'] += len(self.collection.documents)
+        documents = [document for document in self.collection.documents.values() if matches(document, self.query)]
+        if self._sort:
+            documents.sort(key=sort_key(self._sort))
+        documents = documents[self._skip:]
+        if self._limit:
+            documents = documents[:self._limit]
+        return [project(document, self.projection) for document in documents]
+
+    async def to_list(self, length=None):
+        await self.collection.round_trip('find')
+        results = self._results()
+        return results if length is None else results[:length]
+
+    async def explain(self):
+        """A plan in the server's shape: an index scan when an index's leading field is queried"""
+        await self.collection.round_trip('explain')
+        for fields in self.collection.indexes:
+            if fields[0] in self.query:
+                scan = {'stage': 'IXSCAN', 'keyPattern': {field: 1 for field in fields}}
+                return {'queryPlanner': {'winningPlan': {'stage': 'FETCH', 'inputStage': scan}}}
+        return {'queryPlanner': {'winningPlan': {'stage': 'COLLSCAN', 'filter': self.query}}}
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        await self.collection.round_trip('find')
+        for document in self._results():
+            yield document
+
+
+def evaluate(document, expression):
+    """The aggregation expressions the cogs use: field paths, $literal, $size and $setIntersection"""
+    if isinstance(expression, str) and expression.startswith('$'):
+        value = get_path(document, expression[1:])
+        return None if value is MISSING else value
+    if isinstance(expression, dict) and len(expression) == 1:
+        operator, operand = next(iter(expression.items()))
+        if operator == '$literal':
+            return operand
+        if operator == '$size':
+            return len(evaluate(document, operand))
+        if operator == '$setIntersection':
+            first, *others = [evaluate(document, item) or [] for item in operand]
+            return [value for index, value in enumerate(first)
+                    if value not in first[:index] and all(value in other for other in others)]
+        raise NotImplementedError(f"expression operator {operator}")
+    if isinstance(expression, list):
+        return [evaluate(document, item) for item in expression]
+    return expression
+
+
+class FakeAggregateCursor:
+    def __init__(self, collection, pipeline):
+        self.collection = collection
+        self.pipeline = pipeline
+
+    def _results(self):
+        self.collection.stats['documents_scanned'] += len(self.collection.documents)
+        documents = [copy.deepcopy(document) for document in self.collection.documents.values()]
+        for stage in self.pipeline:
+            (operator, spec), = stage.items()
+            if operator == '$match':
+                documents = [document for document in documents if matches(document, spec)]
+            elif operator == '$addFields':
+                for document in documents:
+                    for field, expression in spec.items():
+                        set_path(document, field, evaluate(document, expression))
+            elif operator == '$sort':
+                documents.sort(key=sort_key(list(spec.items())))
+            elif operator == '$skip':
+                documents = documents[spec:]
+            elif operator == '$limit':
+                documents = documents[:spec]
+            elif operator == '$project':
+                documents = [project(document, spec) for document in documents]
+            else:
+                raise NotImplementedError(f"pipeline stage {operator}")
+        return documents
+
+    async def to_list(self, length=None):
+        await self.collection.round_trip('aggregate')
+        results = self._results()
+        return results if length is None else results[:length]
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        await self.collection.round_trip('aggregate')
+        for document in self._results():
+            yield document
+
+
+class FakeCollection:
+    def __init__(self, database, name):
+        self.database = database
+        self.name = name
+        self.documents = {}
+        self.indexes = [['_id']]
+        self.unique_indexes = []
+        self.stats = Counter()
+
+    async def round_trip(self, operation):
+        self.stats[operation] += 1
+        self.database.calls[f"{self.name}.{operation}"] += 1
+        if self.database.latency:
+            await asyncio.sleep(self.database.latency)
+
+    def _matching(self, query):
+        self.stats['documents_scanned'] += len(self.documents)
+        return [document for document in self.documents.values() if matches(document, query)]
+
+    def _check_unique(self, document, replacing=None):
+        if document['_id'] in self.documents and self.documents[document['_id']] is not replacing:
+            raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} _id: {document['_id']!r}")
+        for fields in self.unique_indexes:
+            values = [get_path(document, field) for field in fields]
+            for other in self.documents.values():
+                if other is not replacing and other is not document and [get_path(other, field) for field in fields] == values:
+                    raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} index: {fields}")
+
+    def _insert(self, document):
+        document = copy.deepcopy(document)
+        document.setdefault('_id', ObjectId())
+        self._check_unique(document)
+        self.documents[document['_id']] = document
+        return document
+
+    def _upsert(self, query, update=None, replacement=None):
+        document = {key: value for key, value in query.items()
+                    if not key.startswith('$') and not (isinstance(value, dict) and any(op.startswith('$') for op in value))}
+        if replacement is not None:
+            document = {'_id': document.get('_id', ObjectId()), **copy.deepcopy(replacement)}
+        else:
+            apply_update(document, update, inserting=True)
+        return self._insert(document)
+
+    async def create_index(self, keys, unique=False, **kwargs):
+        await self.round_trip('create_index')
+        fields = [field for field, _ in normalize_keys(keys)]
+        if unique and fields not in self.unique_indexes:
+            seen = set()
+            for document in self.documents.values():
+                values = repr([get_path(document, field) for field in fields])
+                if values in seen:
+                    raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} index: {fields}")
+                seen.add(values)
+            self.unique_indexes.append(fields)
+        if fields not in self.indexes:
+            self.indexes.append(fields)
+        return kwargs.get('name') or '_'.join(f"{field}_1" for field in fields)
+
+    async def find_one(self, query=None, projection=None, sort=None):
+        await self.round_trip('find_one')
+        documents = self._matching(query or {})
+        if sort:
+            documents.sort(key=sort_key(normalize_keys(sort)))
+        return project(documents[0], projection) if documents else None
+
+    def find(self, query=None, projection=None):
+        return FakeCursor(self, query or {}, projection)
+
+    def aggregate(self, pipeline):
+        return FakeAggregateCursor(self, pipeline)
+
+    async def count_documents(self, query):
+        await self.round_trip('count_documents')
+        return len(self._matching(query))
+
+    async def insert_one(self, document):
+        await self.round_trip('insert_one')
+        inserted = self._insert(document)
+        document.setdefault('_id', inserted['_id'])
+
+    async def insert_many(self, documents, ordered=True):
+        await self.round_trip('insert_many')
+        errors = []
+        for index, document in enumerate(documents):
+            try:
+                inserted = self._insert(document)
+                document.setdefault('_id', inserted['_id'])
+            except DuplicateKeyError as e:
+                errors.append({'index': index, 'code': 11000, 'errmsg': str(e)})
+                if ordered:
+                    break
+        if errors:
+            raise BulkWriteError({'writeErrors': errors, 'nInserted': len(documents) - len(errors)})
+
+    async def update_one(self, query, update, upsert=False):
+        await self.round_trip('update_one')
+        documents = self._matching(query)
+        if documents:
+            updated = copy.deepcopy(documents[0])
+            apply_update(updated, update)
+            self._check_unique(updated, replacing=documents[0])
+            self.documents[updated['_id']] = updated
+        elif upsert:
+            self._upsert(query, update)
+
+    async def update_many(self, query, update, upsert=False):
+        await self.round_trip('update_many')
+        for document in self._matching(query):
+            apply_update(document, update)
+
+    async def replace_one(self, query, replacement, upsert=False):
+        await self.round_trip('replace_one')
+        documents = self._matching(query)
+        if documents:
+            updated = {'_id': documents[0]['_id'], **copy.deepcopy(replacement)}
+            self._check_unique(updated, replacing=documents[0])
+            self.documents[updated['_id']] = updated
+        elif upsert:
+            self._upsert(query, replacement=replacement)
+
+    async def delete_one(self, query):
+        await self.round_trip('delete_one')
+        documents = self._matching(query)
+        if documents:
+            del self.documents[documents[0]['_id']]
+
+    async def delete_many(self, query):
+        await self.round_trip('delete_many')
+        for document in self._matching(query):
+            del self.documents[document['_id']]
+
+    async def find_one_and_update(self, query, update, projection=None, upsert=False,
+                                  return_document=ReturnDocument.BEFORE, sort=None):
+        await self.round_trip('find_one_and_update')
+        documents = self._matching(query)
+        if sort:
+            documents.sort(key=sort_key(normalize_keys(sort)))
+        if documents:
+            before = project(documents[0], projection)
+            apply_update(documents[0], update)
+            return project(documents[0], projection) if return_document == ReturnDocument.AFTER else before
+        if upsert:
+            document = self._upsert(query, update)
+            return project(document, projection) if return_document == ReturnDocument.AFTER else None
+        return None
+
+
+class FakeDatabase:
+    """Collections by attribute, as with Motor; latency is a simulated round trip in seconds"""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = Counter()
+        self._collections = {}
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return self[name]
+
+    def __getitem__(self, name):
+        collection = self._collections.get(name)
+        if collection is None:
+            collection = self._collections[name] = FakeCollection(self, name)
+        return collection
+
+    def total_calls(self, collections=None):
+        return sum(count for key, count in self.calls.items()
+                   if collections is None or key.split('.', 1)[0] in collections)
@@ -0,0 +1,329 @@
+"""End-to-end load generator: synthetic Poketwo traffic through the real cogs, fully offline
+
+Loads the Starboard, Egg, Unbox and Daycare cogs into a bot driven by a stub gateway
+(benchmarks/fake_gateway.py) and an in-memory database (benchmarks/fake_mongo.py), replays
+catches, hatches, box openings, chatter and daycare commands at a fixed rate, then reports
+event-loop lag, starboard posts per second, database calls per event and tail latency from
+the Poketwo message to the starboard post or command reply.
+
+Run from the bot directory (so config.py and database.py are importable):
+    python benchmarks/load_bench.py --rate 200 --duration 30 --guilds 50
+    python benchmarks/load_bench.py --rate 500 --db-latency 0.002 --http-latency 0.05
+
+Rates are messages per second across every guild, so one run approximates one shard.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import re
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+COGS_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+# The cogs import their helpers from the core package, so they load as a package from the bot directory
+sys.path.insert(0, os.path.dirname(COGS_DIR))
+COGS_PACKAGE = os.path.basename(COGS_DIR)
+
+import __main__
+import database
+
+from fake_gateway import POKETWO, FakeGateway, user_payload
+from fake_mongo import FakeDatabase
+
+COGS = ('starboard', 'egg', 'unbox', 'daycare')
+
+MALE = "<:male:1207734081585152101>"
+FEMALE = "<:female:1207734084210790483>"
+UNKNOWN = "<:unknown:1207734086773506089>"
+GENDERS = (MALE, FEMALE, UNKNOWN)
+SPRITE = "<:_:1242455170147979345>"
+GMAX_SPRITE = "<:_:1242455099213877248>"
+SHINY_NOTICE = "These colors seem unusual... ✨"
+GIGANTAMAX_NOTICE = "Woah! It seems that this pokémon has the Gigantamax Factor..."
+SPECIES = ('Pikachu', 'Eevee', 'Charizard', 'Snorlax', 'Meowth', 'Bulbasaur', 'Squirtle', 'Lapras',
+           'Gengar', 'Machamp', 'Alolan Vulpix', 'Galarian Darumaka', 'Mr. Mime', 'Type: Null')
+GMAX_SPECIES = ('Charizard', 'Snorlax', 'Meowth', 'Lapras', 'Gengar', 'Machamp')
+
+# Share of traffic by kind; catches dominate real spawn channels
+TRAFFIC_MIX = {
+    'chatter': 0.30,
+    'catch': 0.35,
+    'poketwo_other': 0.12,
+    'hatch': 0.08,
+    'box': 0.05,
+    'missingno': 0.01,
+    'daycare': 0.09,
+}
+DAYCARE_COMMANDS = ('next', 'next', 'next', 'current')
+
+JUMP_URL_PATTERN = re.compile(r"/channels/\d+/\d+/(\d+)")
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def random_iv(rng, rare_share):
+    if rng.random() < rare_share:
+        return rng.choice((rng.uniform(90, 100), rng.uniform(0, 10)))
+    return rng.uniform(10.01, 89.99)
+
+
+class TrafficGenerator:
+    """Synthetic Poketwo traffic; rare_share is the chance a spawn is shiny, Gigantamax or rare IV"""
+
+    def __init__(self, gateway, guilds, rng, rare_share, drop_references):
+        self.gateway = gateway
+        # [(guild_id, [spawn channel ids], [member ids])]
+        self.guilds = guilds
+        self.rng = rng
+        self.rare_share = rare_share
+        self.drop_references = drop_references
+        self.kinds = list(TRAFFIC_MIX)
+        self.weights = [TRAFFIC_MIX[kind] for kind in TRAFFIC_MIX]
+        self.counts = Counter()
+        # Poketwo or command message ID -> monotonic time it was dispatched
+        self.dispatched_at = {}
+
+    def _place(self):
+        guild_id, channels, members = self.rng.choice(self.guilds)
+        return guild_id, self.rng.choice(channels), self.rng.choice(members)
+
+    def _rare_flags(self):
+        roll = self.rng.random()
+        shiny = roll < self.rare_share / 3
+        gigantamax = self.rare_share / 3 <= roll < self.rare_share * 2 / 3
+        return shiny, gigantamax
+
+    def _pokemon_line(self, bullet=True):
+        shiny, gigantamax = self._rare_flags()
+        name = f"Gigantamax {self.rng.choice(GMAX_SPECIES)}" if gigantamax else self.rng.choice(SPECIES)
+        iv = random_iv(self.rng, self.rare_share / 3)
+        line = f"{SPRITE} {'✨ ' if shiny else ''}Level {self.rng.randint(1, 40)} {name}{self.rng.choice(GENDERS)} ({iv:.2f}%)"
+        return f"- {line}" if bullet else line
+
+    def _command(self, guild_id, channel_id, user_id, content):
+        return self.gateway.dispatch_message(guild_id, channel_id, user_payload(user_id), content)
+
+    def _poketwo_reply(self, guild_id, channel_id, command_id, content='', embeds=None):
+        message_id = self.gateway.dispatch_message(
+            guild_id, channel_id, POKETWO, content, embeds, reference=command_id,
+            include_referenced=self.rng.random() >= self.drop_references
+        )
+        self.dispatched_at[message_id] = time.monotonic()
+        return message_id
+
+    def send_one(self):
+        kind = self.rng.choices(self.kinds, self.weights)[0]
+        self.counts[kind] += 1
+        guild_id, channel_id, user_id = self._place()
+
+        if kind == 'chatter':
+            self._command(guild_id, channel_id, user_id, self.rng.choice(("gg", "nice", "lol", "p!c pikachu", "p!h")))
+
+        elif kind == 'catch':
+            shiny, gigantamax = self._rare_flags()
+            name = self.rng.choice(GMAX_SPECIES if gigantamax else SPECIES)
+            iv = random_iv(self.rng, self.rare_share / 3)
+            command_id = self._command(guild_id, channel_id, user_id, f"<@{POKETWO['id']}> c {name.lower()}")
+            content = (f"Congratulations <@{user_id}>! You caught a Level {self.rng.randint(1, 40)} "
+                       f"{name}{self.rng.choice(GENDERS)} ({iv:.2f}%)! You received 35 Pokécoins!")
+            if gigantamax:
+                content += f"\n\n{GIGANTAMAX_NOTICE}"
+            if shiny:
+                content += f"\n\n{SHINY_NOTICE}\n\nShiny streak reset. (**{self.rng.randint(1, 900)}**)"
+            self._poketwo_reply(guild_id, channel_id, command_id, content)
+
+        elif kind == 'missingno':
+            command_id = self._command(guild_id, channel_id, user_id, f"<@{POKETWO['id']}> c missingno")
+            content = f"Congratulations <@{user_id}>! You caught a Level ??? MissingNo.{UNKNOWN} (???%)!"
+            self._poketwo_reply(guild_id, channel_id, command_id, content)
+
+        elif kind == 'hatch':
+            shiny, gigantamax = self._rare_flags()
+            iv = random_iv(self.rng, self.rare_share / 3)
+            command_id = self._command(guild_id, channel_id, user_id, f"<@{POKETWO['id']}> egg hatch")
+            if gigantamax:
+                name = self.rng.choice(GMAX_SPECIES)
+                content = (f"Your <:egg_gmax:1242455117530378242> **Gigantamax {name} Egg** has hatched into a "
+                           f"**{SPRITE} {'✨ ' if shiny else ''}Level 1 {GMAX_SPRITE} Gigantamax {name}"
+                           f"{self.rng.choice(GENDERS)} ({iv:.2f}%)**")
+            else:
+                name = self.rng.choice(SPECIES)
+                content = (f"Your <:egg_green_3:1242455117530378240> **{name} Egg** has hatched into a "
+                           f"**{SPRITE} {'✨ ' if shiny else ''}Level 1 {name}{self.rng.choice(GENDERS)} ({iv:.2f}%)**")
+            self._poketwo_reply(guild_id, channel_id, command_id, content)
+
+        elif kind == 'box':
+            command_id = self._command(guild_id, channel_id, user_id, f"<@{POKETWO['id']}> open mystery 3")
+            embeds = [{
+                'type': 'rich', 'title': "Opening 3 Mystery Boxes",
+                'fields': [{'name': f"Box {box}", 'value': self._pokemon_line(), 'inline': False} for box in range(1, 4)],
+            }]
+            self._poketwo_reply(guild_id, channel_id, command_id, embeds=embeds)
+
+        elif kind == 'poketwo_other':
+            self.gateway.dispatch_message(guild_id, channel_id, POKETWO, self.rng.choice((
+                "That is the wrong pokémon!", "The pokémon is P_k_ch_.",
+                "You have completed the quest **Catch 10 pokémon**! You received **500** Pokécoins.",
+            )))
+
+        elif kind == 'daycare':
+            command_id = self._command(guild_id, channel_id, user_id, f"!{self.rng.choice(DAYCARE_COMMANDS)}")
+            self.dispatched_at[command_id] = time.monotonic()
+
+
+async def seed(fake_db, guilds, starboard_channels, global_channel, dataset_size):
+    """Settings for every guild, and a selected daycare dataset for every member"""
+    await fake_db.global_settings.update_one(
+        {"_id": "starboard"}, {"$set": {"global_starboard_channel_id": global_channel}}, upsert=True
+    )
+    for guild_id, _, members in guilds:
+        await fake_db.guild_settings.update_one(
+            {"guild_id": guild_id}, {"$set": {"starboard_channel_id": starboard_channels[guild_id]}}, upsert=True
+        )
+        for user_id in members:
+            await fake_db.datasets.insert_one({
+                "user_id": user_id, "name": "Event", "name_lower": "event",
+                "commands": [f"<@{POKETWO['id']}> dc add {i} {i + 1}" for i in range(1, dataset_size * 2, 2)],
+                "created_at": None, "last_modified": None, "last_used": None,
+            })
+            await fake_db.user_states.insert_one({
+                "user_id": user_id, "selected_dataset": "Event", "selected_dataset_lower": "event",
+                "current_position": 0,
+            })
+    fake_db.calls.clear()
+
+
+async def monitor_loop_lag(samples, interval=0.01):
+    while True:
+        started = time.monotonic()
+        await asyncio.sleep(interval)
+        samples.append(time.monotonic() - started - interval)
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    fake_db = FakeDatabase(latency=args.db_latency)
+    # The starboard cogs read __main__.db, Daycare reads database.db.db
+    __main__.db = fake_db
+    database.db.db = fake_db
+
+    gateway = FakeGateway(command_prefix='!', http_latency=args.http_latency)
+    await gateway.start()
+
+    guilds = []
+    starboard_channels = {}
+    next_id = iter(range(10_000, 10_000_000))
+    global_guild = next(next_id)
+    global_channel = next(next_id)
+    gateway.add_guild(global_guild, [global_channel], [])
+    for _ in range(args.guilds):
+        guild_id = next(next_id)
+        channels = [next(next_id) for _ in range(args.channels)]
+        members = [next(next_id) for _ in range(args.members)]
+        starboard_channels[guild_id] = next(next_id)
+        gateway.add_guild(guild_id, channels + [starboard_channels[guild_id]], members)
+        guilds.append((guild_id, channels, members))
+    await seed(fake_db, guilds, starboard_channels, global_channel, args.dataset_size)
+
+    # The cogs print debug lines for every parse; keep them out of the report
+    quiet = contextlib.redirect_stdout(io.StringIO()) if not args.verbose else contextlib.nullcontext()
+    with quiet:
+        for cog in COGS:
+            await gateway.bot.load_extension(f'{COGS_PACKAGE}.{cog}')
+
+        traffic = TrafficGenerator(gateway, guilds, rng, args.rare_share, args.drop_references)
+        lag_samples = []
+        lag_task = asyncio.create_task(monitor_loop_lag(lag_samples))
+
+        # Open loop: messages go out on schedule whether or not the bot keeps up
+        started = time.monotonic()
+        total = int(args.rate * args.duration)
+        for sent in range(total):
+            delay = started + sent / args.rate - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            elif sent % 64 == 0:
+                await asyncio.sleep(0)
+            traffic.send_one()
+        send_elapsed = time.monotonic() - started
+
+        await gateway.bot.post_queue.drain(timeout=args.drain_timeout)
+        await asyncio.sleep(0.1)
+        elapsed = time.monotonic() - started
+        lag_task.cancel()
+        for cog in list(gateway.bot.cogs):
+            await gateway.bot.remove_cog(cog)
+
+    report(args, gateway, fake_db, traffic, lag_samples, send_elapsed, elapsed)
+
+
+def report(args, gateway, fake_db, traffic, lag_samples, send_elapsed, elapsed):
+    events = sum(traffic.counts.values())
+    post_latencies = []
+    reply_latencies = []
+    posts = 0
+    for channel_id, payload, sent_at in gateway.sent:
+        reference = (payload.get('message_reference') or {}).get('message_id')
+        if reference is not None:
+            if int(reference) in traffic.dispatched_at:
+                reply_latencies.append(sent_at - traffic.dispatched_at[int(reference)])
+            continue
+        # Starboard posts carry a jump button back to the Poketwo message
+        posts += 1
+        match = JUMP_URL_PATTERN.search(json.dumps(payload.get('components') or []))
+        if match and int(match.group(1)) in traffic.dispatched_at:
+            post_latencies.append(sent_at - traffic.dispatched_at[int(match.group(1))])
+
+    print(f"Offered {events} messages in {send_elapsed:.1f}s ({events / send_elapsed:.0f}/s target {args.rate}/s), "
+          f"{args.guilds} guilds, run {elapsed:.1f}s")
+    print("  mix: " + ", ".join(f"{kind} {count}" for kind, count in traffic.counts.most_common()))
+    print(f"Event loop lag: p50 {percentile(lag_samples, 0.50) * 1e3:.2f}ms  "
+          f"p99 {percentile(lag_samples, 0.99) * 1e3:.2f}ms  max {max(lag_samples, default=0) * 1e3:.2f}ms")
+    print(f"Starboard posts: {posts} ({posts / elapsed:.1f}/s); "
+          f"queue {gateway.bot.post_queue.stats()['pending']} still pending")
+    for name, latencies in (('post', post_latencies), ('command reply', reply_latencies)):
+        print(f"  {name} latency: n={len(latencies)}  p50 {percentile(latencies, 0.50) * 1e3:.1f}ms  "
+              f"p95 {percentile(latencies, 0.95) * 1e3:.1f}ms  p99 {percentile(latencies, 0.99) * 1e3:.1f}ms  "
+              f"max {max(latencies, default=0) * 1e3:.1f}ms")
+    db_calls = fake_db.total_calls()
+    print(f"DB calls: {db_calls} ({db_calls / events:.2f} per message)")
+    for key, count in fake_db.calls.most_common(8):
+        print(f"  {key}: {count}")
+    print(f"REST calls: {sum(gateway.http_calls.values())}")
+    for key, count in gateway.http_calls.most_common():
+        print(f"  {key}: {count}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rate', type=float, default=100, help="messages per second across all guilds")
+    parser.add_argument('--duration', type=float, default=10, help="seconds of traffic")
+    parser.add_argument('--guilds', type=int, default=20)
+    parser.add_argument('--channels', type=int, default=3, help="spawn channels per guild")
+    parser.add_argument('--members', type=int, default=25, help="active members per guild")
+    parser.add_argument('--rare-share', type=float, default=0.05,
+                        help="chance a Pokemon qualifies as shiny, Gigantamax or rare IV")
+    parser.add_argument('--drop-references', type=float, default=0.0,
+                        help="share of Poketwo replies arriving without the referenced message")
+    parser.add_argument('--dataset-size', type=int, default=50, help="daycare commands per seeded dataset")
+    parser.add_argument('--db-latency', type=float, default=0.0, help="simulated MongoDB round trip, seconds")
+    parser.add_argument('--http-latency', type=float, default=0.0, help="simulated Discord REST round trip, seconds")
+    parser.add_argument('--drain-timeout', type=float, default=30.0)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--verbose', action='store_true', help="keep the cogs' own output")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
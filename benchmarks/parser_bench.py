@@ -0,0 +1,158 @@
+"""Regression corpus and benchmark for every Poketwo message parser
+
+Runs each case in benchmarks/corpus/parser_corpus.json through its parser, compares the
+result with the recorded expectation, then times the corpus and reports messages per
+second, p50/p99 latency and peak memory allocated per parse. No Discord connection is made.
+
+Run from the bot directory (so config.py and database.py are importable):
+    python benchmarks/parser_bench.py [iterations]
+    python benchmarks/parser_bench.py --update    # re-record expectations after a format change
+
+Exits non-zero on any mismatch, so it can gate a deploy.
+"""
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+COGS_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+# The cogs import their helpers from the core package, so they load as a package from the bot directory
+sys.path.insert(0, os.path.dirname(COGS_DIR))
+COGS_PACKAGE = os.path.basename(COGS_DIR)
+
+import discord
+from discord.ext import commands
+
+Daycare = importlib.import_module(f'{COGS_PACKAGE}.daycare').Daycare
+Egg = importlib.import_module(f'{COGS_PACKAGE}.egg').Egg
+Starboard = importlib.import_module(f'{COGS_PACKAGE}.starboard').Starboard
+Unbox = importlib.import_module(f'{COGS_PACKAGE}.unbox').Unbox
+
+CORPUS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus', 'parser_corpus.json')
+
+
+def build_parsers():
+    """Parser name -> callable(input), with the cogs built on an offline bot"""
+    bot = commands.Bot(command_prefix='m!', intents=discord.Intents.none())
+    starboard = Starboard(bot)
+    egg = Egg(bot)
+    unbox = Unbox(bot)
+    daycare = Daycare(bot)
+
+    def parse_unbox_embed(embed_data):
+        message = SimpleNamespace(embeds=[discord.Embed.from_dict(embed_data)])
+        return unbox.parse_poketwo_unbox_message(message)
+
+    return {
+        'catch': starboard.parse_poketwo_catch_message,
+        'missingno': starboard.parse_poketwo_missingno_message,
+        'hatch': egg.parse_poketwo_hatch_message,
+        'unbox_text': unbox.extract_pokemon_from_text,
+        'unbox_embed': parse_unbox_embed,
+        'daycare': daycare.extract_poketwo_commands,
+    }
+
+
+def normalize(result):
+    """Round-trip through JSON so results compare equal to what the corpus file holds"""
+    return json.loads(json.dumps(result))
+
+
+def check(parsers, corpus):
+    """Describe every case whose parse no longer matches its recorded expectation"""
+    mismatches = []
+    for name, cases in corpus.items():
+        for index, case in enumerate(cases):
+            actual = normalize(parsers[name](case['input']))
+            if actual != case['expected']:
+                mismatches.append(f"MISMATCH {name}[{index}] ({case['source']}): {str(case['input'])[:80]!r}\n"
+                                  f"  expected: {case['expected']}\n"
+                                  f"  actual:   {actual}")
+    return mismatches
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def measure(parser, cases, iterations):
+    """Per-parse latencies in seconds over every iteration, plus bytes allocated per parse"""
+    inputs = [case['input'] for case in cases]
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        for value in inputs:
+            parse_started = time.perf_counter()
+            parser(value)
+            latencies.append(time.perf_counter() - parse_started)
+    wall = time.perf_counter() - started
+
+    # Allocations are measured on a separate pass; tracing slows the parse down too much to time it.
+    # The traced peak over each parse counts temporaries as well as the result it hands back.
+    tracemalloc.start()
+    allocated = 0
+    for value in inputs:
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        parser(value)
+        allocated += tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+
+    return latencies, wall, allocated / len(inputs)
+
+
+def update(parsers, corpus):
+    for name, cases in corpus.items():
+        for case in cases:
+            case['expected'] = normalize(parsers[name](case['input']))
+    with open(CORPUS_FILE, 'w', encoding='utf-8') as f:
+        json.dump(corpus, f, ensure_ascii=False, indent=2)
+        f.write('\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('iterations', nargs='?', type=int, default=200)
+    parser.add_argument('--update', action='store_true', help="re-record expectations from the current parsers")
+    args = parser.parse_args()
+
+    with open(CORPUS_FILE, 'r', encoding='utf-8') as f:
+        corpus = json.load(f)
+
+    # The parsers print debug lines; keep them out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        parsers = build_parsers()
+
+    if args.update:
+        with contextlib.redirect_stdout(io.StringIO()):
+            update(parsers, corpus)
+        print(f"Re-recorded {sum(len(cases) for cases in corpus.values())} expectations; review the diff")
+        return 0
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        mismatches = check(parsers, corpus)
+    for mismatch in mismatches:
+        print(mismatch)
+
+    print(f"{'parser':<12} {'cases':>5} {'msgs/s':>10} {'p50 us':>8} {'p99 us':>8} {'KiB/parse':>10}")
+    for name, cases in corpus.items():
+        with contextlib.redirect_stdout(io.StringIO()):
+            latencies, wall, allocated = measure(parsers[name], cases, args.iterations)
+        latencies.sort()
+        print(f"{name:<12} {len(cases):>5} {len(latencies) / wall:>10.0f} "
+              f"{percentile(latencies, 0.50) * 1e6:>8.2f} {percentile(latencies, 0.99) * 1e6:>8.2f} "
+              f"{allocated / 1024:>10.2f}")
+
+    total = sum(len(cases) for cases in corpus.values())
+    print(f"Corpus: {total} cases, {len(mismatches)} mismatches")
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
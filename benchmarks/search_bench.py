@@ -0,0 +1,120 @@
+"""Regression cases and benchmark for daycare dataset search
+
+Seeds an in-memory library of generated dataset names plus the names the cases look for,
+checks that each term still finds (or doesn't find) its expected dataset, then times the
+searches and reports the database calls they made. No MongoDB connection is made.
+
+Run from the bot directory (so config.py and database.py are importable):
+    python benchmarks/search_bench.py [library size]
+
+Exits non-zero on any miss, so it can gate a deploy.
+"""
+import argparse
+import asyncio
+import importlib
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+COGS_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+# The cogs import their helpers from the core package, so they load as a package from the bot directory
+sys.path.insert(0, os.path.dirname(COGS_DIR))
+COGS_PACKAGE = os.path.basename(COGS_DIR)
+
+import database
+
+from fake_mongo import FakeDatabase
+
+dataset_search = importlib.import_module(f'{COGS_PACKAGE}.core.dataset_search')
+
+USER_ID = 1
+NAMES = ['pikachu', 'charizard', 'eevee team', 'shiny hunt', 'meowth', 'dragonite iv']
+
+# (term, dataset name it must find, or None for a term that must find nothing)
+CASES = [
+    ('pikachu', 'pikachu'),                # exact
+    ('pika', 'pikachu'),                   # prefix
+    ('izar', 'charizard'),                 # substring
+    ('team', 'eevee team'),                # substring across a space
+    ('ev', 'eevee team'),                  # too short for trigrams
+    ('pikbchu', 'pikachu'),                # substitution mid-word
+    ('pikahcu', 'pikachu'),                # transposition
+    ('charizrd', 'charizard'),             # deletion
+    ('chatizard', 'charizard'),            # substitution
+    ('meowht', 'meowth'),                  # transposition at the end
+    ('shiny hnt', 'shiny hunt'),           # deletion after a space
+    ('dragnoite', 'dragonite iv'),         # transposition in a longer name
+    ('zzqx', None),
+]
+
+SYLLABLES = ['ka', 'ro', 'mi', 'ta', 'zu', 'ne', 'shi', 'do', 'ra', 'lu', 'vo', 'qe', 'bax', 'tor', 'wyn']
+
+
+def generated_names(count, rng):
+    """Distinct filler names that share plenty of trigrams with each other"""
+    names = set()
+    while len(names) < count:
+        names.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))) + f" {rng.randint(1, 99)}")
+    return sorted(names)
+
+
+async def seed(fake_db, names):
+    await fake_db.datasets.insert_many([
+        {
+            "user_id": USER_ID,
+            "name": name,
+            "name_lower": name,
+            "name_trigrams": dataset_search.name_trigrams(name),
+            "command_count": 1,
+            "last_used": None
+        }
+        for name in names
+    ])
+
+
+async def check(search):
+    """Describe every case whose search no longer finds what it should"""
+    misses = []
+    for term, expected in CASES:
+        found = [dataset['name'] for dataset in await search.search(USER_ID, term)]
+        if expected is None and found:
+            misses.append(f"MISS {term!r}: expected nothing, found {found[:5]}")
+        elif expected is not None and expected not in found:
+            misses.append(f"MISS {term!r}: expected {expected!r}, found {found[:5]}")
+    return misses
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('library_size', nargs='?', type=int, default=2000)
+    parser.add_argument('--iterations', type=int, default=20)
+    args = parser.parse_args()
+
+    fake_db = FakeDatabase()
+    database.db.db = fake_db
+    await seed(fake_db, NAMES + generated_names(args.library_size, random.Random(1)))
+
+    search = dataset_search.DatasetSearch()
+    misses = await check(search)
+    for miss in misses:
+        print(miss)
+
+    fake_db.calls.clear()
+    started = time.perf_counter()
+    for _ in range(args.iterations):
+        for term, _ in CASES:
+            await search.search(USER_ID, term)
+    elapsed = time.perf_counter() - started
+    searches = args.iterations * len(CASES)
+
+    print(f"Library: {len(NAMES) + args.library_size} datasets; {searches / elapsed:.0f} searches/s")
+    for call, count in sorted(fake_db.calls.items()):
+        print(f"  {call}: {count / searches:.2f} per search")
+    print(f"Cases: {len(CASES)}, {len(misses)} misses")
+    return 1 if misses else 0
+
+
+if __name__ == '__main__':
+    sys.exit(asyncio.run(main()))
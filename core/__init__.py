@@ -0,0 +1 @@
+"""Services shared by the cogs; a package so extension loaders don't mistake them for cogs"""
@@ -0,0 +1,102 @@
+import asyncio
+import math
+import re
+from typing import Dict, List
+
+from database import db
+
+# What search results show; matches daycare's dataset listings
+SEARCH_FIELDS = {"name": 1, "name_lower": 1, "command_count": 1, "last_used": 1}
+
+EXACT, PREFIX, SUBSTRING, FUZZY = range(4)
+
+
+def name_trigrams(name_lower: str, padded: bool = True) -> List[str]:
+    """Distinct three-character slices of a lowercased name
+
+    Padded trigrams, as stored in name_trigrams, also mark where the name starts and ends,
+    which lets short names and typos near either end still score. A term's unpadded
+    trigrams all appear in the stored trigrams of any name that contains it.
+    """
+    text = f"  {name_lower} " if padded else name_lower
+    return sorted({text[i:i + 3] for i in range(len(text) - 2)})
+
+
+def similarity(a: List[str], b: List[str]) -> float:
+    """Share of trigrams two names have in common, from 0 to 1"""
+    a, b = set(a), set(b)
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+class DatasetSearch:
+    """Case-insensitive dataset name search served from indexes
+
+    Prefix matches are a range on the (user_id, name_lower) index. With trigrams enabled,
+    substrings are found through the multikey (user_id, name_trigrams) index, and fuzzy
+    candidates are names sharing enough of the term's trigrams to possibly reach threshold,
+    ranked by how many they share before the cap. Every query is capped at max_candidates,
+    so the cost doesn't grow with the size of the user's library.
+    Both indexes are created at startup by daycare_indexes.
+    """
+
+    def __init__(self, trigrams: bool = True, threshold: float = 0.3, max_candidates: int = 500):
+        self.trigrams = trigrams
+        self.threshold = threshold
+        self.max_candidates = max_candidates
+
+    async def _find(self, query: Dict) -> List[Dict]:
+        cursor = db.db.datasets.find(query, SEARCH_FIELDS).limit(self.max_candidates)
+        return await cursor.to_list(length=self.max_candidates)
+
+    async def _find_similar(self, user_id: int, term_trigrams: List[str]) -> List[Dict]:
+        # Padded trigrams, as similarity() compares. It divides the shared trigrams by the union,
+        # which is at least the term's own, so a name sharing fewer than
+        # threshold * len(term_trigrams) can never pass it.
+        # Anything above that minimum is kept, and ranked by shared trigrams in the database,
+        # so the cap keeps the best.
+        required = max(1, math.ceil(round(self.threshold * len(term_trigrams), 6)))
+        cursor = db.db.datasets.aggregate([
+            {"$match": {"user_id": user_id, "name_trigrams": {"$in": term_trigrams}}},
+            {"$addFields": {"overlap": {"$size": {"$setIntersection": ["$name_trigrams", {"$literal": term_trigrams}]}}}},
+            {"$match": {"overlap": {"$gte": required}}},
+            {"$sort": {"overlap": -1, "name_lower": 1}},
+            {"$limit": self.max_candidates},
+            {"$project": SEARCH_FIELDS}
+        ])
+        return await cursor.to_list(length=self.max_candidates)
+
+    async def search(self, user_id: int, term: str) -> List[Dict]:
+        """The user's datasets matching term, best first: exact, prefix, substring, then fuzzy"""
+        term = term.lower()
+
+        # An anchored, case-sensitive regex on name_lower is a bounded index range
+        lookups = [self._find({"user_id": user_id, "name_lower": {"$regex": f"^{re.escape(term)}"}})]
+        term_trigrams = name_trigrams(term)
+        if self.trigrams and len(term) >= 3:
+            inner_trigrams = name_trigrams(term, padded=False)
+            lookups.append(self._find({"user_id": user_id, "name_trigrams": {"$all": inner_trigrams}}))
+            lookups.append(self._find_similar(user_id, term_trigrams))
+        else:
+            # Too short for trigrams; this walks only the user's keys of the name_lower index
+            lookups.append(self._find({"user_id": user_id, "name_lower": {"$regex": re.escape(term)}}))
+
+        ranked = {}
+        for candidates in await asyncio.gather(*lookups):
+            for dataset in candidates:
+                name_lower = dataset["name_lower"]
+                if name_lower in ranked:
+                    continue
+                score = similarity(term_trigrams, name_trigrams(name_lower))
+                if name_lower == term:
+                    rank = EXACT
+                elif name_lower.startswith(term):
+                    rank = PREFIX
+                elif term in name_lower:
+                    rank = SUBSTRING
+                elif self.trigrams and score >= self.threshold:
+                    rank = FUZZY
+                else:
+                    continue
+                ranked[name_lower] = (rank, -score, name_lower, dataset)
+
+        return [entry[3] for entry in sorted(ranked.values(), key=lambda entry: entry[:3])]
@@ -0,0 +1,94 @@
+from typing import Dict, List
+
+from pymongo.errors import DuplicateKeyError, OperationFailure
+
+from database import db
+from .dataset_search import name_trigrams
+
+# Name of the unique (user_id, name_lower) index that store relies on to spot taken names
+DATASET_NAME_INDEX = "user_name_lower_unique"
+
+# (collection, keys, options) for every index the daycare queries rely on
+DAYCARE_INDEXES = [
+    # Every dataset lookup, listing and prefix search; also what keeps store and rename from
+    # creating two datasets with the same name
+    ("datasets", [("user_id", 1), ("name_lower", 1)], {"unique": True, "name": DATASET_NAME_INDEX}),
+    # Substring and fuzzy search
+    ("datasets", [("user_id", 1), ("name_trigrams", 1)], {"name": "user_name_trigrams"}),
+    ("user_states", [("user_id", 1)], {"unique": True, "name": "user_id_unique"}),
+]
+
+_SAMPLE_USER = 0
+_SAMPLE_NAME = "sample"
+
+# (collection, description, filter, sort) for each query shape the daycare cog issues.
+# Counts and updates are explained as the find with the same filter, which plans the same way.
+DAYCARE_QUERY_SHAPES = [
+    ("datasets", "datasets by user (list/select counts and pages)", {"user_id": _SAMPLE_USER}, [("_id", 1)]),
+    ("datasets", "dataset by name", {"user_id": _SAMPLE_USER, "name_lower": _SAMPLE_NAME}, None),
+    ("datasets", "datasets missing summary fields",
+     {"user_id": _SAMPLE_USER, "$or": [{"command_count": {"$exists": False}},
+                                       {"name_trigrams": {"$exists": False}}]}, None),
+    ("datasets", "name prefix search", {"user_id": _SAMPLE_USER, "name_lower": {"$regex": f"^{_SAMPLE_NAME}"}}, None),
+    ("datasets", "short substring search", {"user_id": _SAMPLE_USER, "name_lower": {"$regex": "sa"}}, None),
+    ("datasets", "trigram substring search",
+     {"user_id": _SAMPLE_USER, "name_trigrams": {"$all": name_trigrams(_SAMPLE_NAME, padded=False)}}, None),
+    # The $match that starts the fuzzy search pipeline
+    ("datasets", "trigram fuzzy search",
+     {"user_id": _SAMPLE_USER, "name_trigrams": {"$in": name_trigrams(_SAMPLE_NAME)}}, None),
+    ("user_states", "user state", {"user_id": _SAMPLE_USER}, None),
+    ("user_states", "position claim",
+     {"user_id": _SAMPLE_USER, "selected_dataset": _SAMPLE_NAME, "dataset_version": {"$in": [0, None]},
+      "current_position": {"$lt": 1}}, None),
+]
+
+
+async def ensure_daycare_indexes() -> List[str]:
+    """Create any missing daycare index; returns the names of those that could not be built
+
+    A unique index fails to build while duplicates are stored. That is reported rather than
+    raised, so the bot still starts and the duplicates can be merged by hand; callers must not
+    rely on an index named here until a later startup builds it.
+    """
+    failed = []
+    for collection, keys, options in DAYCARE_INDEXES:
+        try:
+            await db.db[collection].create_index(keys, **options)
+        except (DuplicateKeyError, OperationFailure) as e:
+            print(f"Error creating daycare index {collection}.{options['name']}: {e} "
+                  f"(merge the duplicates it names, then restart)")
+            failed.append(options["name"])
+    return failed
+
+
+def plan_stages(plan) -> List[str]:
+    """Every stage named anywhere in an explain plan"""
+    stages = []
+    if isinstance(plan, dict):
+        if isinstance(plan.get("stage"), str):
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(plan_stages(value))
+    elif isinstance(plan, list):
+        for value in plan:
+            stages.extend(plan_stages(value))
+    return stages
+
+
+async def audit_daycare_queries() -> List[Dict]:
+    """Explain each daycare query shape and log the ones whose winning plan scans a collection"""
+    scans = []
+    for collection, description, query, sort in DAYCARE_QUERY_SHAPES:
+        cursor = db.db[collection].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        try:
+            explained = await cursor.explain()
+        except Exception as e:
+            print(f"Error explaining daycare query '{description}': {e}")
+            continue
+        winning_plan = explained.get("queryPlanner", {}).get("winningPlan", {})
+        if "COLLSCAN" in plan_stages(winning_plan):
+            print(f"Daycare query '{description}' on {collection} scans the whole collection: {query}")
+            scans.append({"collection": collection, "description": description, "query": query})
+    return scans
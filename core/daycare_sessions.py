@@ -0,0 +1,314 @@
+import asyncio
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from database import db
+
+# What a claim needs to tell whether the cached session still matches user_states
+STATE_FIELDS = {"selected_dataset": 1, "current_position": 1, "dataset_version": 1, "_id": 0}
+
+
+def version_filter(version: int):
+    """Match a user_states dataset_version; states written before versions existed have none"""
+    return version if version else {"$in": [0, None]}
+
+
+async def bump_dataset_version(user_id: int, dataset_name_lower: str, reset_position: bool = False):
+    """Mark the user's selected dataset as changed, if it is this one, so every process reloads it"""
+    # Older states may lack selected_dataset_lower, so compare the selected name itself
+    user_state = await db.db.user_states.find_one({"user_id": user_id}, {"selected_dataset": 1, "_id": 0})
+    if not user_state or user_state.get("selected_dataset", "").lower() != dataset_name_lower:
+        return
+
+    update = {"$inc": {"dataset_version": 1}}
+    if reset_position:
+        update["$set"] = {"current_position": 0}
+    await db.db.user_states.update_one(
+        {"user_id": user_id, "selected_dataset": user_state["selected_dataset"]},
+        update
+    )
+
+
+class DaycareSession:
+    """A user's selected dataset and position, as next/jump/current see them"""
+
+    __slots__ = ('user_id', 'dataset_name', 'dataset_name_lower', 'commands', 'position',
+                 'last_used', 'dataset_version', 'loaded_at', 'dirty', 'writing')
+
+    def __init__(self, user_id: int, dataset_name: str, dataset_name_lower: str, commands: Optional[List[str]],
+                 position: int, last_used: Optional[datetime], dataset_version: int = 0):
+        self.user_id = user_id
+        self.dataset_name = dataset_name
+        self.dataset_name_lower = dataset_name_lower
+        # None when the selected dataset no longer exists
+        self.commands = commands
+        self.position = position
+        self.last_used = last_used
+        # user_states.dataset_version when loaded; edits and replacements bump it
+        self.dataset_version = dataset_version
+        self.loaded_at = time.monotonic()
+        # last_used changed since it was last written to MongoDB
+        self.dirty = False
+        self.writing = False
+
+
+class DaycareSessions:
+    """Cache of active users' daycare sessions
+
+    A session is loaded once (user_states plus the selected dataset). After that, next and
+    jump cost one atomic user_states update each, which claims the position server-side, and
+    the command text comes from the cached dataset. last_used is written back after
+    flush_delay seconds, so a burst of presses costs one dataset update.
+    Commands that change the selection or the dataset itself discard the session first. Changes
+    made by another process are caught two ways: claims also match user_states.dataset_version,
+    which edits and replacements bump, and sessions are reloaded after session_ttl seconds.
+    """
+
+    def __init__(self, flush_delay: float = 5.0, max_sessions: int = 5000, session_ttl: float = 30.0):
+        self.flush_delay = flush_delay
+        self.max_sessions = max_sessions
+        self.session_ttl = session_ttl
+        # user_id -> session, least recently used first
+        self._sessions: "OrderedDict[int, DaycareSession]" = OrderedDict()
+        # user_id -> future for a session already being loaded
+        self._loading: Dict[int, asyncio.Future] = {}
+        # user_id -> (delayed write task, the session it writes)
+        self._writes: Dict[int, tuple] = {}
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.coalesced = 0
+        self.expired = 0
+        # Atomic updates that found the selection changed or the dataset finished
+        self.conflicts = 0
+
+    async def _load(self, user_id: int) -> Optional[DaycareSession]:
+        user_state = await db.db.user_states.find_one({"user_id": user_id})
+        if not user_state or not user_state.get("selected_dataset"):
+            return None
+
+        dataset_name = user_state["selected_dataset"]
+        dataset_name_lower = user_state.get("selected_dataset_lower", dataset_name.lower())
+        dataset = await db.db.datasets.find_one({"user_id": user_id, "name_lower": dataset_name_lower})
+        if not dataset:
+            return DaycareSession(user_id, dataset_name, dataset_name_lower, None, 0, None)
+
+        return DaycareSession(
+            user_id, dataset_name, dataset_name_lower, dataset.get("commands", []),
+            user_state.get("current_position", 0), dataset.get("last_used"),
+            user_state.get("dataset_version", 0)
+        )
+
+    def _store(self, session: DaycareSession):
+        self._sessions[session.user_id] = session
+        self._sessions.move_to_end(session.user_id)
+        # Evicted sessions with a pending write are still written; the task holds them
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+    async def get(self, user_id: int) -> Optional[DaycareSession]:
+        """Return the user's session, or None when no dataset is selected"""
+        session = self._sessions.get(user_id)
+        if session is not None and time.monotonic() - session.loaded_at >= self.session_ttl:
+            # Old enough that another process may have changed it; land its write and reload
+            self.expired += 1
+            await self.discard(user_id)
+            session = None
+        if session is not None:
+            self.hits += 1
+            self._sessions.move_to_end(user_id)
+            return session
+
+        # Concurrent commands from one user share one load
+        loading = self._loading.get(user_id)
+        if loading is not None:
+            self.hits += 1
+            return await asyncio.shield(loading)
+
+        self.misses += 1
+        loading = self._loading[user_id] = asyncio.ensure_future(self._load(user_id))
+        try:
+            session = await asyncio.shield(loading)
+        finally:
+            # discard() unregisters a load in flight, so one still registered read current state
+            current = self._loading.get(user_id) is loading
+            if current:
+                del self._loading[user_id]
+
+        # Skip caching a missing dataset, or a session discarded while the load was in flight
+        if session is not None and session.commands is not None and current:
+            self._store(session)
+        return session
+
+    async def advance(self, user_id: int) -> Tuple[Optional[DaycareSession], Optional[int]]:
+        """Claim the user's next position atomically, so two fast presses never get the same entry
+
+        Returns (session, position). The session is None when nothing is selected, and its
+        commands are None when the selected dataset is gone; position is None at the end.
+        """
+        for _ in range(2):
+            session = await self.get(user_id)
+            if session is None or session.commands is None:
+                return session, None
+
+            # Only applies while the cached selection is current and the position is inside
+            # the dataset, and hands back the position from before the increment
+            claimed = await db.db.user_states.find_one_and_update(
+                {"user_id": user_id, "selected_dataset": session.dataset_name,
+                 "dataset_version": version_filter(session.dataset_version),
+                 "current_position": {"$lt": len(session.commands)}},
+                {"$inc": {"current_position": 1}},
+                projection={"current_position": 1, "_id": 0}
+            )
+            if claimed is not None:
+                position = claimed.get("current_position", 0)
+                session.position = position + 1
+                self._touch(session)
+                return session, position
+
+            # Finished as far as this process knows; extra presses cost just the failed claim
+            if session.position >= len(session.commands):
+                return session, None
+
+            # Tell another process finishing the dataset apart from a changed selection
+            state = await db.db.user_states.find_one({"user_id": user_id}, STATE_FIELDS)
+            if (state is not None and state.get("selected_dataset") == session.dataset_name
+                    and state.get("dataset_version", 0) == session.dataset_version):
+                session.position = state.get("current_position", 0)
+                if session.position >= len(session.commands):
+                    return session, None
+                # Jumped back elsewhere since the claim; claim again
+                continue
+
+            self.conflicts += 1
+            await self.discard(user_id)
+        return await self.get(user_id), None
+
+    async def jump(self, session: DaycareSession, position: int) -> bool:
+        """Set the position atomically; False if the selection changed since the session was loaded"""
+        claimed = await db.db.user_states.find_one_and_update(
+            {"user_id": session.user_id, "selected_dataset": session.dataset_name,
+             "dataset_version": version_filter(session.dataset_version)},
+            {"$set": {"current_position": position}},
+            projection={"_id": 1}
+        )
+        if claimed is None:
+            self.conflicts += 1
+            await self.discard(session.user_id)
+            return False
+        session.position = position
+        self._touch(session)
+        return True
+
+    async def current(self, user_id: int) -> Optional[DaycareSession]:
+        """Return the user's session with its position re-read, for showing rather than claiming
+
+        Advances made by another process only move user_states, so the cached position can lag;
+        a projected read fixes that, and a changed selection or dataset reloads the session.
+        """
+        session = await self.get(user_id)
+        if session is None or session.commands is None:
+            return session
+
+        state = await db.db.user_states.find_one({"user_id": user_id}, STATE_FIELDS)
+        if (state is None or state.get("selected_dataset") != session.dataset_name
+                or state.get("dataset_version", 0) != session.dataset_version):
+            self.conflicts += 1
+            await self.discard(user_id)
+            return await self.get(user_id)
+
+        session.position = state.get("current_position", 0)
+        return session
+
+    def _touch(self, session: DaycareSession):
+        """Record a use of the session's dataset and schedule the last_used write-back"""
+        session.last_used = datetime.now(timezone.utc)
+        session.dirty = True
+
+        if session.user_id in self._writes:
+            self.coalesced += 1
+            return
+        task = asyncio.ensure_future(self._write_later(session))
+        self._writes[session.user_id] = (task, session)
+
+    async def _write_later(self, session: DaycareSession):
+        try:
+            # Uses while a write is in flight leave the session dirty for another round
+            while True:
+                await asyncio.sleep(self.flush_delay)
+                await self._write(session)
+                if not session.dirty:
+                    break
+        finally:
+            if self._writes.get(session.user_id, (None,))[0] is asyncio.current_task():
+                del self._writes[session.user_id]
+
+    async def _write(self, session: DaycareSession):
+        if not session.dirty:
+            return
+        session.dirty = False
+        session.writing = True
+        try:
+            await db.db.datasets.update_one(
+                {"user_id": session.user_id, "name_lower": session.dataset_name_lower},
+                {"$set": {"last_used": session.last_used}}
+            )
+            self.writes += 1
+        except Exception as e:
+            # Keep it dirty so the next flush tries again
+            session.dirty = True
+            print(f"Error writing daycare last_used for {session.user_id}: {e}")
+        finally:
+            session.writing = False
+
+    async def flush(self, user_id: int):
+        """Write the user's pending last_used now, e.g. before reading it back from MongoDB"""
+        pending = self._writes.pop(user_id, None)
+        if pending is None:
+            return
+        task, session = pending
+        if session.writing:
+            await asyncio.shield(task)
+        else:
+            task.cancel()
+        await self._write(session)
+
+    async def flush_all(self):
+        for user_id in list(self._writes):
+            await self.flush(user_id)
+
+    async def discard(self, user_id: int):
+        """Drop the user's session once its pending write has landed
+
+        Call before writing user_states or the selected dataset directly, so the cached copy
+        can't be served afterwards and a late write-back lands before the change.
+        """
+        await self.flush(user_id)
+        self._sessions.pop(user_id, None)
+        # A load already in flight may have read the old state; it won't be cached
+        self._loading.pop(user_id, None)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'sessions': len(self._sessions),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+            'pending_writes': len(self._writes),
+            'writes': self.writes,
+            'coalesced': self.coalesced,
+            'expired': self.expired,
+            'conflicts': self.conflicts
+        }
+
+
+def get_daycare_sessions(bot):
+    """Return the daycare session cache held by the bot, creating it on first use"""
+    sessions = getattr(bot, 'daycare_sessions', None)
+    if sessions is None:
+        sessions = DaycareSessions()
+        bot.daycare_sessions = sessions
+    return sessions
@@ -0,0 +1,149 @@
+import time
+from collections import OrderedDict, Counter
+from datetime import datetime
+
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+
+class PostDedupe:
+    """Bounded LRU/TTL record of starboard posts already made, optionally backed by MongoDB
+
+    Posts are keyed on the original Poketwo message ID plus the Pokemon's index in that message
+    (0 for catches and hatches, the position in the box for unboxes), so the listener, the
+    manual check commands and gateway redeliveries all agree on what has been posted.
+    """
+
+    def __init__(self, max_entries=10000, ttl=6 * 3600, persist=True, persist_ttl=7 * 24 * 3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.persist = persist
+        self.persist_ttl = persist_ttl
+        # (message_id, index) -> expires_at, oldest first
+        self._entries = OrderedDict()
+        self._index_ready = False
+        self.counts = Counter()
+
+    def _seen(self, key):
+        expires_at = self._entries.get(key)
+        if expires_at is None:
+            return False
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return False
+        self._entries.move_to_end(key)
+        return True
+
+    def _remember(self, key):
+        self._entries[key] = time.monotonic() + self.ttl
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.counts['evicted'] += 1
+
+    def forget(self, message_id, index=0):
+        self._entries.pop((message_id, index), None)
+
+    async def _ensure_index(self, db):
+        if self._index_ready:
+            return
+        # MongoDB removes claims on its own once they age out
+        await db.starboard_posts.create_index("created_at", expireAfterSeconds=self.persist_ttl)
+        self._index_ready = True
+
+    async def claim(self, db, message_id, index=0):
+        """Return True if this post has not been made yet and the caller should make it"""
+        key = (message_id, index)
+        if self._seen(key):
+            self.counts['duplicates'] += 1
+            return False
+
+        # Claim in memory before any await so concurrent callers in this process see it
+        self._remember(key)
+
+        if self.persist and db is not None:
+            try:
+                await self._ensure_index(db)
+                await db.starboard_posts.insert_one({
+                    "_id": f"{message_id}:{index}",
+                    "created_at": datetime.utcnow()
+                })
+            except DuplicateKeyError:
+                # Posted before a restart
+                self.counts['duplicates'] += 1
+                self.counts['persisted_duplicates'] += 1
+                return False
+            except Exception as e:
+                # Fail open: a missed duplicate beats a missed post
+                print(f"Error persisting starboard post claim: {e}")
+                self.counts['persist_errors'] += 1
+
+        self.counts['claimed'] += 1
+        return True
+
+    async def claim_many(self, db, message_id, indexes):
+        """Claim several posts from one message at once; returns the indexes the caller should post
+
+        Used for boxes: the claims not already held in memory go to MongoDB as one unordered
+        insert_many, and the per-document duplicate key errors say which were posted before.
+        """
+        claimed = []
+        for index in indexes:
+            key = (message_id, index)
+            if self._seen(key):
+                self.counts['duplicates'] += 1
+                continue
+            self._remember(key)
+            claimed.append(index)
+
+        if claimed and self.persist and db is not None:
+            now = datetime.utcnow()
+            try:
+                await self._ensure_index(db)
+                await db.starboard_posts.insert_many(
+                    [{"_id": f"{message_id}:{index}", "created_at": now} for index in claimed],
+                    ordered=False
+                )
+            except BulkWriteError as e:
+                # Posted before a restart; any other write error fails open like claim does
+                duplicates = {error['index'] for error in e.details.get('writeErrors', []) if error.get('code') == 11000}
+                if len(duplicates) < len(e.details.get('writeErrors', [])):
+                    print("Error persisting starboard post claims: some writes failed")
+                    self.counts['persist_errors'] += 1
+                self.counts['duplicates'] += len(duplicates)
+                self.counts['persisted_duplicates'] += len(duplicates)
+                claimed = [index for position, index in enumerate(claimed) if position not in duplicates]
+            except Exception as e:
+                print(f"Error persisting starboard post claims: {e}")
+                self.counts['persist_errors'] += 1
+
+        self.counts['claimed'] += len(claimed)
+        return claimed
+
+    async def release(self, db, message_id, indexes=(0,)):
+        """Drop claims whose posts were never queued, so a later check or backfill can post them"""
+        for index in indexes:
+            self.forget(message_id, index)
+        self.counts['released'] += len(indexes)
+
+        if self.persist and db is not None:
+            try:
+                await db.starboard_posts.delete_many({"_id": {"$in": [f"{message_id}:{index}" for index in indexes]}})
+            except Exception as e:
+                print(f"Error releasing starboard post claims: {e}")
+                self.counts['persist_errors'] += 1
+
+    def stats(self):
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            **self.counts
+        }
+
+
+def get_post_dedupe(bot):
+    """Return the dedupe cache held by the bot, creating it on first use"""
+    dedupe = getattr(bot, 'post_dedupe', None)
+    if dedupe is None:
+        dedupe = PostDedupe()
+        bot.post_dedupe = dedupe
+    return dedupe
@@ -0,0 +1,128 @@
+from collections import Counter
+
+from .recent import get_recent_messages
+from .resolver import get_message_resolver
+
+POKETWO_ID = 716390085896962058
+
+# Embed title keywords that mark a box, chest or bundle opening
+BOX_TITLE_KEYWORDS = ('open', 'opening', 'box', 'chest', 'mystery', 'egg', 'eggs', 'bundle', 'puddle', 'rain', 'storm')
+
+# Message classes, in the order they are tested
+HATCH = 'hatch'
+MISSINGNO = 'missingno'
+CATCH = 'catch'
+BOX = 'box'
+IRRELEVANT = 'irrelevant'
+MESSAGE_CLASSES = (HATCH, MISSINGNO, CATCH, BOX, IRRELEVANT)
+
+
+def is_box_opening_title(title):
+    """Check whether an embed title looks like a box or bundle opening"""
+    title = title.lower()
+    return any(keyword in title for keyword in BOX_TITLE_KEYWORDS)
+
+
+def classify_poketwo_message(message):
+    """Classify a Poketwo message with plain substring checks, cheapest first"""
+    content = message.content
+
+    if content:
+        if "has hatched into" in content and "Egg" in content:
+            return HATCH
+        if "MissingNo." in content:
+            return MISSINGNO
+        if content.startswith("Congratulations"):
+            return CATCH
+
+    if message.embeds and is_box_opening_title(message.embeds[0].title or ""):
+        return BOX
+
+    return IRRELEVANT
+
+
+class PoketwoDispatcher:
+    """Single on_message listener that routes each Poketwo message to the one cog handling its class"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.handlers = {}
+        self.counts = Counter()
+        self.resolver = get_message_resolver(bot)
+        self.recent = get_recent_messages(bot)
+        bot.add_listener(self.on_message, 'on_message')
+
+    def register(self, message_class, handler):
+        """Route a message class to a coroutine handler(message)
+
+        The handler returns what became of the starboard post (see outbound), or None if the
+        message didn't qualify; only replay passes that on.
+        """
+        self.handlers[message_class] = handler
+
+    def unregister(self, message_class, handler):
+        """Stop routing a message class, if it is still routed to this handler"""
+        if self.handlers.get(message_class) == handler:
+            del self.handlers[message_class]
+
+    def stats(self):
+        """Per-class message counts plus the share that was discarded early"""
+        total = sum(self.counts[message_class] for message_class in MESSAGE_CLASSES)
+        discarded = self.counts[IRRELEVANT] + self.counts['unhandled']
+        return {
+            'total': total,
+            'discarded': discarded,
+            'discarded_ratio': discarded / total if total else 0.0,
+            **{message_class: self.counts[message_class] for message_class in MESSAGE_CLASSES},
+            'unhandled': self.counts['unhandled']
+        }
+
+    async def replay(self, message):
+        """Route an older Poketwo message, e.g. from a backfill, without touching the live counters
+
+        Returns (message class, what the handler did with its post), or (None, None) if nothing
+        handles it. Handler errors are left to the caller.
+        """
+        message_class = classify_poketwo_message(message)
+        handler = self.handlers.get(message_class)
+        if handler is None:
+            return None, None
+        return message_class, await handler(message)
+
+    async def on_message(self, message):
+        # Only process messages from Poketwo
+        if message.author.id != POKETWO_ID:
+            # Poketwo may reply to this shortly; knowing its author saves a fetch_message then
+            if not message.author.bot:
+                self.recent.add_user_message(message)
+            return
+
+        # Buffer every Poketwo message, so manual checks by ID rarely need the API
+        self.recent.add(message)
+
+        message_class = classify_poketwo_message(message)
+        self.counts[message_class] += 1
+        if message_class == IRRELEVANT:
+            return
+
+        # Remember where it lives, so manual checks by message ID find it straight away
+        self.resolver.remember(message)
+
+        handler = self.handlers.get(message_class)
+        if handler is None:
+            self.counts['unhandled'] += 1
+            return
+
+        try:
+            await handler(message)
+        except Exception as e:
+            print(f"Error handling Poketwo {message_class} message: {e}")
+
+
+def get_dispatcher(bot):
+    """Return the dispatcher held by the bot, creating it and its listener on first use"""
+    dispatcher = getattr(bot, 'poketwo_dispatcher', None)
+    if dispatcher is None:
+        dispatcher = PoketwoDispatcher(bot)
+        bot.poketwo_dispatcher = dispatcher
+    return dispatcher
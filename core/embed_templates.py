@@ -0,0 +1,160 @@
+import discord
+from datetime import datetime
+from config import EMBED_COLOR
+
+GIGANTAMAX_EMOJI = "<:gigantamax:1420708122267226202>"
+EGG_EMOJI = "<:egg:1427226230352117825>"
+MISSINGNO_EMOJI = "<:missingno:1420713960465760357>"
+GIFTBOX_EMOJI = "<:giftbox:1421047453511323658>"
+ANIMATED_GIFTBOX_EMOJI = "<a:animatedgiftbox:1421047436625055754>"
+
+GENDER_EMOJIS = {
+    'male': "<:male:1420708128785170453>",
+    'female': "<:female:1420708136943095889>",
+    'unknown': "<:unknown:1420708112310210560>"
+}
+
+# Keyword arguments for the link button every starboard post carries; the emoji is parsed once here
+JUMP_BUTTON = {
+    'label': "Jump to Message",
+    'emoji': discord.PartialEmoji(name="🔗"),
+    'style': discord.ButtonStyle.link
+}
+
+# Description layouts; the "by" line is left out when the user isn't known
+DESCRIPTIONS = {
+    'catch': "**Caught By:** <@{user_id}>\n**Pokémon:** {pokemon}\n**Level:** {level}\n**IV:** {iv}",
+    'missingno': "**Caught By:** <@{user_id}>\n**Pokémon:** {pokemon}\n**Level:** ???\n**IV:** {iv}",
+    'hatch': "**Pokémon:** {pokemon}\n**Level:** {level}\n**IV:** {iv}",
+    'unbox': "**Pokémon:** {pokemon}\n**Level:** {level}\n**IV:** {iv}"
+}
+BY_LINES = {
+    'hatch': "**Hatched By:** <@{user_id}>\n",
+    'unbox': "**Unboxed By:** <@{user_id}>\n"
+}
+DEFAULT_TITLES = {
+    'hatch': "Rare Hatch Detected"
+}
+
+
+def _catch_titles():
+    # (embed type, title, Eternatus title); None means Eternatus uses the same title
+    gmax = GIGANTAMAX_EMOJI
+    return [
+        ('shiny_gigantamax_rare_iv_high',
+         f"✨ {gmax} 📈 Shiny Gmax High IV Catch Detected 📈 {gmax} ✨",
+         f"✨ {gmax} 📈 Shiny Eternamax High IV Catch Detected 📈 {gmax} ✨"),
+        ('shiny_gigantamax_rare_iv_low',
+         f"✨ {gmax} 📉 Shiny Gmax Low IV Catch Detected 📉 {gmax} ✨",
+         f"✨ {gmax} 📉 Shiny Eternamax Low IV Catch Detected 📉 {gmax} ✨"),
+        ('shiny_gigantamax',
+         f"✨ {gmax} Shiny Gigantamax Catch Detected {gmax} ✨",
+         f"✨ {gmax} Shiny Eternamax Catch Detected {gmax} ✨"),
+        ('shiny_rare_iv_high', "✨ 📈 Shiny High IV Catch Detected 📈 ✨", None),
+        ('shiny_rare_iv_low', "✨ 📉 Shiny Low IV Catch Detected 📉 ✨", None),
+        ('gigantamax_rare_iv_high',
+         f"{gmax} 📈 Gigantamax High IV Catch Detected 📈 {gmax}",
+         f"{gmax} 📈 Eternamax High IV Catch Detected 📈 {gmax}"),
+        ('gigantamax_rare_iv_low',
+         f"{gmax} 📉 Gigantamax Low IV Catch Detected 📉 {gmax}",
+         f"{gmax} 📉 Eternamax Low IV Catch Detected 📉 {gmax}"),
+        ('gigantamax',
+         f"{gmax} Gigantamax Catch Detected {gmax}",
+         f"{gmax} Eternamax Catch Detected {gmax}"),
+        ('shiny', "✨ Shiny Catch Detected ✨", None),
+        ('iv_high', "📈 High IV Catch Detected 📈", None),
+        ('iv_low', "📉 Low IV Catch Detected 📉", None)
+    ]
+
+
+def _hatch_titles():
+    egg = EGG_EMOJI
+    gmax = GIGANTAMAX_EMOJI
+    return {
+        'shiny_gmax_high_iv': f"{egg}{gmax} ✨ 📈 Ultimate Hatch - Shiny Gigantamax High IV! 📈 ✨ {gmax}{egg}",
+        'shiny_gmax_low_iv': f"{egg}{gmax} ✨ 📉 Ultimate Hatch - Shiny Gigantamax Low IV! 📉 ✨ {gmax}{egg}",
+        'shiny_gmax': f"{egg}{gmax} ✨ Gigantamax Sparkling Hatch Detected ✨ {gmax}{egg}",
+        'shiny_high_iv': f"{egg}✨ 📈 Sparkling High IV Hatch Detected 📈 ✨{egg}",
+        'shiny_low_iv': f"{egg}✨ 📉 Sparkling Low IV Hatch Detected 📉 ✨{egg}",
+        'gmax_high_iv': f"{egg}{gmax} 📈 Gigantamax High IV Hatch Detected 📈 {gmax}{egg}",
+        'gmax_low_iv': f"{egg}{gmax} 📉 Gigantamax Low IV Hatch Detected 📉 {gmax}{egg}",
+        'gigantamax': f"{egg}{gmax} Gigantamax Hatch Detected {gmax}{egg}",
+        'shiny': f"{egg}✨ Sparkling Hatch Detected ✨{egg}",
+        'iv_high': f"{egg}📈 Rare IV Hatch Detected 📈{egg}",
+        'iv_low': f"{egg}📉 Rare IV Hatch Detected 📉{egg}"
+    }
+
+
+def _unbox_titles():
+    gmax = GIGANTAMAX_EMOJI
+    return {
+        'gigantamax_shiny': f"{gmax} ✨ Gigantamax Shiny Unbox Detected ✨ {gmax}",
+        'gigantamax': f"{gmax} Gigantamax Unbox Detected {gmax}",
+        'shiny': f"{ANIMATED_GIFTBOX_EMOJI}  ✨ Shiny Unbox Detected ✨ {ANIMATED_GIFTBOX_EMOJI} ",
+        'iv_high': f"{GIFTBOX_EMOJI} 📈 High IV Unboxed 📈 {GIFTBOX_EMOJI}",
+        'iv_low': f"{GIFTBOX_EMOJI} 📉 Low IV Unboxed 📉 {GIFTBOX_EMOJI}"
+    }
+
+
+def build_embed_titles():
+    """Every starboard title, keyed by (message type, embed type, is Eternatus)"""
+    titles = {}
+    for embed_type, title, eternatus_title in _catch_titles():
+        titles[('catch', embed_type, False)] = title
+        titles[('catch', embed_type, True)] = eternatus_title or title
+
+    # MissingNo. has one embed type; the shiny variant is keyed as 'shiny'
+    for is_eternatus in (False, True):
+        titles[('missingno', 'missingno', is_eternatus)] = f"{MISSINGNO_EMOJI} MissingNo. Detected {MISSINGNO_EMOJI}"
+        titles[('missingno', 'shiny', is_eternatus)] = "✨ Shiny MissingNo. Detected ✨"
+
+    # Hatch and unbox titles don't change for Eternatus
+    for message_type, type_titles in (('hatch', _hatch_titles()), ('unbox', _unbox_titles())):
+        for embed_type, title in type_titles.items():
+            for is_eternatus in (False, True):
+                titles[(message_type, embed_type, is_eternatus)] = title
+
+    return titles
+
+
+EMBED_TITLES = build_embed_titles()
+
+
+def format_iv(iv):
+    """IV as shown on a post: a percentage, or Hidden/??? passed through"""
+    if iv == "Hidden" or iv == "???":
+        return iv
+    return f"{iv}%"
+
+
+def format_pokemon(pokemon_name, gender):
+    """Pokemon name followed by its gender emoji, if the gender is known"""
+    gender_emoji = GENDER_EMOJIS.get(gender)
+    if gender_emoji:
+        return f"{pokemon_name} {gender_emoji}"
+    return pokemon_name
+
+
+def render_embed(message_type, embed_type, is_eternatus, pokemon, level, iv, user_id=None, image_url=None):
+    """Fill a precomputed template with one event's fields"""
+    description = DESCRIPTIONS[message_type].format(user_id=user_id, pokemon=pokemon, level=level, iv=format_iv(iv))
+    if user_id and message_type in BY_LINES:
+        description = BY_LINES[message_type].format(user_id=user_id) + description
+
+    embed = discord.Embed(
+        title=EMBED_TITLES.get((message_type, embed_type, is_eternatus), DEFAULT_TITLES.get(message_type)),
+        description=description,
+        color=EMBED_COLOR,
+        timestamp=datetime.utcnow()
+    )
+    if image_url:
+        embed.set_thumbnail(url=image_url)
+    return embed
+
+
+def jump_view(message=None):
+    """View holding the jump-to-message link button, empty if there's no message"""
+    view = discord.ui.View()
+    if message:
+        view.add_item(discord.ui.Button(url=message.jump_url, **JUMP_BUTTON))
+    return view
@@ -0,0 +1,170 @@
+import asyncio
+from collections import Counter
+from datetime import datetime
+
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import BulkWriteError
+
+# Compound indexes for per-guild and per-user history, newest first. _id breaks ties between
+# Pokemon from the same box so history pages can resume from an exact (created_at, _id) cursor.
+EVENT_INDEXES = [
+    [("guild_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+    [("guild_id", ASCENDING), ("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+    [("guild_id", ASCENDING), ("species_key", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+    [("user_id", ASCENDING), ("created_at", DESCENDING)]
+]
+
+# Only IVs at or beyond these qualify as rare
+RARE_IV_HIGH = 90
+RARE_IV_LOW = 10
+
+# Partial indexes behind the history filters, so a filtered page is still a bounded walk in
+# created_at order however rare the filter is. iv trails the sort keys, so a narrower range
+# inside a rare band is checked against the index keys before any document is fetched.
+EVENT_FILTER_INDEXES = [
+    ([("guild_id", ASCENDING), ("shiny", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+     {"partialFilterExpression": {"shiny": True}}),
+    ([("guild_id", ASCENDING), ("gigantamax", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+     {"partialFilterExpression": {"gigantamax": True}}),
+    ([("guild_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING), ("iv", DESCENDING)],
+     {"partialFilterExpression": {"iv": {"$gte": RARE_IV_HIGH}}}),
+    ([("guild_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING), ("iv", ASCENDING)],
+     {"partialFilterExpression": {"iv": {"$lte": RARE_IV_LOW}}})
+]
+
+
+def iv_value(iv):
+    """IV as a number for storage and queries, or None when it is hidden or unknown"""
+    try:
+        return float(iv)
+    except (TypeError, ValueError):
+        return None
+
+
+def build_event(event_data, embed_types, guild_id, user_id, message=None, box_index=0):
+    """Flatten a parsed catch, hatch or unbox dict into a starboard_events record"""
+    return {
+        'guild_id': guild_id,
+        'user_id': int(user_id) if user_id else None,
+        'type': event_data.get('message_type'),
+        'species': event_data['pokemon_name'],
+        'species_key': event_data['pokemon_name'].lower(),
+        'level': event_data.get('level'),
+        'iv': iv_value(event_data.get('iv')),
+        'gender': event_data.get('gender'),
+        'shiny': event_data['is_shiny'],
+        'gigantamax': event_data['is_gigantamax'],
+        'embed_types': list(embed_types),
+        'message_id': message.id if message else None,
+        'channel_id': message.channel.id if message else None,
+        'box_index': box_index,
+        'created_at': message.created_at if message else datetime.utcnow()
+    }
+
+
+class EventStore:
+    """Buffered writer for the starboard_events collection
+
+    Events are held in memory and written with one insert_many per batch, either when the
+    batch fills or on the flush interval, whichever comes first.
+    """
+
+    def __init__(self, batch_size=100, flush_interval=5.0, max_buffer=5000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self._buffer = []
+        self._flusher = None
+        self._batch_full = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._indexes_ready = False
+        self.counts = Counter()
+
+    @property
+    def db(self):
+        """Get database from main module"""
+        import __main__
+        return getattr(__main__, 'db', None)
+
+    def record(self, event):
+        """Buffer one event for the next batch write"""
+        if len(self._buffer) >= self.max_buffer:
+            # MongoDB has been unreachable for a while; keep the newest events
+            del self._buffer[0]
+            self.counts['dropped'] += 1
+        self._buffer.append(event)
+        self.counts['recorded'] += 1
+
+        if len(self._buffer) >= self.batch_size:
+            self._batch_full.set()
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._run())
+
+    async def _run(self):
+        # Flush on the interval, or straight away once a full batch is waiting
+        while self._buffer:
+            try:
+                await asyncio.wait_for(self._batch_full.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._batch_full.clear()
+            await self.flush()
+
+    async def _ensure_indexes(self, db):
+        if self._indexes_ready:
+            return
+        for keys in EVENT_INDEXES:
+            await db.starboard_events.create_index(keys)
+        for keys, options in EVENT_FILTER_INDEXES:
+            await db.starboard_events.create_index(keys, **options)
+        self._indexes_ready = True
+
+    async def flush(self):
+        """Write everything buffered so far; failed batches go back to the front of the buffer"""
+        async with self._flush_lock:
+            db = self.db
+            if db is None or not self._buffer:
+                return
+
+            while self._buffer:
+                batch = self._buffer[:self.batch_size]
+                del self._buffer[:len(batch)]
+                try:
+                    await self._ensure_indexes(db)
+                    await db.starboard_events.insert_many(batch, ordered=False)
+                    self.counts['written'] += len(batch)
+                    self.counts['batches'] += 1
+                except BulkWriteError as e:
+                    # Individual documents were rejected; retrying them won't help
+                    written = e.details.get('nInserted', 0)
+                    print(f"Error writing starboard events: {len(batch) - written} of {len(batch)} rejected")
+                    self.counts['written'] += written
+                    self.counts['rejected'] += len(batch) - written
+                except Exception as e:
+                    print(f"Error writing starboard events: {e}")
+                    self.counts['failed_batches'] += 1
+                    self._buffer[:0] = batch
+                    return
+
+    async def close(self):
+        """Stop the interval flusher and write what is left"""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            self._flusher = None
+        await self.flush()
+
+    def stats(self):
+        return {
+            'buffered': len(self._buffer),
+            'batch_size': self.batch_size,
+            **self.counts
+        }
+
+
+def get_event_store(bot):
+    """Return the event store held by the bot, creating it on first use"""
+    store = getattr(bot, 'event_store', None)
+    if store is None:
+        store = EventStore()
+        bot.event_store = store
+    return store
@@ -0,0 +1,173 @@
+import asyncio
+import time
+from collections import Counter
+
+from pymongo import DESCENDING
+
+LEADERBOARD_CATEGORIES = ('shiny', 'gigantamax', 'rare_iv')
+GLOBAL_SCOPE = 'global'
+
+
+def event_categories(event):
+    """Leaderboard categories a starboard_events record counts towards"""
+    categories = []
+    if event['shiny']:
+        categories.append('shiny')
+    if event['gigantamax']:
+        categories.append('gigantamax')
+    iv = event.get('iv')
+    if iv is not None and (iv >= 90 or iv <= 10):
+        categories.append('rare_iv')
+    return categories
+
+
+class Leaderboards:
+    """Per-guild and global leaderboards kept as $inc counters in leaderboard_counts
+
+    Counting is buffered like the event store: record only adds to in-memory increments, and
+    every flush_interval one $inc per (scope, user) is written off the message path. Boards are
+    read through the (scope, category) index and served from memory for board_ttl seconds, so
+    counts written by other shard processes show up within that; a flush drops the boards it
+    touched so this process's own counts show up on the next read.
+    """
+
+    def __init__(self, top_k=10, flush_interval=5.0, board_ttl=60.0):
+        self.top_k = top_k
+        self.flush_interval = flush_interval
+        self.board_ttl = board_ttl
+        # (scope, user_id) -> Counter of category increments not yet written
+        self._pending = {}
+        self._flusher = None
+        self._flush_lock = asyncio.Lock()
+        # (scope, category) -> (monotonic load time, [(user_id, count)] highest first)
+        self._boards = {}
+        self._loading = {}
+        # (scope, category) -> flushes that touched it, so a load in flight can tell it is stale
+        self._versions = Counter()
+        self._indexes_ready = False
+        self.counts = Counter()
+
+    @property
+    def db(self):
+        """Get database from main module"""
+        import __main__
+        return getattr(__main__, 'db', None)
+
+    async def _ensure_indexes(self, db):
+        if self._indexes_ready:
+            return
+        for category in LEADERBOARD_CATEGORIES:
+            await db.leaderboard_counts.create_index([("scope", 1), (category, DESCENDING)])
+        self._indexes_ready = True
+
+    def record(self, event, guild_id):
+        """Count a qualifying event towards its guild's and the global leaderboards, without waiting"""
+        user_id = event.get('user_id')
+        categories = event_categories(event)
+        if not user_id or not categories:
+            return
+
+        for scope in (guild_id, GLOBAL_SCOPE):
+            self._pending.setdefault((scope, user_id), Counter()).update(categories)
+        self.counts['recorded'] += 1
+
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while self._pending:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def _increment(self, db, scope, user_id, increments):
+        await db.leaderboard_counts.update_one(
+            {"_id": f"{scope}:{user_id}"},
+            {
+                "$inc": dict(increments),
+                "$setOnInsert": {"scope": scope, "user_id": user_id}
+            },
+            upsert=True
+        )
+
+    async def flush(self):
+        """Write the buffered counts; failed ones stay buffered for the next flush"""
+        async with self._flush_lock:
+            db = self.db
+            if db is None or not self._pending:
+                return
+
+            pending, self._pending = self._pending, {}
+            try:
+                await self._ensure_indexes(db)
+                results = await asyncio.gather(
+                    *(self._increment(db, scope, user_id, increments) for (scope, user_id), increments in pending.items()),
+                    return_exceptions=True
+                )
+            except Exception as e:
+                results = [e] * len(pending)
+
+            failed = 0
+            for ((scope, user_id), increments), result in zip(pending.items(), results):
+                if isinstance(result, Exception):
+                    failed += 1
+                    self._pending.setdefault((scope, user_id), Counter()).update(increments)
+                    continue
+                self.counts['written'] += 1
+                for category in increments:
+                    key = (scope, category)
+                    self._versions[key] += 1
+                    self._boards.pop(key, None)
+            if failed:
+                print(f"Error updating leaderboards: {failed} of {len(pending)} counter writes failed")
+                self.counts['failed'] += failed
+
+    async def close(self):
+        """Stop the interval flusher and write what is left"""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            self._flusher = None
+        await self.flush()
+
+    async def _load(self, db, scope, category):
+        key = (scope, category)
+        version = self._versions[key]
+        documents = await db.leaderboard_counts.find(
+            {"scope": scope, category: {"$gt": 0}},
+            {"user_id": 1, category: 1}
+        ).sort(category, DESCENDING).limit(self.top_k).to_list(length=self.top_k)
+
+        board = [(document['user_id'], document[category]) for document in documents]
+        # A flush that landed while this read was in flight may not be in it
+        if self._versions[key] == version:
+            self._boards[key] = (time.monotonic(), board)
+        return board
+
+    async def top(self, db, scope, category):
+        """Return [(user_id, count)] for a board, highest first"""
+        key = (scope, category)
+        cached = self._boards.get(key)
+        if cached is not None and time.monotonic() - cached[0] < self.board_ttl:
+            return list(cached[1])
+
+        # Concurrent reads share one load
+        loading = self._loading.get(key)
+        if loading is None:
+            loading = self._loading[key] = asyncio.ensure_future(self._load(db, scope, category))
+            loading.add_done_callback(lambda _: self._loading.pop(key, None))
+        return list(await asyncio.shield(loading))
+
+    def stats(self):
+        return {
+            'pending': len(self._pending),
+            'boards': len(self._boards),
+            **self.counts
+        }
+
+
+def get_leaderboards(bot):
+    """Return the leaderboards held by the bot, creating them on first use"""
+    leaderboards = getattr(bot, 'leaderboards', None)
+    if leaderboards is None:
+        leaderboards = Leaderboards()
+        bot.leaderboards = leaderboards
+    return leaderboards
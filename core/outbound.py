@@ -0,0 +1,241 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections import Counter
+
+# Discord limits per message
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+
+# Post priorities, lowest first out
+PRIORITY_MISSINGNO = 0
+PRIORITY_SHINY_GIGANTAMAX = 1
+PRIORITY_SHINY_OR_GIGANTAMAX = 2
+PRIORITY_RARE_IV = 3
+PRIORITY_NAMES = {
+    PRIORITY_MISSINGNO: 'missingno',
+    PRIORITY_SHINY_GIGANTAMAX: 'shiny gigantamax',
+    PRIORITY_SHINY_OR_GIGANTAMAX: 'shiny or gigantamax',
+    PRIORITY_RARE_IV: 'rare iv'
+}
+
+# What send_to_starboard_channels did with a message, and why a manual check posted nothing
+QUEUED = 'queued'
+NOT_QUALIFYING = 'not qualifying'
+ALREADY_POSTED = 'already posted'
+NO_STARBOARD = 'no starboard'
+DROPPED = 'dropped'
+NOT_SENT_REASONS = {
+    NOT_QUALIFYING: "no starboard criteria met",
+    ALREADY_POSTED: "already posted to starboard",
+    NO_STARBOARD: "no starboard channel is set",
+    DROPPED: "the starboard queue is full, try again shortly"
+}
+
+
+def starboard_targets(server_starboard_channel, global_starboard_channel):
+    """List the configured starboard channels as (target name, channel) pairs"""
+    targets = []
+    if server_starboard_channel:
+        targets.append(('server starboard', server_starboard_channel))
+    if global_starboard_channel:
+        targets.append(('global starboard', global_starboard_channel))
+    return targets
+
+
+def pack_embeds(embeds, max_embeds=MAX_EMBEDS_PER_MESSAGE, max_chars=MAX_EMBED_CHARS_PER_MESSAGE):
+    """Split embeds, in order, into as few message-sized groups as Discord's count and size limits allow"""
+    groups = []
+    current = []
+    current_chars = 0
+    for embed in embeds:
+        embed_chars = len(embed)
+        if current and (len(current) >= max_embeds or current_chars + embed_chars > max_chars):
+            groups.append(current)
+            current = []
+            current_chars = 0
+        current.append(embed)
+        current_chars += embed_chars
+    if current:
+        groups.append(current)
+    return groups
+
+
+def post_priority(event_data):
+    """Priority class for a parsed catch, hatch or unboxed Pokemon"""
+    if event_data.get('message_type') == 'missingno':
+        return PRIORITY_MISSINGNO
+    if event_data['is_shiny'] and event_data['is_gigantamax']:
+        return PRIORITY_SHINY_GIGANTAMAX
+    if event_data['is_shiny'] or event_data['is_gigantamax']:
+        return PRIORITY_SHINY_OR_GIGANTAMAX
+    return PRIORITY_RARE_IV
+
+
+class TokenBucket:
+    """Per-channel send allowance that refills continuously"""
+
+    def __init__(self, capacity, refill_per_second):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def take(self):
+        """Consume a token and return 0, or return the seconds until one is available"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_per_second)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.refill_per_second
+
+
+class PostQueue:
+    """Shared outbound starboard queue with priorities and per-channel pacing
+
+    Each channel gets its own heap and worker task. Within a channel, posts leave by priority
+    and then in submission order, so a box's messages stay in sequence. Channels are paced by a
+    token bucket sized to Discord's 5 messages per 5 seconds per channel, so a busy starboard
+    never holds up another one or the listener that produced the post.
+    """
+
+    def __init__(self, max_pending=1000, bucket_capacity=5, bucket_refill_per_second=1.0):
+        self.max_pending = max_pending
+        self.bucket_capacity = bucket_capacity
+        self.bucket_refill_per_second = bucket_refill_per_second
+
+        self._heaps = {}
+        self._workers = {}
+        self._buckets = {}
+        self._sequence = itertools.count()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        # owner -> posts still pending and an event set once there are none, for per-cog drains
+        self._owner_pending = Counter()
+        self._owner_idle = {}
+        # Set whenever a post leaves the queue, for producers waiting on capacity
+        self._room = asyncio.Event()
+
+        self.pending = 0
+        self.pending_high_water = 0
+        self.max_wait = 0.0
+        self.counts = Counter()
+
+    def submit(self, posts, priority=PRIORITY_RARE_IV, owner=None):
+        """Queue (target name, channel, send kwargs) posts without waiting; returns how many were accepted
+
+        owner names whoever queued the posts (a cog), so drain can wait on just its posts.
+        """
+        accepted = 0
+        for target, channel, send_kwargs in posts:
+            if self.pending >= self.max_pending:
+                # Backpressure: shed new work instead of growing without bound
+                self.counts['dropped'] += 1
+                print(f"Outbound queue full ({self.pending} pending), dropping post to {target}")
+                continue
+
+            heap = self._heaps.setdefault(channel.id, [])
+            heapq.heappush(heap, (priority, next(self._sequence), target, channel, send_kwargs, time.monotonic(), owner))
+            self.pending += 1
+            self._owner_pending[owner] += 1
+            self._owner_idle.setdefault(owner, asyncio.Event()).clear()
+            self.pending_high_water = max(self.pending_high_water, self.pending)
+            self.counts['enqueued'] += 1
+            self.counts[PRIORITY_NAMES[priority]] += 1
+            self._idle.clear()
+            accepted += 1
+
+            if channel.id not in self._workers:
+                self._workers[channel.id] = asyncio.create_task(self._run_channel(channel.id))
+
+        return accepted
+
+    async def _run_channel(self, channel_id):
+        heap = self._heaps[channel_id]
+        bucket = self._buckets.get(channel_id)
+        if bucket is None:
+            bucket = self._buckets[channel_id] = TokenBucket(self.bucket_capacity, self.bucket_refill_per_second)
+
+        try:
+            while heap:
+                delay = bucket.take()
+                if delay:
+                    self.counts['throttled'] += 1
+                    await asyncio.sleep(delay)
+                    continue
+
+                _, _, target, channel, send_kwargs, enqueued_at, owner = heapq.heappop(heap)
+                self.max_wait = max(self.max_wait, time.monotonic() - enqueued_at)
+                try:
+                    await channel.send(**send_kwargs)
+                    self.counts['sent'] += 1
+                except Exception as e:
+                    print(f"Error sending to {target}: {e}")
+                    self.counts['failed'] += 1
+                    self.counts[f'failed {target}'] += 1
+                finally:
+                    self.pending -= 1
+                    self._room.set()
+                    self._owner_pending[owner] -= 1
+                    if not self._owner_pending[owner]:
+                        del self._owner_pending[owner]
+                        self._owner_idle[owner].set()
+        finally:
+            del self._workers[channel_id]
+            if not heap:
+                del self._heaps[channel_id]
+            if not self.pending:
+                self._idle.set()
+
+    async def wait_for_capacity(self, room):
+        """Wait until at least room more posts would be accepted
+
+        For bulk producers such as backfill, which would otherwise outrun the channel pacing
+        and have their posts dropped once the queue fills.
+        """
+        room = min(room, self.max_pending)
+        while self.max_pending - self.pending < room:
+            self.counts['capacity_waits'] += 1
+            self._room.clear()
+            await self._room.wait()
+
+    async def drain(self, timeout=10, owner=None):
+        """Wait for queued posts to be sent; returns how many were still pending at the timeout
+
+        With an owner, waits only for the posts that owner submitted, so one cog unloading
+        isn't held up by another's backlog.
+        """
+        if owner is None:
+            idle = self._idle
+        else:
+            idle = self._owner_idle.get(owner)
+            if idle is None:
+                return 0
+        try:
+            await asyncio.wait_for(idle.wait(), timeout)
+        except asyncio.TimeoutError:
+            pending = self.pending if owner is None else self._owner_pending[owner]
+            print(f"Outbound queue drain timed out with {pending} post(s) pending")
+        return self.pending if owner is None else self._owner_pending[owner]
+
+    def stats(self):
+        return {
+            'pending': self.pending,
+            'pending_high_water': self.pending_high_water,
+            'max_pending': self.max_pending,
+            'max_wait': self.max_wait,
+            'active_channels': len(self._workers),
+            **self.counts
+        }
+
+
+def get_post_queue(bot):
+    """Return the outbound queue held by the bot, creating it on first use"""
+    queue = getattr(bot, 'post_queue', None)
+    if queue is None:
+        queue = PostQueue()
+        bot.post_queue = queue
+    return queue
@@ -0,0 +1,189 @@
+from collections import deque, Counter, OrderedDict
+
+
+class RecentAuthor:
+    __slots__ = ('id',)
+
+    def __init__(self, author_id):
+        self.id = author_id
+
+
+class RecentReference:
+    __slots__ = ('message_id', 'resolved')
+
+    def __init__(self, message_id):
+        self.message_id = message_id
+        # Never holds the referenced message; reply_author_id on the record keeps its author
+        self.resolved = None
+
+
+class RecentMessage:
+    """Compact copy of a Poketwo message, usable wherever the cogs read a discord.Message"""
+
+    __slots__ = ('id', 'author_id', 'channel', 'content', 'embeds', 'created_at', 'reference', 'reply_author_id')
+
+    def __init__(self, message):
+        self.id = message.id
+        self.author_id = message.author.id
+        # Channels are long-lived objects in discord.py's cache, so this is only a reference
+        self.channel = message.channel
+        self.content = message.content
+        self.embeds = message.embeds
+        self.created_at = message.created_at
+        self.reference = None
+        self.reply_author_id = None
+
+        if message.reference:
+            self.reference = RecentReference(message.reference.message_id)
+            resolved = message.reference.resolved
+            if resolved is not None and getattr(resolved, 'author', None) is not None:
+                self.reply_author_id = resolved.author.id
+
+    @property
+    def author(self):
+        return RecentAuthor(self.author_id)
+
+    @property
+    def guild(self):
+        return self.channel.guild
+
+    @property
+    def jump_url(self):
+        return f"https://discord.com/channels/{self.channel.guild.id}/{self.channel.id}/{self.id}"
+
+
+class UserMessageAuthors:
+    """Authors of the last few user messages in each channel, keyed by message ID
+
+    Poketwo replies to the command that triggered it, so the command's author is who hatched
+    the egg or opened the box. Only IDs are kept; channels that go quiet are dropped first.
+    """
+
+    def __init__(self, per_channel=50, max_channels=5000):
+        self.per_channel = per_channel
+        self.max_channels = max_channels
+        # channel_id -> OrderedDict(message_id -> author_id), least recently active channel first
+        self._channels = OrderedDict()
+        self.counts = Counter()
+
+    def add(self, message):
+        channel_id = message.channel.id
+        authors = self._channels.get(channel_id)
+        if authors is None:
+            authors = self._channels[channel_id] = OrderedDict()
+            if len(self._channels) > self.max_channels:
+                self._channels.popitem(last=False)
+        else:
+            self._channels.move_to_end(channel_id)
+
+        authors[message.id] = message.author.id
+        if len(authors) > self.per_channel:
+            authors.popitem(last=False)
+
+    def get(self, channel_id, message_id):
+        authors = self._channels.get(channel_id)
+        author_id = authors.get(message_id) if authors is not None else None
+        self.counts['hits' if author_id is not None else 'misses'] += 1
+        return author_id
+
+    def stats(self):
+        lookups = self.counts['hits'] + self.counts['misses']
+        return {
+            'channels': len(self._channels),
+            'messages': sum(len(authors) for authors in self._channels.values()),
+            'hit_rate': self.counts['hits'] / lookups if lookups else 0.0,
+            **self.counts
+        }
+
+
+class RecentMessages:
+    """Per-guild ring buffers of recent Poketwo messages, looked up by ID"""
+
+    def __init__(self, per_guild=500):
+        self.per_guild = per_guild
+        # guild_id -> deque of records, oldest first
+        self._rings = {}
+        # guild_id -> {message_id: record}
+        self._by_id = {}
+        self.user_authors = UserMessageAuthors()
+        self.counts = Counter()
+
+    def add(self, message):
+        """Buffer a Poketwo message, pushing the guild's oldest one out once the ring is full"""
+        if message.guild is None:
+            return
+
+        guild_id = message.guild.id
+        ring = self._rings.get(guild_id)
+        if ring is None:
+            ring = self._rings[guild_id] = deque()
+            self._by_id[guild_id] = {}
+        by_id = self._by_id[guild_id]
+
+        if len(ring) >= self.per_guild:
+            evicted = ring.popleft()
+            by_id.pop(evicted.id, None)
+
+        record = RecentMessage(message)
+        ring.append(record)
+        by_id[record.id] = record
+
+    def get(self, guild_id, message_id):
+        """Return the buffered record for a message, or None"""
+        record = self._by_id.get(guild_id, {}).get(message_id)
+        self.counts['hits' if record is not None else 'misses'] += 1
+        return record
+
+    def add_user_message(self, message):
+        """Remember who sent a user message, in case Poketwo replies to it"""
+        if message.guild is not None:
+            self.user_authors.add(message)
+
+    def reply_author_id(self, message):
+        """Who a Poketwo reply went to, if it can be told locally; None means ask Discord"""
+        if message.guild is None or not message.reference:
+            return None
+
+        reply_author_id = self._local_reply_author_id(message)
+        self.counts['reply_hits' if reply_author_id else 'reply_misses'] += 1
+        return reply_author_id
+
+    def _local_reply_author_id(self, message):
+        reference = message.reference
+        if reference.resolved is not None and getattr(reference.resolved, 'author', None) is not None:
+            return reference.resolved.author.id
+
+        by_id = self._by_id.get(message.guild.id, {})
+        record = by_id.get(message.id)
+        if record is not None and record.reply_author_id:
+            return record.reply_author_id
+
+        # Usually the reply is to the user's command, seen moments earlier in the same channel
+        author_id = self.user_authors.get(message.channel.id, reference.message_id)
+        if author_id:
+            return author_id
+
+        referenced = by_id.get(reference.message_id)
+        if referenced is not None:
+            return referenced.author_id
+        return None
+
+    def stats(self):
+        replies = self.counts['reply_hits'] + self.counts['reply_misses']
+        return {
+            'guilds': len(self._rings),
+            'messages': sum(len(ring) for ring in self._rings.values()),
+            'per_guild': self.per_guild,
+            'reply_hit_rate': self.counts['reply_hits'] / replies if replies else 0.0,
+            'user_authors': self.user_authors.stats(),
+            **self.counts
+        }
+
+
+def get_recent_messages(bot):
+    """Return the recent message buffers held by the bot, creating them on first use"""
+    recent = getattr(bot, 'recent_messages', None)
+    if recent is None:
+        recent = RecentMessages()
+        bot.recent_messages = recent
+    return recent
@@ -0,0 +1,135 @@
+import asyncio
+import time
+from collections import OrderedDict, Counter
+
+import discord
+
+from .recent import get_recent_messages
+
+
+class MessageResolver:
+    """Finds a guild message from its ID alone, for the manual check commands
+
+    Lookups try, in order: the recent Poketwo message buffer, which needs no API call at all,
+    the channel the listener last saw the message in, the channel the command was used in,
+    then every other readable text channel that could hold the message,
+    most recently active first, probed a few at a time. The first hit cancels the rest.
+    """
+
+    def __init__(self, recent, max_seen=50000, max_concurrency=10):
+        self.recent = recent
+        self.max_seen = max_seen
+        self.max_concurrency = max_concurrency
+        # message_id -> channel_id for Poketwo messages the listener has seen, oldest first
+        self._seen = OrderedDict()
+        self.counts = Counter()
+        self.total_lookup_time = 0.0
+
+    def remember(self, message):
+        """Record where a message lives, so a later lookup by ID goes straight there"""
+        self._seen[message.id] = message.channel.id
+        self._seen.move_to_end(message.id)
+        if len(self._seen) > self.max_seen:
+            self._seen.popitem(last=False)
+
+    def candidate_channels(self, guild, message_id, exclude=()):
+        """Readable text channels that can hold the message, most recently active first"""
+        candidates = []
+        for channel in guild.text_channels:
+            if channel.id in exclude or not channel.permissions_for(guild.me).read_message_history:
+                continue
+            # Snowflakes order by time: a channel created after the message, or whose latest
+            # message is older than it, can't contain it
+            if channel.id > message_id:
+                continue
+            if channel.last_message_id is not None and channel.last_message_id < message_id:
+                continue
+            candidates.append(channel)
+
+        candidates.sort(key=lambda channel: channel.last_message_id or 0, reverse=True)
+        return candidates
+
+    async def _fetch(self, channel, message_id, raise_forbidden=False):
+        self.counts['probes'] += 1
+        try:
+            return await channel.fetch_message(message_id)
+        except discord.NotFound:
+            return None
+        except discord.Forbidden:
+            if raise_forbidden:
+                raise
+            return None
+        except discord.HTTPException as e:
+            print(f"Error probing #{channel} for message {message_id}: {e}")
+            return None
+
+    async def _probe(self, channels, message_id):
+        channel_iter = iter(channels)
+        found = []
+
+        async def worker():
+            # Workers share one iterator, so each channel is probed once, in rank order
+            for channel in channel_iter:
+                if found:
+                    return
+                message = await self._fetch(channel, message_id)
+                if message is not None:
+                    found.append(message)
+                    return
+
+        pending = {asyncio.create_task(worker()) for _ in range(min(self.max_concurrency, len(channels)))}
+        try:
+            while pending and not found:
+                _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in pending:
+                task.cancel()
+        return found[0] if found else None
+
+    async def resolve(self, guild, message_id, preferred_channel=None):
+        """Return the message with this ID from anywhere in the guild, or None
+
+        discord.Forbidden from the preferred channel, the one the command was used in, is
+        raised so the command can say it lacks permission there; other channels are skipped.
+        """
+        started = time.monotonic()
+        self.counts['lookups'] += 1
+        tried = set()
+        try:
+            record = self.recent.get(guild.id, message_id)
+            if record is not None:
+                self.counts['buffer_hits'] += 1
+                return record
+
+            seen_channel = guild.get_channel(self._seen.get(message_id, 0))
+            for channel in (seen_channel, preferred_channel):
+                if channel is None or channel.id in tried:
+                    continue
+                tried.add(channel.id)
+                message = await self._fetch(channel, message_id, raise_forbidden=channel.id == getattr(preferred_channel, 'id', None))
+                if message is not None:
+                    self.counts['direct_hits' if channel is preferred_channel else 'seen_hits'] += 1
+                    return message
+
+            message = await self._probe(self.candidate_channels(guild, message_id, tried), message_id)
+            self.counts['probe_hits' if message is not None else 'not_found'] += 1
+            return message
+        finally:
+            self.total_lookup_time += time.monotonic() - started
+
+    def stats(self):
+        lookups = self.counts['lookups']
+        return {
+            'remembered': len(self._seen),
+            'average_lookup': self.total_lookup_time / lookups if lookups else 0.0,
+            **self.counts
+        }
+
+
+def get_message_resolver(bot):
+    """Return the message resolver held by the bot, creating it on first use"""
+    resolver = getattr(bot, 'message_resolver', None)
+    if resolver is None:
+        resolver = MessageResolver(get_recent_messages(bot))
+        bot.message_resolver = resolver
+    return resolver
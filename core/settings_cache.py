@@ -0,0 +1,92 @@
+import asyncio
+import time
+
+
+class SettingsCache:
+    """TTL cache over guild_settings and global_settings documents, with hit and miss counters"""
+
+    def __init__(self, guild_ttl=300, global_ttl=600):
+        self.guild_ttl = guild_ttl
+        self.global_ttl = global_ttl
+        # key -> (expires_at, document); a None document caches "no settings stored"
+        self._entries = {}
+        # key -> future for a lookup already on its way to MongoDB
+        self._pending = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def _get(self, key, ttl, loader):
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[1]
+
+        # Concurrent misses for the same key share one round trip
+        pending = self._pending.get(key)
+        if pending is not None:
+            self.hits += 1
+            return await asyncio.shield(pending)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            document = await loader()
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception retrieved in case nobody else was waiting on it
+            future.exception()
+            raise
+        else:
+            # Skip caching if the key was invalidated while the lookup was in flight
+            if self._pending.get(key) is future:
+                self._entries[key] = (time.monotonic() + ttl, document)
+            future.set_result(document)
+            return document
+        finally:
+            if self._pending.get(key) is future:
+                del self._pending[key]
+
+    async def get_guild_settings(self, db, guild_id):
+        """Return the guild_settings document for a guild, or None"""
+        return await self._get(
+            ('guild', guild_id),
+            self.guild_ttl,
+            lambda: db.guild_settings.find_one({"guild_id": guild_id})
+        )
+
+    async def get_global_settings(self, db):
+        """Return the global starboard settings document, or None"""
+        return await self._get(
+            ('global', 'starboard'),
+            self.global_ttl,
+            lambda: db.global_settings.find_one({"_id": "starboard"})
+        )
+
+    def invalidate(self, key):
+        self._entries.pop(key, None)
+        self._pending.pop(key, None)
+
+    def invalidate_guild(self, guild_id):
+        self.invalidate(('guild', guild_id))
+
+    def invalidate_global(self):
+        self.invalidate(('global', 'starboard'))
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+            'entries': len(self._entries)
+        }
+
+
+def get_settings_cache(bot):
+    """Return the settings cache held by the bot, creating it on first use"""
+    cache = getattr(bot, 'settings_cache', None)
+    if cache is None:
+        cache = SettingsCache()
+        bot.settings_cache = cache
+    return cache
@@ -0,0 +1,460 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from abc import ABC, abstractmethod
+
+
+def find_starboard_file():
+    """Locate starboard.txt in the bot directory, next to the cogs, or in the working directory"""
+    cogs_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+    for candidate in (os.path.join(cogs_dir, '..', 'starboard.txt'), os.path.join(cogs_dir, 'starboard.txt')):
+        if os.path.exists(candidate):
+            return candidate
+    return 'starboard.txt'
+
+
+def load_pokemon_data(starboard_file=None):
+    """Load Pokemon data from starboard.txt file"""
+    try:
+        with open(starboard_file or find_starboard_file(), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Error loading Pokemon data: {e}")
+        return {}
+
+
+class BaseSpriteIndex(ABC):
+    """Shared lookup rules for the in-memory and compiled sprite indexes"""
+
+    # Upper bounds on remembered partial-match and full lookup results
+    PARTIAL_CACHE_SIZE = 1024
+    FIND_CACHE_SIZE = 4096
+
+    def __init__(self):
+        self._partial_cache = {}
+        self._find_cache = {}
+
+    @abstractmethod
+    def variants(self, normalized_name):
+        """Return (base, female, gigantamax, eternamax) URLs for an exact name, or None"""
+
+    @abstractmethod
+    def iter_ordered(self):
+        """Yield (normalized name, image URL) in file order"""
+
+    def partial_match(self, normalized_name):
+        """Return the first sprite in file order whose name contains, or is contained in, the search name"""
+        if normalized_name in self._partial_cache:
+            return self._partial_cache[normalized_name]
+
+        result = None
+        for entry_name, image_url in self.iter_ordered():
+            if normalized_name in entry_name or entry_name in normalized_name:
+                result = image_url
+                break
+
+        if len(self._partial_cache) >= self.PARTIAL_CACHE_SIZE:
+            self._partial_cache.clear()
+        self._partial_cache[normalized_name] = result
+        return result
+
+    def find(self, pokemon_name, is_shiny=False, gender=None, is_gigantamax=False):
+        """Find Pokemon image URL with gender, Gigantamax and Eternamax support"""
+        # Bursts repeat the same few Pokemon, so remember whole lookups per index
+        key = (pokemon_name, is_shiny, gender, is_gigantamax)
+        if key in self._find_cache:
+            return self._find_cache[key]
+
+        image_url = self._find(pokemon_name, is_shiny, gender, is_gigantamax)
+
+        if len(self._find_cache) >= self.FIND_CACHE_SIZE:
+            self._find_cache.clear()
+        self._find_cache[key] = image_url
+        return image_url
+
+    def _find(self, pokemon_name, is_shiny, gender, is_gigantamax):
+        normalized_name = pokemon_name.strip().lower()
+        image_url = None
+
+        variants = self.variants(normalized_name)
+        if variants is not None:
+            base_url, female_url, gigantamax_url, eternamax_url = variants
+
+            # Eternatus uses its Eternamax form instead of a Gigantamax sprite
+            if is_gigantamax:
+                image_url = eternamax_url if normalized_name == "eternatus" else gigantamax_url
+
+            if image_url is None and gender == 'female':
+                image_url = female_url
+
+            if image_url is None:
+                image_url = base_url
+
+        if image_url is None:
+            image_url = self.partial_match(normalized_name)
+
+        if image_url and is_shiny:
+            # Replace 'images' with 'shiny' for shiny Pokemon
+            return image_url.replace('/images/', '/shiny/')
+
+        return image_url
+
+
+class SpriteIndex(BaseSpriteIndex):
+    """Name-keyed sprite lookup built once from the starboard.txt data"""
+
+    def __init__(self, pokemon_data):
+        super().__init__()
+
+        # Normalized name -> image URL for each sprite family
+        self.base = {}
+        self.female = {}
+        self.gigantamax = {}
+        self.eternamax = {}
+
+        # (normalized name, image URL) in file order, used only when an exact lookup misses
+        self.ordered = []
+
+        female_entries = []
+        for key, value in pokemon_data.items():
+            name = value.get('name', '').lower()
+            image_url = value.get('image_url', '')
+            self.ordered.append((name, image_url))
+
+            if key.endswith('_female'):
+                self.female.setdefault(name, image_url)
+                female_entries.append((name, image_url))
+                continue
+
+            self.base.setdefault(name, image_url)
+
+            if key.startswith('variant_'):
+                key_lower = key.lower()
+                if 'gigantamax' in key_lower and name.startswith('gigantamax '):
+                    self.gigantamax.setdefault(name[len('gigantamax '):], image_url)
+                elif 'eternamax' in key_lower and name.startswith('eternamax '):
+                    self.eternamax.setdefault(name[len('eternamax '):], image_url)
+
+        # A female-only entry still answers plain lookups for that name
+        for name, image_url in female_entries:
+            self.base.setdefault(name, image_url)
+
+    def __len__(self):
+        return len(self.ordered)
+
+    def names(self):
+        """Every normalized name with at least one exact sprite"""
+        names = dict.fromkeys(self.base)
+        for family in (self.female, self.gigantamax, self.eternamax):
+            names.update(dict.fromkeys(family))
+        return list(names)
+
+    def variants(self, normalized_name):
+        variants = (
+            self.base.get(normalized_name),
+            self.female.get(normalized_name),
+            self.gigantamax.get(normalized_name),
+            self.eternamax.get(normalized_name)
+        )
+        if variants == (None, None, None, None):
+            return None
+        return variants
+
+    def iter_ordered(self):
+        return iter(self.ordered)
+
+
+# Compiled catalog layout (little endian):
+#   header   magic, version, sha256 of starboard.txt, then (count, offset) pairs for each section
+#   strings  (offset, length) into the string blob; names, the URL prefix and URL suffixes are interned here
+#   names    per normalized name: name string, then (dex id, suffix string) for base/female/gigantamax/eternamax
+#   slots    open-addressing hash table of name record index + 1, 0 marks an empty slot
+#   ordered  per starboard.txt entry in file order: (name string, dex id, suffix string) for partial matching
+CATALOG_MAGIC = b'SPRT'
+CATALOG_VERSION = 1
+CATALOG_HEADER = struct.Struct('<4sHH32sIIIIIIIIII')
+CATALOG_STRING = struct.Struct('<II')
+CATALOG_NAME = struct.Struct('<IIIIIIIII')
+CATALOG_SLOT = struct.Struct('<I')
+CATALOG_ORDERED = struct.Struct('<III')
+CATALOG_MISSING = 0xFFFFFFFF
+
+
+def catalog_hash(name_bytes):
+    """32-bit FNV-1a; stable across processes, unlike hash()"""
+    value = 0x811C9DC5
+    for byte in name_bytes:
+        value = ((value ^ byte) * 0x01000193) & 0xFFFFFFFF
+    return value
+
+
+def compile_catalog(source_bytes, output_file):
+    """Compile starboard.txt contents into the binary catalog at output_file"""
+    index = SpriteIndex(json.loads(source_bytes.decode('utf-8')))
+    if not len(index):
+        raise ValueError("starboard.txt has no entries")
+
+    url_prefix = os.path.commonprefix([image_url for _, image_url in index.ordered])
+    url_prefix = url_prefix[:url_prefix.rfind('/') + 1]
+
+    strings = {}
+
+    def intern(value):
+        if value not in strings:
+            strings[value] = len(strings)
+        return strings[value]
+
+    prefix_string = intern(url_prefix)
+
+    def encode_url(image_url):
+        if image_url is None:
+            return CATALOG_MISSING, CATALOG_MISSING
+        if not image_url.startswith(url_prefix):
+            raise ValueError(f"Image URL does not fit the catalog template: {image_url}")
+        tail = image_url[len(url_prefix):]
+        digits = len(tail) - len(tail.lstrip('0123456789'))
+        if digits == 0:
+            raise ValueError(f"Image URL has no dex id: {image_url}")
+        return int(tail[:digits]), intern(tail[digits:])
+
+    names = index.names()
+    name_records = []
+    for name in names:
+        record = [intern(name)]
+        for image_url in index.variants(name):
+            record.extend(encode_url(image_url))
+        name_records.append(record)
+
+    ordered_records = []
+    for name, image_url in index.ordered:
+        ordered_records.append((intern(name), *encode_url(image_url)))
+
+    slot_count = 1
+    while slot_count < len(name_records) * 2:
+        slot_count *= 2
+    slots = [0] * slot_count
+    for record_index, name in enumerate(names):
+        slot = catalog_hash(name.encode('utf-8')) & (slot_count - 1)
+        while slots[slot]:
+            slot = (slot + 1) & (slot_count - 1)
+        slots[slot] = record_index + 1
+
+    blob = bytearray()
+    string_table = bytearray()
+    for value in strings:
+        encoded = value.encode('utf-8')
+        string_table += CATALOG_STRING.pack(len(blob), len(encoded))
+        blob += encoded
+
+    strings_offset = CATALOG_HEADER.size
+    blob_offset = strings_offset + len(string_table)
+    names_offset = blob_offset + len(blob)
+    slots_offset = names_offset + len(name_records) * CATALOG_NAME.size
+    ordered_offset = slots_offset + slot_count * CATALOG_SLOT.size
+
+    output = bytearray(CATALOG_HEADER.pack(
+        CATALOG_MAGIC, CATALOG_VERSION, 0, hashlib.sha256(source_bytes).digest(),
+        len(strings), strings_offset, blob_offset,
+        len(name_records), names_offset,
+        slot_count, slots_offset,
+        len(ordered_records), ordered_offset,
+        prefix_string
+    ))
+    output += string_table
+    output += blob
+    for record in name_records:
+        output += CATALOG_NAME.pack(*record)
+    for slot in slots:
+        output += CATALOG_SLOT.pack(slot)
+    for record in ordered_records:
+        output += CATALOG_ORDERED.pack(*record)
+
+    # Write beside the target and rename, so processes that already mapped the old file keep a valid view
+    temp_file = f"{output_file}.{os.getpid()}.tmp"
+    with open(temp_file, 'wb') as f:
+        f.write(output)
+    os.replace(temp_file, output_file)
+    return len(output)
+
+
+class CompiledSpriteIndex(BaseSpriteIndex):
+    """Sprite lookup served straight from a memory-mapped compiled catalog"""
+
+    def __init__(self, catalog_file):
+        super().__init__()
+        with open(catalog_file, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, version, _, self.source_hash,
+         self._string_count, self._strings_offset, self._blob_offset,
+         self._name_count, self._names_offset,
+         self._slot_count, self._slots_offset,
+         self._ordered_count, self._ordered_offset,
+         prefix_string) = CATALOG_HEADER.unpack_from(self._map, 0)
+
+        if magic != CATALOG_MAGIC or version != CATALOG_VERSION:
+            self._map.close()
+            raise ValueError(f"Not a version {CATALOG_VERSION} sprite catalog: {catalog_file}")
+
+        self._url_prefix = self._string(prefix_string)
+        self._ordered = None
+
+    @classmethod
+    def open_if_current(cls, catalog_file, source_hash):
+        """Open the catalog only if it was compiled from the given starboard.txt hash"""
+        if not os.path.exists(catalog_file):
+            return None
+        try:
+            index = cls(catalog_file)
+        except (OSError, ValueError, struct.error):
+            return None
+        if index.source_hash != source_hash:
+            index.close()
+            return None
+        return index
+
+    def close(self):
+        self._map.close()
+
+    def __len__(self):
+        return self._ordered_count
+
+    def _string_bounds(self, string_index):
+        offset, length = CATALOG_STRING.unpack_from(self._map, self._strings_offset + string_index * CATALOG_STRING.size)
+        start = self._blob_offset + offset
+        return start, start + length
+
+    def _string(self, string_index):
+        start, end = self._string_bounds(string_index)
+        return self._map[start:end].decode('utf-8')
+
+    def _url(self, dex_id, suffix_string):
+        if dex_id == CATALOG_MISSING:
+            return None
+        return f"{self._url_prefix}{dex_id}{self._string(suffix_string)}"
+
+    def variants(self, normalized_name):
+        name_bytes = normalized_name.encode('utf-8')
+        mask = self._slot_count - 1
+        slot = catalog_hash(name_bytes) & mask
+
+        while True:
+            (record_index,) = CATALOG_SLOT.unpack_from(self._map, self._slots_offset + slot * CATALOG_SLOT.size)
+            if not record_index:
+                return None
+
+            record = CATALOG_NAME.unpack_from(self._map, self._names_offset + (record_index - 1) * CATALOG_NAME.size)
+            start, end = self._string_bounds(record[0])
+            if self._map[start:end] == name_bytes:
+                return tuple(self._url(record[i], record[i + 1]) for i in range(1, 9, 2))
+
+            slot = (slot + 1) & mask
+
+    def iter_ordered(self):
+        # Decoded on the first partial-match miss only; exact lookups never touch this section
+        if self._ordered is None:
+            ordered = []
+            for position in range(self._ordered_count):
+                name_string, dex_id, suffix_string = CATALOG_ORDERED.unpack_from(
+                    self._map, self._ordered_offset + position * CATALOG_ORDERED.size
+                )
+                ordered.append((self._string(name_string), self._url(dex_id, suffix_string)))
+            self._ordered = ordered
+        return iter(self._ordered)
+
+
+def compiled_catalog_file(starboard_file):
+    """Path of the catalog the build step compiles beside starboard.txt"""
+    return os.path.splitext(starboard_file)[0] + '.bin'
+
+
+def cached_catalog_file(source_hash):
+    """Path of the catalog a load compiles for itself when the build step hasn't been run
+
+    Named by the starboard.txt hash, so processes starting together write identical files
+    and a stale catalog is never picked up. SPRITE_CATALOG_CACHE overrides the directory.
+    """
+    cache_dir = os.environ.get('SPRITE_CATALOG_CACHE') or os.path.join(tempfile.gettempdir(), 'starboard-sprites')
+    return os.path.join(cache_dir, source_hash.hex()[:16] + '.bin')
+
+
+def load_sprite_index(starboard_file):
+    """Open a current compiled catalog for starboard_file, or fall back to parsing the JSON
+
+    Loading never writes beside starboard.txt, which may be read-only. A missing or stale
+    build is compiled into the cache directory instead, and if that fails too the text
+    file is parsed directly.
+    """
+    try:
+        with open(starboard_file, 'rb') as f:
+            source_bytes = f.read()
+    except OSError as e:
+        print(f"Error loading Pokemon data: {e}")
+        return None
+
+    source_hash = hashlib.sha256(source_bytes).digest()
+    for catalog_file in (compiled_catalog_file(starboard_file), cached_catalog_file(source_hash)):
+        index = CompiledSpriteIndex.open_if_current(catalog_file, source_hash)
+        if index is not None:
+            return index
+
+    try:
+        catalog_file = cached_catalog_file(source_hash)
+        os.makedirs(os.path.dirname(catalog_file), exist_ok=True)
+        compile_catalog(source_bytes, catalog_file)
+        index = CompiledSpriteIndex.open_if_current(catalog_file, source_hash)
+        if index is not None:
+            return index
+    except Exception as e:
+        print(f"Error compiling sprite catalog, using starboard.txt directly: {e}")
+
+    try:
+        return SpriteIndex(json.loads(source_bytes.decode('utf-8')))
+    except Exception as e:
+        print(f"Error loading Pokemon data: {e}")
+        return None
+
+
+class SpriteCatalog:
+    """Process-wide sprite index shared by the Starboard, Egg and Unbox cogs"""
+
+    def __init__(self, starboard_file=None):
+        self.starboard_file = starboard_file or find_starboard_file()
+        self.index = load_sprite_index(self.starboard_file) or SpriteIndex({})
+
+    def find(self, pokemon_name, is_shiny=False, gender=None, is_gigantamax=False):
+        """Find Pokemon image URL in the current index"""
+        return self.index.find(pokemon_name, is_shiny, gender, is_gigantamax)
+
+    def reload(self):
+        """Rebuild the index from disk and swap it in; the old index stays live if loading fails"""
+        index = load_sprite_index(self.starboard_file)
+        if not index:
+            return None
+
+        # Single attribute assignment, so lookups see either the old or the new index.
+        # The previous mmap is left to the garbage collector in case a lookup still holds it.
+        self.index = index
+        return len(index)
+
+
+def get_sprite_catalog(bot):
+    """Return the catalog held by the bot, building it on first use"""
+    catalog = getattr(bot, 'sprite_catalog', None)
+    if catalog is None:
+        catalog = SpriteCatalog()
+        bot.sprite_catalog = catalog
+    return catalog
+
+
+if __name__ == '__main__':
+    # Build step, run at deploy time: python core/sprites.py [starboard.txt] [output.bin]
+    source_file = sys.argv[1] if len(sys.argv) > 1 else find_starboard_file()
+    output_file = sys.argv[2] if len(sys.argv) > 2 else compiled_catalog_file(source_file)
+    with open(source_file, 'rb') as f:
+        size = compile_catalog(f.read(), output_file)
+    print(f"Compiled {source_file} -> {output_file} ({size} bytes)")
@@ -5,16 +5,55 @@ import asyncio
 from datetime import datetime, timezone
 from database import db
 from config import EMBED_COLOR
+from .core.daycare_sessions import bump_dataset_version, get_daycare_sessions
+from .core.dataset_search import DatasetSearch, name_trigrams
+from .core.daycare_indexes import DATASET_NAME_INDEX, ensure_daycare_indexes, audit_daycare_queries
 from typing import Optional, List, Dict
+from pymongo.errors import DuplicateKeyError
 import math
+from collections import OrderedDict
+
+# Listings show names and counts only; the commands arrays can run to megabytes per user
+DATASET_SUMMARY_FIELDS = {"name": 1, "name_lower": 1, "command_count": 1, "last_used": 1}
+
+
+async def fetch_dataset_page(user_id: int, page: int, per_page: int) -> List[Dict]:
+    """Fetch one page of a user's dataset summaries, oldest first"""
+    cursor = db.db.datasets.find({"user_id": user_id}, DATASET_SUMMARY_FIELDS)
+    return await cursor.sort("_id", 1).skip(page * per_page).limit(per_page).to_list(length=per_page)
 
 
 class Daycare(commands.Cog):
+    # Upper bound on users remembered as having every dataset field
+    MAX_CHECKED_USERS = 10000
+
     def __init__(self, bot):
         self.bot = bot
         # PokéTwo bot ID and alternative mention format
         self.POKETWO_ID = 716390085896962058
         self.POKETWO_MENTION = "@Pokétwo#8236"
+        self.sessions = get_daycare_sessions(bot)
+        self.dataset_search = DatasetSearch()
+        # Users whose datasets are known to all carry command_count and name_trigrams, most recent last
+        self.checked_users = OrderedDict()
+        # Whether the unique (user_id, name_lower) index exists; until it does, store checks
+        # for a taken name itself instead of relying on DuplicateKeyError
+        self.unique_names = False
+
+    async def cog_load(self):
+        # Store, rename and search depend on these; a missing one is logged, not fatal
+        try:
+            failed = await ensure_daycare_indexes()
+            self.unique_names = DATASET_NAME_INDEX not in failed
+            if not self.unique_names:
+                print("Dataset names are not unique-indexed; store will check for taken names first")
+            await audit_daycare_queries()
+        except Exception as e:
+            print(f"Error checking daycare indexes: {e}")
+
+    async def cog_unload(self):
+        # Land pending next/jump positions before the cog goes away
+        await self.sessions.flush_all()
 
     def extract_poketwo_commands(self, content: str) -> List[str]:
         """Extract PokéTwo dc add commands from message content"""
@@ -55,12 +94,44 @@ class Daycare(commands.Cog):
 
         return commands
 
+    async def ensure_dataset_fields(self, user_id: int):
+        """Store command_count and name_trigrams on the user's datasets saved before they were kept"""
+        if user_id in self.checked_users:
+            self.checked_users.move_to_end(user_id)
+            return
+        async for dataset in db.db.datasets.find(
+            {"user_id": user_id, "$or": [
+                {"command_count": {"$exists": False}},
+                {"name_trigrams": {"$exists": False}}
+            ]},
+            {"commands": 1, "name_lower": 1}
+        ):
+            await db.db.datasets.update_one(
+                {"_id": dataset["_id"]},
+                {"$set": {
+                    "command_count": len(dataset.get("commands", [])),
+                    "name_trigrams": name_trigrams(dataset["name_lower"])
+                }}
+            )
+        self.checked_users[user_id] = True
+        while len(self.checked_users) > self.MAX_CHECKED_USERS:
+            self.checked_users.popitem(last=False)
+
+    async def find_dataset_count(self, user_id: int, dataset_name_lower: str) -> Optional[Dict]:
+        """Fetch just a dataset's command_count, or None if the user has no dataset by that name"""
+        await self.ensure_dataset_fields(user_id)
+        return await db.db.datasets.find_one(
+            {"user_id": user_id, "name_lower": dataset_name_lower},
+            {"command_count": 1}
+        )
+
     class StoreConfirmationView(discord.ui.View):
-        def __init__(self, user_id, dataset_name, commands):
+        def __init__(self, user_id, dataset_name, commands, sessions):
             super().__init__(timeout=30)
             self.user_id = user_id
             self.dataset_name = dataset_name
             self.commands = commands
+            self.sessions = sessions
 
         @discord.ui.button(label="Yes, Update", style=discord.ButtonStyle.success, emoji="✅")
         async def confirm_update(self, interaction: discord.Interaction, button: discord.ui.Button):
@@ -72,24 +143,26 @@ class Daycare(commands.Cog):
                 dataset_name_lower = self.dataset_name.lower()
                 current_time = datetime.now(timezone.utc)
 
-                # Get existing dataset to preserve creation time
-                existing = await db.db.datasets.find_one({"user_id": self.user_id, "name_lower": dataset_name_lower})
-
-                dataset_doc = {
-                    "user_id": self.user_id,
-                    "name": self.dataset_name,
-                    "name_lower": dataset_name_lower,
-                    "commands": self.commands,
-                    "created_at": existing["created_at"] if existing else current_time,
-                    "last_modified": current_time,
-                    "last_used": existing.get("last_used") if existing else None
-                }
-
-                await db.db.datasets.replace_one(
+                # The replaced dataset may be the selected one
+                await self.sessions.discard(self.user_id)
+                # One upsert against the unique (user_id, name_lower) index; created_at and
+                # last_used are kept when the dataset exists and set only if it was deleted since
+                await db.db.datasets.update_one(
                     {"user_id": self.user_id, "name_lower": dataset_name_lower},
-                    dataset_doc,
+                    {
+                        "$set": {
+                            "name": self.dataset_name,
+                            "name_trigrams": name_trigrams(dataset_name_lower),
+                            "commands": self.commands,
+                            "command_count": len(self.commands),
+                            "last_modified": current_time
+                        },
+                        "$setOnInsert": {"created_at": current_time, "last_used": None}
+                    },
                     upsert=True
                 )
+                # Sessions other processes hold for it fail their next claim and reload
+                await bump_dataset_version(self.user_id, dataset_name_lower)
 
                 embed = discord.Embed(
                     title="✅ Dataset Updated",
@@ -171,36 +244,45 @@ class Daycare(commands.Cog):
                 await ctx.reply(embed=embed, mention_author=False)
                 return
 
-            # Check if dataset with this name already exists for this user (case insensitive)
-            existing = await db.db.datasets.find_one({"user_id": user_id, "name_lower": dataset_name_lower})
+            existing = None
+            if not self.unique_names:
+                # Without the unique index an insert can't tell that the name is taken
+                existing = await self.find_dataset_count(user_id, dataset_name_lower)
 
-            if existing:
+            if existing is None:
+                # Create new dataset
+                current_time = datetime.now(timezone.utc)
+
+                dataset_doc = {
+                    "user_id": user_id,
+                    "name": dataset_name,
+                    "name_lower": dataset_name_lower,
+                    "name_trigrams": name_trigrams(dataset_name_lower),
+                    "commands": commands,
+                    "command_count": len(commands),
+                    "created_at": current_time,
+                    "last_modified": current_time,
+                    "last_used": None
+                }
+
+                try:
+                    await db.db.datasets.insert_one(dataset_doc)
+                except DuplicateKeyError:
+                    # The unique (user_id, name_lower) index says the name is taken (case insensitive)
+                    existing = await self.find_dataset_count(user_id, dataset_name_lower) or {}
+
+            if existing is not None:
                 # Show confirmation dialog
                 embed = discord.Embed(
                     title="⚠️ Dataset Already Exists",
-                    description=f"Dataset **{dataset_name}** already exists with {len(existing.get('commands', []))} command(s).\n\nDo you want to update it with {len(commands)} new command(s)?",
+                    description=f"Dataset **{dataset_name}** already exists with {existing.get('command_count', 0)} command(s).\n\nDo you want to update it with {len(commands)} new command(s)?",
                     color=0xffaa00
                 )
 
-                view = self.StoreConfirmationView(user_id, dataset_name, commands)
+                view = self.StoreConfirmationView(user_id, dataset_name, commands, self.sessions)
                 await ctx.reply(embed=embed, view=view, mention_author=False)
                 return
 
-            # Create new dataset
-            current_time = datetime.now(timezone.utc)
-
-            dataset_doc = {
-                "user_id": user_id,
-                "name": dataset_name,
-                "name_lower": dataset_name_lower,
-                "commands": commands,
-                "created_at": current_time,
-                "last_modified": current_time,
-                "last_used": None
-            }
-
-            await db.db.datasets.insert_one(dataset_doc)
-
             embed = discord.Embed(
                 description=f"✅ Stored dataset **{dataset_name}** with {len(commands)} command(s).",
                 color=EMBED_COLOR
@@ -222,13 +304,17 @@ class Daycare(commands.Cog):
             print(f"Store command error: {e}")
 
     class DatasetSelectView(discord.ui.View):
-        def __init__(self, datasets, user_id, current_page=0):
+        items_per_page = 20
+
+        def __init__(self, page_datasets, total_datasets, user_id, sessions, current_page=0):
             super().__init__(timeout=60)
-            self.datasets = datasets
+            # Only the current page is held; other pages are fetched when navigated to
+            self.page_datasets = page_datasets
+            self.total_datasets = total_datasets
             self.user_id = user_id
+            self.sessions = sessions
             self.current_page = current_page
-            self.items_per_page = 20
-            self.total_pages = math.ceil(len(datasets) / self.items_per_page)
+            self.total_pages = math.ceil(total_datasets / self.items_per_page)
 
             # Add select menu
             self.add_select_menu()
@@ -237,18 +323,19 @@ class Daycare(commands.Cog):
             if self.total_pages > 1:
                 self.add_navigation_buttons()
 
-        def add_select_menu(self):
-            start_idx = self.current_page * self.items_per_page
-            end_idx = min(start_idx + self.items_per_page, len(self.datasets))
-            page_datasets = self.datasets[start_idx:end_idx]
+        @classmethod
+        async def load(cls, user_id, total_datasets, sessions, current_page=0):
+            page_datasets = await fetch_dataset_page(user_id, current_page, cls.items_per_page)
+            return cls(page_datasets, total_datasets, user_id, sessions, current_page)
 
+        def add_select_menu(self):
             options = [
                 discord.SelectOption(
                     label=dataset["name"],
-                    description=f"{len(dataset.get('commands', []))} commands",
+                    description=f"{dataset.get('command_count', 0)} commands",
                     value=dataset["name"]
                 )
-                for dataset in page_datasets
+                for dataset in self.page_datasets
             ]
 
             if options:
@@ -296,6 +383,7 @@ class Daycare(commands.Cog):
 
             # Update user state
             current_time = datetime.now(timezone.utc)
+            await self.sessions.discard(self.user_id)
             await db.db.user_states.replace_one(
                 {"user_id": self.user_id},
                 {
@@ -322,7 +410,9 @@ class Daycare(commands.Cog):
                 return
 
             self.current_page = max(0, self.current_page - 1)
-            new_view = Daycare.DatasetSelectView(self.datasets, self.user_id, self.current_page)
+            new_view = await Daycare.DatasetSelectView.load(
+                self.user_id, self.total_datasets, self.sessions, self.current_page
+            )
             await interaction.response.edit_message(content="📋 Select a dataset to work with:", view=new_view)
 
         async def next_page(self, interaction):
@@ -331,18 +421,23 @@ class Daycare(commands.Cog):
                 return
 
             self.current_page = min(self.total_pages - 1, self.current_page + 1)
-            new_view = Daycare.DatasetSelectView(self.datasets, self.user_id, self.current_page)
+            new_view = await Daycare.DatasetSelectView.load(
+                self.user_id, self.total_datasets, self.sessions, self.current_page
+            )
             await interaction.response.edit_message(content="📋 Select a dataset to work with:", view=new_view)
 
     class ListPaginationView(discord.ui.View):
-        def __init__(self, datasets, user_id, selected_dataset, current_page=0):
+        items_per_page = 24  # Leave room for footer
+
+        def __init__(self, page_datasets, total_datasets, user_id, selected_dataset, current_page=0):
             super().__init__(timeout=60)
-            self.datasets = datasets
+            # Only the current page is held; other pages are fetched when navigated to
+            self.page_datasets = page_datasets
+            self.total_datasets = total_datasets
             self.user_id = user_id
             self.selected_dataset = selected_dataset
             self.current_page = current_page
-            self.items_per_page = 24  # Leave room for footer
-            self.total_pages = math.ceil(len(datasets) / self.items_per_page)
+            self.total_pages = math.ceil(total_datasets / self.items_per_page)
 
             # Add navigation buttons if needed
             if self.total_pages > 1:
@@ -375,20 +470,24 @@ class Daycare(commands.Cog):
             next_button.callback = self.next_page
             self.add_item(next_button)
 
+        @classmethod
+        async def load(cls, user_id, total_datasets, selected_dataset, current_page=0):
+            page_datasets = await fetch_dataset_page(user_id, current_page, cls.items_per_page)
+            return cls(page_datasets, total_datasets, user_id, selected_dataset, current_page)
+
         def create_embed(self):
             start_idx = self.current_page * self.items_per_page
-            end_idx = min(start_idx + self.items_per_page, len(self.datasets))
-            page_datasets = self.datasets[start_idx:end_idx]
+            end_idx = start_idx + len(self.page_datasets)
 
             embed = discord.Embed(
                 title=f"📋 Your Datasets (Page {self.current_page + 1}/{self.total_pages})",
                 color=EMBED_COLOR
             )
 
-            for dataset in page_datasets:
+            for dataset in self.page_datasets:
                 name = dataset["name"]
                 name_lower = dataset["name_lower"]
-                command_count = len(dataset.get("commands", []))
+                command_count = dataset.get("command_count", 0)
                 last_used = dataset.get("last_used")
 
                 status = "<:green_dot:1391644125496873010> Selected" if name_lower == self.selected_dataset else "<:dark:1391644039576682516>"
@@ -400,7 +499,7 @@ class Daycare(commands.Cog):
                     inline=True
                 )
 
-            embed.set_footer(text=f"Total datasets: {len(self.datasets)} | Showing {start_idx + 1}-{end_idx}")
+            embed.set_footer(text=f"Total datasets: {self.total_datasets} | Showing {start_idx + 1}-{end_idx}")
             return embed
 
         async def previous_page(self, interaction):
@@ -409,10 +508,10 @@ class Daycare(commands.Cog):
                 return
 
             self.current_page = max(0, self.current_page - 1)
-            new_view = Daycare.ListPaginationView(
-                self.datasets, 
-                self.user_id, 
-                self.selected_dataset, 
+            new_view = await Daycare.ListPaginationView.load(
+                self.user_id,
+                self.total_datasets,
+                self.selected_dataset,
                 self.current_page
             )
             await interaction.response.edit_message(embed=new_view.create_embed(), view=new_view)
@@ -423,10 +522,10 @@ class Daycare(commands.Cog):
                 return
 
             self.current_page = min(self.total_pages - 1, self.current_page + 1)
-            new_view = Daycare.ListPaginationView(
-                self.datasets, 
-                self.user_id, 
-                self.selected_dataset, 
+            new_view = await Daycare.ListPaginationView.load(
+                self.user_id,
+                self.total_datasets,
+                self.selected_dataset,
                 self.current_page
             )
             await interaction.response.edit_message(embed=new_view.create_embed(), view=new_view)
@@ -442,9 +541,11 @@ class Daycare(commands.Cog):
         user_id = ctx.author.id
 
         try:
-            datasets = await db.db.datasets.find({"user_id": user_id}).to_list(length=None)
+            # Land any pending position and last_used before reading them back
+            await self.sessions.flush(user_id)
+            total_datasets = await db.db.datasets.count_documents({"user_id": user_id})
 
-            if not datasets:
+            if not total_datasets:
                 embed = discord.Embed(
                     title="📋 Your Datasets",
                     description="You have no stored datasets. Use `?store <name>` to create one.",
@@ -457,8 +558,9 @@ class Daycare(commands.Cog):
             user_state = await db.db.user_states.find_one({"user_id": user_id})
             selected_dataset = user_state.get("selected_dataset", "").lower() if user_state else None
 
-            # Create pagination view
-            view = self.ListPaginationView(datasets, user_id, selected_dataset)
+            # Create pagination view with the first page
+            await self.ensure_dataset_fields(user_id)
+            view = await self.ListPaginationView.load(user_id, total_datasets, selected_dataset)
             embed = view.create_embed()
 
             await ctx.reply(embed=embed, view=view if view.total_pages > 1 else None, mention_author=False)
@@ -478,10 +580,9 @@ class Daycare(commands.Cog):
         user_id = ctx.author.id
 
         try:
-            # Get all datasets for this user
-            datasets = await db.db.datasets.find({"user_id": user_id}).to_list(length=None)
+            total_datasets = await db.db.datasets.count_documents({"user_id": user_id})
 
-            if not datasets:
+            if not total_datasets:
                 embed = discord.Embed(
                     title="❌ No Datasets Found",
                     description="You have no stored datasets. Use `?store <name>` to create one.",
@@ -496,7 +597,10 @@ class Daycare(commands.Cog):
                 dataset_name_lower = dataset_name.lower()
 
                 # Find the dataset (case insensitive)
-                selected_dataset = next((d for d in datasets if d["name_lower"] == dataset_name_lower), None)
+                selected_dataset = await db.db.datasets.find_one(
+                    {"user_id": user_id, "name_lower": dataset_name_lower},
+                    {"name": 1, "name_lower": 1}
+                )
 
                 if not selected_dataset:
                     embed = discord.Embed(
@@ -509,6 +613,7 @@ class Daycare(commands.Cog):
 
                 # Update user state
                 current_time = datetime.now(timezone.utc)
+                await self.sessions.discard(user_id)
                 await db.db.user_states.replace_one(
                     {"user_id": user_id},
                     {
@@ -536,7 +641,8 @@ class Daycare(commands.Cog):
                 return
 
             # If no dataset_name provided, show dropdown menu
-            view = self.DatasetSelectView(datasets, user_id)
+            await self.ensure_dataset_fields(user_id)
+            view = await self.DatasetSelectView.load(user_id, total_datasets, self.sessions)
             await ctx.reply("📋 Select a dataset to work with:", view=view, mention_author=False)
 
         except Exception as e:
@@ -554,10 +660,10 @@ class Daycare(commands.Cog):
         user_id = ctx.author.id
 
         try:
-            # Get user state
-            user_state = await db.db.user_states.find_one({"user_id": user_id})
+            # One atomic round trip claims the position; the command comes from the session cache
+            session, current_pos = await self.sessions.advance(user_id)
 
-            if not user_state or not user_state.get("selected_dataset"):
+            if session is None:
                 embed = discord.Embed(
                     title="❌ No Dataset Selected",
                     description="No dataset selected. Use `/select` to choose a dataset first.",
@@ -566,14 +672,9 @@ class Daycare(commands.Cog):
                 await ctx.reply(embed=embed, mention_author=False)
                 return
 
-            dataset_name = user_state["selected_dataset"]
-            dataset_name_lower = user_state.get("selected_dataset_lower", dataset_name.lower())
-            current_pos = user_state.get("current_position", 0)
-
-            # Get the dataset
-            dataset = await db.db.datasets.find_one({"user_id": user_id, "name_lower": dataset_name_lower})
+            dataset_name = session.dataset_name
 
-            if not dataset:
+            if session.commands is None:
                 embed = discord.Embed(
                     title="❌ Dataset Not Found",
                     description=f"Dataset **{dataset_name}** not found.",
@@ -582,9 +683,9 @@ class Daycare(commands.Cog):
                 await ctx.reply(embed=embed, mention_author=False)
                 return
 
-            commands = dataset.get("commands", [])
+            commands = session.commands
 
-            if current_pos >= len(commands):
+            if current_pos is None:
                 embed = discord.Embed(
                     title="❌ No More Commands",
                     description=f"No more commands available in dataset **{dataset_name}**.",
@@ -596,22 +697,9 @@ class Daycare(commands.Cog):
             # Get current command (BEFORE incrementing position)
             command = commands[current_pos]
 
-            # Calculate new position for next time
+            # Position for next time, already stored by the claim
             new_position = current_pos + 1
 
-            # Update position
-            await db.db.user_states.update_one(
-                {"user_id": user_id},
-                {"$set": {"current_position": new_position}}
-            )
-
-            # Update last used
-            current_time = datetime.now(timezone.utc)
-            await db.db.datasets.update_one(
-                {"user_id": user_id, "name_lower": dataset_name_lower},
-                {"$set": {"last_used": current_time}}
-            )
-
             embed = discord.Embed(
                 title=f"📝 Next Command from **{dataset_name}**",
                 description=f"**Entry {current_pos + 1}/{len(commands)}**\n```{command}```",
@@ -637,10 +725,10 @@ class Daycare(commands.Cog):
         user_id = ctx.author.id
 
         try:
-            # Get user state
-            user_state = await db.db.user_states.find_one({"user_id": user_id})
+            # The dataset comes from the session cache; the new position is one atomic round trip
+            session = await self.sessions.get(user_id)
 
-            if not user_state or not user_state.get("selected_dataset"):
+            if session is None:
                 embed = discord.Embed(
                     title="❌ No Dataset Selected",
                     description="No dataset selected. Use `/select` to choose a dataset first.",
@@ -649,14 +737,9 @@ class Daycare(commands.Cog):
                 await ctx.reply(embed=embed, mention_author=False)
                 return
 
-            dataset_name = user_state["selected_dataset"]
-            dataset_name_lower = user_state.get("selected_dataset_lower", dataset_name.lower())
-            old_position = user_state.get("current_position", 0)
-
-            # Get the dataset
-            dataset = await db.db.datasets.find_one({"user_id": user_id, "name_lower": dataset_name_lower})
+            dataset_name = session.dataset_name
 
-            if not dataset:
+            if session.commands is None:
                 embed = discord.Embed(
                     title="❌ Dataset Not Found",
                     description=f"Dataset **{dataset_name}** not found.",
@@ -665,7 +748,7 @@ class Daycare(commands.Cog):
                 await ctx.reply(embed=embed, mention_author=False)
                 return
 
-            commands = dataset.get("commands", [])
+            commands = session.commands
 
             if entry_number < 1 or entry_number > len(commands):
                 embed = discord.Embed(
@@ -678,21 +761,18 @@ class Daycare(commands.Cog):
 
             # Update position to the entry number (so next /next will get entry_number + 1)
             new_position = entry_number
-            await db.db.user_states.update_one(
-                {"user_id": user_id},
-                {"$set": {"current_position": new_position}}
-            )
+            if not await self.sessions.jump(session, new_position):
+                embed = discord.Embed(
+                    title="❌ Selection Changed",
+                    description="Your selected dataset changed while jumping. Please try again.",
+                    color=EMBED_COLOR
+                )
+                await ctx.reply(embed=embed, mention_author=False)
+                return
 
             # Get the requested command (entry_number - 1 because arrays are 0-indexed)
             command = commands[entry_number - 1]
 
-            # Update last used
-            current_time = datetime.now(timezone.utc)
-            await db.db.datasets.update_one(
-                {"user_id": user_id, "name_lower": dataset_name_lower},
-                {"$set": {"last_used": current_time}}
-            )
-
             embed = discord.Embed(
                 title=f"🎯 Jumped to Entry in **{dataset_name}**",
                 description=f"**Entry {entry_number}/{len(commands)}**\n```{command}```",
@@ -717,10 +797,10 @@ class Daycare(commands.Cog):
         user_id = ctx.author.id
 
         try:
-            # Get user state
-            user_state = await db.db.user_states.find_one({"user_id": user_id})
+            # Position re-read from MongoDB, so advances made elsewhere show up
+            session = await self.sessions.current(user_id)
 
-            if not user_state or not user_state.get("selected_dataset"):
+            if session is None:
                 embed = discord.Embed(
                     title="📍 Current Status",
                     description="No dataset currently selected. Use `/select` to choose one.",
@@ -729,14 +809,10 @@ class Daycare(commands.Cog):
                 await ctx.reply(embed=embed, mention_author=False)
                 return
 
-            dataset_name = user_state["selected_dataset"]
-            dataset_name_lower = user_state.get("selected_dataset_lower", dataset_name.lower())
-            current_pos = user_state.get("current_position", 0)
-
-            # Get the dataset
-            dataset = await db.db.datasets.find_one({"user_id": user_id, "name_lower": dataset_name_lower})
+            dataset_name = session.dataset_name
+            current_pos = session.position
 
-            if not dataset:
+            if session.commands is None:
                 embed = discord.Embed(
                     title="❌ Dataset Not Found",
                     description=f"Selected dataset **{dataset_name}** no longer exists.",
@@ -745,7 +821,7 @@ class Daycare(commands.Cog):
                 await ctx.reply(embed=embed, mention_author=False)
                 return
 
-            commands = dataset.get("commands", [])
+            commands = session.commands
 
             embed = discord.Embed(
                 title=f"📍 Current Status: **{dataset_name}**",
@@ -782,7 +858,7 @@ class Daycare(commands.Cog):
             embed.add_field(name="📈 Remaining", value=max(0, len(commands) - current_pos), inline=True)
 
             # Last used
-            last_used = dataset.get("last_used")
+            last_used = session.last_used
             if last_used:
                 embed.add_field(name="🕐 Last Used", value=f"<t:{int(last_used.timestamp())}:R>", inline=True)
 
@@ -896,8 +972,11 @@ class Daycare(commands.Cog):
                 await ctx.reply(embed=embed, mention_author=False)
                 return
 
-            # Delete the dataset
+            # Delete the dataset, then drop any session that loaded it meanwhile; a last_used
+            # write-back landing after the delete matches nothing. Other processes reload too.
             await db.db.datasets.delete_one({"user_id": user_id, "name_lower": dataset_name_lower})
+            await self.sessions.discard(user_id)
+            await bump_dataset_version(user_id, dataset_name_lower)
 
             embed = discord.Embed(
                 title="✅ Dataset Deleted",
@@ -959,21 +1038,18 @@ class Daycare(commands.Cog):
 
             # Update the dataset
             current_time = datetime.now(timezone.utc)
+            await self.sessions.discard(user_id)
             await db.db.datasets.update_one(
                 {"user_id": user_id, "name_lower": dataset_name_lower},
                 {"$set": {
                     "commands": commands,
+                    "command_count": len(commands),
                     "last_modified": current_time
                 }}
             )
 
-            # Reset position if user has this dataset selected
-            user_state = await db.db.user_states.find_one({"user_id": user_id})
-            if user_state and user_state.get("selected_dataset", "").lower() == dataset_name_lower:
-                await db.db.user_states.update_one(
-                    {"user_id": user_id},
-                    {"$set": {"current_position": 0}}
-                )
+            # Reset position if user has this dataset selected, and make other processes reload it
+            await bump_dataset_version(user_id, dataset_name_lower, reset_position=True)
 
             embed = discord.Embed(
                 title="✅ Dataset Updated",
@@ -1055,14 +1131,26 @@ class Daycare(commands.Cog):
 
             # Update the dataset name
             current_time = datetime.now(timezone.utc)
-            await db.db.datasets.update_one(
-                {"user_id": user_id, "name_lower": old_name_lower},
-                {"$set": {
-                    "name": new_name,
-                    "name_lower": new_name_lower,
-                    "last_modified": current_time
-                }}
-            )
+            await self.sessions.discard(user_id)
+            try:
+                await db.db.datasets.update_one(
+                    {"user_id": user_id, "name_lower": old_name_lower},
+                    {"$set": {
+                        "name": new_name,
+                        "name_lower": new_name_lower,
+                        "name_trigrams": name_trigrams(new_name_lower),
+                        "last_modified": current_time
+                    }}
+                )
+            except DuplicateKeyError:
+                # The name was taken after the check above
+                embed = discord.Embed(
+                    title="❌ Name Already Exists",
+                    description=f"A dataset with the name **{new_name}** already exists.",
+                    color=EMBED_COLOR
+                )
+                await ctx.reply(embed=embed, mention_author=False)
+                return
 
             # Update user state if this dataset is selected
             user_state = await db.db.user_states.find_one({"user_id": user_id})
@@ -1099,6 +1187,8 @@ class Daycare(commands.Cog):
         dataset_name_lower = dataset_name.lower()
 
         try:
+            # Land any pending position and last_used before reading them back
+            await self.sessions.flush(user_id)
             dataset = await db.db.datasets.find_one({"user_id": user_id, "name_lower": dataset_name_lower})
             if not dataset:
                 embed = discord.Embed(
@@ -1176,7 +1266,7 @@ class Daycare(commands.Cog):
 
     @commands.command(name='search')
     async def search_command(self, ctx, *, search_term: str):
-        """Search for datasets by name (case insensitive)"""
+        """Search for datasets by name (case insensitive, tolerates typos)"""
         user_id = ctx.author.id
         search_term = search_term.strip().lower()
 
@@ -1190,10 +1280,11 @@ class Daycare(commands.Cog):
             return
 
         try:
-            # Find all datasets for user
-            all_datasets = await db.db.datasets.find({"user_id": user_id}).to_list(length=None)
+            # Land any pending position and last_used before reading them back
+            await self.sessions.flush(user_id)
+            total_datasets = await db.db.datasets.count_documents({"user_id": user_id})
 
-            if not all_datasets:
+            if not total_datasets:
                 embed = discord.Embed(
                     title="📋 Search Results",
                     description="You have no stored datasets. Use `?store <name>` to create one.",
@@ -1202,8 +1293,9 @@ class Daycare(commands.Cog):
                 await ctx.reply(embed=embed, mention_author=False)
                 return
 
-            # Filter datasets by search term (case insensitive)
-            matching_datasets = [d for d in all_datasets if search_term in d["name_lower"]]
+            # Ranked matches (exact, prefix, substring, then close spellings) from the indexes
+            await self.ensure_dataset_fields(user_id)
+            matching_datasets = await self.dataset_search.search(user_id, search_term)
 
             if not matching_datasets:
                 embed = discord.Embed(
@@ -1211,7 +1303,7 @@ class Daycare(commands.Cog):
                     description=f"No datasets found containing **'{search_term}'**.",
                     color=EMBED_COLOR
                 )
-                embed.set_footer(text=f"Searched in {len(all_datasets)} total datasets")
+                embed.set_footer(text=f"Searched in {total_datasets} total datasets")
                 await ctx.reply(embed=embed, mention_author=False)
                 return
 
@@ -1229,7 +1321,7 @@ class Daycare(commands.Cog):
                 for dataset in matching_datasets:
                     name = dataset["name"]
                     name_lower = dataset["name_lower"]
-                    command_count = len(dataset.get("commands", []))
+                    command_count = dataset.get("command_count", 0)
                     last_used = dataset.get("last_used")
 
                     status = "<:green_dot:1391644125496873010> Selected" if name_lower == selected_dataset else "<:dark:1391644039576682516>"
@@ -1241,7 +1333,7 @@ class Daycare(commands.Cog):
                         inline=True
                     )
 
-                embed.set_footer(text=f"Found {len(matching_datasets)} of {len(all_datasets)} datasets")
+                embed.set_footer(text=f"Found {len(matching_datasets)} of {total_datasets} datasets")
                 await ctx.reply(embed=embed, mention_author=False)
             else:
                 # Use pagination for large results
@@ -1295,7 +1387,7 @@ class Daycare(commands.Cog):
                         for dataset in page_datasets:
                             name = dataset["name"]
                             name_lower = dataset["name_lower"]
-                            command_count = len(dataset.get("commands", []))
+                            command_count = dataset.get("command_count", 0)
                             last_used = dataset.get("last_used")
 
                             status = "<:green_dot:1391644125496873010> Selected" if name_lower == self.selected_dataset else "<:dark:1391644039576682516>"
@@ -1338,7 +1430,7 @@ class Daycare(commands.Cog):
 
                 view = SearchPaginationView(
                     matching_datasets, user_id, selected_dataset, 
-                    search_term, len(all_datasets)
+                    search_term, total_datasets
                 )
                 embed = view.create_embed()
                 await ctx.reply(embed=embed, view=view, mention_author=False)
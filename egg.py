@@ -1,15 +1,38 @@
 import discord
 import re
-import json
-import os
-from datetime import datetime
 from discord.ext import commands
-from config import EMBED_COLOR
+from .core.sprites import get_sprite_catalog
+from .core.settings_cache import get_settings_cache
+from .core.recent import get_recent_messages
+from .core.resolver import get_message_resolver
+from .core.dispatch import HATCH, POKETWO_ID, get_dispatcher
+from .core.dedupe import get_post_dedupe
+from .core.embed_templates import GENDER_EMOJIS, format_pokemon, jump_view, render_embed
+from .core.events import build_event, get_event_store
+from .core.leaderboards import get_leaderboards
+from .core.outbound import (ALREADY_POSTED, DROPPED, NO_STARBOARD, NOT_QUALIFYING, NOT_SENT_REASONS, QUEUED,
+                            get_post_queue, post_priority, starboard_targets)
 
 class Egg(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.pokemon_data = self.load_pokemon_data()
+        self.sprites = get_sprite_catalog(bot)
+        self.settings = get_settings_cache(bot)
+        self.post_queue = get_post_queue(bot)
+        self.dedupe = get_post_dedupe(bot)
+        self.events = get_event_store(bot)
+        self.leaderboards = get_leaderboards(bot)
+        self.recent = get_recent_messages(bot)
+        self.resolver = get_message_resolver(bot)
+        self.dispatcher = get_dispatcher(bot)
+        self.dispatcher.register(HATCH, self.handle_hatch_message)
+
+    async def cog_unload(self):
+        self.dispatcher.unregister(HATCH, self.handle_hatch_message)
+        # Let posts and events this cog already queued go out before it disappears
+        await self.post_queue.drain(owner=self.qualified_name)
+        await self.events.flush()
+        await self.leaderboards.flush()
 
     @property
     def db(self):
@@ -17,96 +40,13 @@ class Egg(commands.Cog):
         import __main__
         return getattr(__main__, 'db', None)
 
-    def load_pokemon_data(self):
-        """Load Pokemon data from starboard.txt file"""
-        try:
-            # Try to load from the same directory as the cog
-            starboard_file = os.path.join(os.path.dirname(__file__), '..', 'starboard.txt')
-            if not os.path.exists(starboard_file):
-                # Fallback to current directory
-                starboard_file = 'starboard.txt'
-
-            with open(starboard_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return data
-        except Exception as e:
-            print(f"Error loading Pokemon data: {e}")
-            return {}
-
     def get_gender_emoji(self, gender):
         """Get gender emoji based on gender"""
-        if gender == 'male':
-            return "<:male:1420708128785170453>"
-        elif gender == 'female':
-            return "<:female:1420708136943095889>"
-        elif gender == 'unknown':
-            return "<:unknown:1420708112310210560>"
-        else:
-            return ""
+        return GENDER_EMOJIS.get(gender, "")
 
     def find_pokemon_image_url(self, pokemon_name, is_shiny=False, gender=None, is_gigantamax=False):
         """Find Pokemon image URL from the loaded data with gender and Gigantamax support"""
-        # Normalize the pokemon name for matching
-        normalized_name = pokemon_name.strip().lower()
-
-        # If it's Gigantamax, search for Gigantamax variant first
-        if is_gigantamax:
-            # First try to find Gigantamax variant
-            gigantamax_name = f"gigantamax {normalized_name}"
-
-            for key, value in self.pokemon_data.items():
-                if key.startswith('variant_') and 'gigantamax' in key.lower():
-                    pokemon_display_name = value.get('name', '').lower()
-                    if gigantamax_name == pokemon_display_name:
-                        base_url = value.get('image_url', '')
-                        if is_shiny and base_url:
-                            # Replace 'images' with 'shiny' for shiny Gigantamax
-                            return base_url.replace('/images/', '/shiny/')
-                        return base_url
-
-        # Function to search for Pokemon with proper female variant handling
-        def search_pokemon(search_name, prefer_female=False):
-            # First, try to find exact match
-            for key, value in self.pokemon_data.items():
-                pokemon_entry_name = value.get('name', '').lower()
-
-                # Handle the case where female variants have "_female" in the name
-                if prefer_female and gender == 'female':
-                    # First try to find female variant
-                    if pokemon_entry_name == f"{search_name}_female":
-                        return value.get('image_url', '')
-
-                # Try exact match with the search name
-                if pokemon_entry_name == search_name:
-                    return value.get('image_url', '')
-
-            # If no exact match, try partial matching
-            for key, value in self.pokemon_data.items():
-                pokemon_entry_name = value.get('name', '').lower()
-
-                # Handle female variants in partial matching
-                if prefer_female and gender == 'female':
-                    if f"{search_name}_female" in pokemon_entry_name or pokemon_entry_name in f"{search_name}_female":
-                        return value.get('image_url', '')
-
-                # Regular partial matching
-                if search_name in pokemon_entry_name or pokemon_entry_name in search_name:
-                    return value.get('image_url', '')
-
-            return None
-
-        # Search for Pokemon image URL
-        base_url = search_pokemon(normalized_name, prefer_female=True)
-
-        # If female variant not found and we were looking for female, try the base name
-        if base_url is None and gender == 'female':
-            base_url = search_pokemon(normalized_name, prefer_female=False)
-
-        if base_url and is_shiny:
-            # Replace 'images' with 'shiny' for shiny Pokemon
-            return base_url.replace('/images/', '/shiny/')
-
-        return base_url
+        return self.sprites.find(pokemon_name, is_shiny, gender, is_gigantamax)
 
     async def get_starboard_channel(self, guild_id):
         """Get the starboard channel for a guild"""
@@ -114,7 +54,7 @@ class Egg(commands.Cog):
             return None
 
         try:
-            guild_settings = await self.db.guild_settings.find_one({"guild_id": guild_id})
+            guild_settings = await self.settings.get_guild_settings(self.db, guild_id)
             if guild_settings:
                 return guild_settings.get('starboard_channel_id')
         except Exception as e:
@@ -127,7 +67,7 @@ class Egg(commands.Cog):
             return None
 
         try:
-            global_settings = await self.db.global_settings.find_one({"_id": "starboard"})
+            global_settings = await self.settings.get_global_settings(self.db)
             if global_settings:
                 return global_settings.get('global_starboard_channel_id')
         except Exception as e:
@@ -188,8 +128,9 @@ class Egg(commands.Cog):
         match = re.search(regular_pattern, message_content)
         if not match:
             # Try pattern without bold formatting (fallback)
-            regular_pattern_no_bold = r"Your <:egg_[^>]+> (.+?) Egg has hatched into a <:_:\d+> (✨ )?Level (\d+) (.+?)(?:\s+\((\d+\.?\d*)%\))?"
-            match = re.search(regular_pattern_no_bold, message_content)
+            # Anchored to the end of the line, or the lazy name group would stop after one character
+            regular_pattern_no_bold = r"Your <:egg_[^>]+> (.+?) Egg has hatched into a <:_:\d+> (✨ )?Level (\d+) (.+?)(?:\s+\((\d+\.?\d*)%\))?$"
+            match = re.search(regular_pattern_no_bold, message_content, re.MULTILINE)
 
         if not match:
             return None
@@ -244,12 +185,13 @@ class Egg(commands.Cog):
         if not message.reference:
             return None
 
-        try:
-            # Try cached first
-            if message.reference.resolved:
-                return message.reference.resolved.author.id
+        # Resolved locally when possible: gateway data, then the recent message caches
+        reply_author_id = self.recent.reply_author_id(message)
+        if reply_author_id:
+            return reply_author_id
 
-            # Fetch if not cached
+        try:
+            # Fetch as a last resort
             referenced_message = await message.channel.fetch_message(message.reference.message_id)
             return referenced_message.author.id
 
@@ -260,146 +202,106 @@ class Egg(commands.Cog):
     def create_hatch_embed(self, hatch_data, embed_type, message=None):
         """Create embed for hatch"""
         pokemon_name = hatch_data['pokemon_name']
-        level = hatch_data['level']
-        iv = hatch_data['iv']
         is_shiny = hatch_data['is_shiny']
         is_gigantamax = hatch_data['is_gigantamax']
         gender = hatch_data.get('gender')
-        hatched_by_id = hatch_data.get('hatched_by_id')
-
-        # Format IV display
-        if iv == "Hidden":
-            iv_display = "Hidden"
-        else:
-            iv_display = f"{iv}%"
-
-        # Get gender emoji
-        gender_emoji = self.get_gender_emoji(gender)
-
-        # Format Pokemon name with gender emoji - always include if we have gender info
-        if gender_emoji:
-            pokemon_display = f"{pokemon_name} {gender_emoji}"
-        else:
-            pokemon_display = pokemon_name
 
         # Debug print to help troubleshoot
         print(f"DEBUG: Creating hatch embed - Pokemon: '{pokemon_name}', Gender: '{gender}', Type: '{embed_type}'")
 
-        # Get Pokemon image URL with gender and Gigantamax support
-        image_url = self.find_pokemon_image_url(pokemon_name, is_shiny, gender, is_gigantamax)
-
-        embed = discord.Embed(color=EMBED_COLOR, timestamp=datetime.utcnow())
-
-        # Base description builder
-        base_description = f"**Pokémon:** {pokemon_display}\n**Level:** {level}\n**IV:** {iv_display}"
-        if hatched_by_id:
-            description = f"**Hatched By:** <@{hatched_by_id}>\n{base_description}"
-        else:
-            description = base_description
-
-        # Set title and description based on embed type
-        embed_titles = {
-            'shiny_gmax_high_iv': "<:egg:1427226230352117825><:gigantamax:1420708122267226202> ✨ 📈 Ultimate Hatch - Shiny Gigantamax High IV! 📈 ✨ <:gigantamax:1420708122267226202><:egg:1427226230352117825>",
-            'shiny_gmax_low_iv': "<:egg:1427226230352117825><:gigantamax:1420708122267226202> ✨ 📉 Ultimate Hatch - Shiny Gigantamax Low IV! 📉 ✨ <:gigantamax:1420708122267226202><:egg:1427226230352117825>",
-            'shiny_gmax': "<:egg:1427226230352117825><:gigantamax:1420708122267226202> ✨ Gigantamax Sparkling Hatch Detected ✨ <:gigantamax:1420708122267226202><:egg:1427226230352117825>",
-            'shiny_high_iv': "<:egg:1427226230352117825>✨ 📈 Sparkling High IV Hatch Detected 📈 ✨<:egg:1427226230352117825>",
-            'shiny_low_iv': "<:egg:1427226230352117825>✨ 📉 Sparkling Low IV Hatch Detected 📉 ✨<:egg:1427226230352117825>",
-            'gmax_high_iv': "<:egg:1427226230352117825><:gigantamax:1420708122267226202> 📈 Gigantamax High IV Hatch Detected 📈 <:gigantamax:1420708122267226202><:egg:1427226230352117825>",
-            'gmax_low_iv': "<:egg:1427226230352117825><:gigantamax:1420708122267226202> 📉 Gigantamax Low IV Hatch Detected 📉 <:gigantamax:1420708122267226202><:egg:1427226230352117825>",
-            'gigantamax': "<:egg:1427226230352117825><:gigantamax:1420708122267226202> Gigantamax Hatch Detected <:gigantamax:1420708122267226202><:egg:1427226230352117825>",
-            'shiny': "<:egg:1427226230352117825>✨ Sparkling Hatch Detected ✨<:egg:1427226230352117825>",
-            'iv_high': "<:egg:1427226230352117825>📈 Rare IV Hatch Detected 📈<:egg:1427226230352117825>",
-            'iv_low': "<:egg:1427226230352117825>📉 Rare IV Hatch Detected 📉<:egg:1427226230352117825>"
-        }
-
-        embed.title = embed_titles.get(embed_type, "Rare Hatch Detected")
-        embed.description = description
-
-        if image_url:
-            embed.set_thumbnail(url=image_url)
-
-        # Create view with jump to message button
-        view = discord.ui.View()
-        if message:
-            jump_button = discord.ui.Button(
-                label="Jump to Message",
-                url=message.jump_url,
-                emoji="🔗",
-                style=discord.ButtonStyle.link
-            )
-            view.add_item(jump_button)
-
-        return embed, view
-
-    async def send_to_starboard_channels(self, guild, hatch_data, original_message=None):
-        """Send hatch data to appropriate starboard channels"""
+        embed = render_embed(
+            'hatch', embed_type, False,
+            format_pokemon(pokemon_name, gender),
+            hatch_data['level'],
+            hatch_data['iv'],
+            user_id=hatch_data.get('hatched_by_id'),
+            image_url=self.find_pokemon_image_url(pokemon_name, is_shiny, gender, is_gigantamax)
+        )
+        return embed, jump_view(message)
+
+    def determine_embed_type(self, hatch_data):
+        """Pick the embed type for a hatch, or None if it doesn't qualify"""
         is_shiny = hatch_data['is_shiny']
         is_gigantamax = hatch_data['is_gigantamax']
         iv = hatch_data['iv']
 
-        # Get server starboard channel
-        server_starboard_id = await self.get_starboard_channel(guild.id)
-        server_starboard_channel = None
-        if server_starboard_id:
-            server_starboard_channel = guild.get_channel(server_starboard_id)
-
-        # Get global starboard channel
-        global_starboard_id = await self.get_global_starboard_channel()
-        global_starboard_channel = None
-        if global_starboard_id:
-            global_starboard_channel = self.bot.get_channel(global_starboard_id)
-
         # Determine IV category
         is_high_iv = isinstance(iv, (int, float)) and iv >= 90
         is_low_iv = isinstance(iv, (int, float)) and iv <= 10
 
-        # Determine the embed type based on all combinations
-        embed_type = None
-
         # Priority order: Most specific combinations first
         if is_shiny and is_gigantamax and is_high_iv:
-            embed_type = 'shiny_gmax_high_iv'
+            return 'shiny_gmax_high_iv'
         elif is_shiny and is_gigantamax and is_low_iv:
-            embed_type = 'shiny_gmax_low_iv'
+            return 'shiny_gmax_low_iv'
         elif is_shiny and is_gigantamax:
-            embed_type = 'shiny_gmax'
+            return 'shiny_gmax'
         elif is_shiny and is_high_iv:
-            embed_type = 'shiny_high_iv'
+            return 'shiny_high_iv'
         elif is_shiny and is_low_iv:
-            embed_type = 'shiny_low_iv'
+            return 'shiny_low_iv'
         elif is_gigantamax and is_high_iv:
-            embed_type = 'gmax_high_iv'
+            return 'gmax_high_iv'
         elif is_gigantamax and is_low_iv:
-            embed_type = 'gmax_low_iv'
+            return 'gmax_low_iv'
         elif is_gigantamax:
-            embed_type = 'gigantamax'
+            return 'gigantamax'
         elif is_shiny:
-            embed_type = 'shiny'
+            return 'shiny'
         elif is_high_iv:
-            embed_type = 'iv_high'
+            return 'iv_high'
         elif is_low_iv:
-            embed_type = 'iv_low'
+            return 'iv_low'
+        return None
+
+    async def send_to_starboard_channels(self, guild, hatch_data, original_message=None):
+        """Send hatch data to appropriate starboard channels; returns QUEUED, or why nothing was queued"""
+        embed_type = self.determine_embed_type(hatch_data)
 
         # If no criteria met, don't send
         if embed_type is None:
-            return
+            return NOT_QUALIFYING
+
+        # Skip messages the listener or a manual check already posted
+        if original_message is not None and not await self.dedupe.claim(self.db, original_message.id):
+            return ALREADY_POSTED
+
+        # Get server starboard channel
+        server_starboard_id = await self.get_starboard_channel(guild.id)
+        server_starboard_channel = None
+        if server_starboard_id:
+            server_starboard_channel = guild.get_channel(server_starboard_id)
 
-        # Create the embed
-        embed, view = self.create_hatch_embed(hatch_data, embed_type, original_message)
+        # Get global starboard channel
+        global_starboard_id = await self.get_global_starboard_channel()
+        global_starboard_channel = None
+        if global_starboard_id:
+            global_starboard_channel = self.bot.get_channel(global_starboard_id)
 
-        # Send to server starboard if configured
-        if server_starboard_channel:
-            try:
-                await server_starboard_channel.send(embed=embed, view=view)
-            except Exception as e:
-                print(f"Error sending to server starboard: {e}")
+        result = NO_STARBOARD
+        targets = starboard_targets(server_starboard_channel, global_starboard_channel)
+        if targets:
+            # Create the embed and queue it for both starboards
+            embed, view = self.create_hatch_embed(hatch_data, embed_type, original_message)
+            accepted = self.post_queue.submit(
+                [(target, channel, {'embed': embed, 'view': view}) for target, channel in targets],
+                post_priority(hatch_data),
+                owner=self.qualified_name
+            )
+            result = QUEUED if accepted else DROPPED
+
+        # Pasted text can't be verified or deduplicated, so it is posted but never recorded or counted
+        if original_message is not None:
+            if result == QUEUED:
+                # Recorded together with the claim, so a released claim is never counted twice
+                event = build_event(hatch_data, [embed_type], guild.id, hatch_data.get('hatched_by_id'), original_message)
+                self.events.record(event)
+                self.leaderboards.record(event, guild.id)
+            else:
+                # Nothing went out; leave it for a later check or backfill
+                await self.dedupe.release(self.db, original_message.id)
 
-        # Send to global starboard if configured
-        if global_starboard_channel:
-            try:
-                await global_starboard_channel.send(embed=embed, view=view)
-            except Exception as e:
-                print(f"Error sending to global starboard: {e}")
+        return result
 
     @commands.command(name="eggcheck")
     @commands.has_permissions(administrator=True)
@@ -436,29 +338,16 @@ class Egg(commands.Cog):
             if input_data.strip().isdigit():
                 message_id = int(input_data.strip())
                 try:
-                    # Try to fetch the message from the current channel first
-                    try:
-                        original_message = await ctx.channel.fetch_message(message_id)
-                    except discord.NotFound:
-                        # If not found in current channel, search in all channels in the guild
-                        found_message = None
-                        for channel in ctx.guild.text_channels:
-                            if channel.permissions_for(ctx.guild.me).read_message_history:
-                                try:
-                                    found_message = await channel.fetch_message(message_id)
-                                    original_message = found_message
-                                    break
-                                except (discord.NotFound, discord.Forbidden):
-                                    continue
-
-                        if not found_message:
-                            await ctx.reply(f"❌ Could not find message with ID `{message_id}` in this server.")
-                            return
+                    # Look the message up across the server, starting with this channel
+                    original_message = await self.resolver.resolve(ctx.guild, message_id, ctx.channel)
+                    if original_message is None:
+                        await ctx.reply(f"❌ Could not find message with ID `{message_id}` in this server.")
+                        return
 
                     hatch_message = original_message.content
 
                     # Check if the message is from Poketwo
-                    if original_message.author.id != 716390085896962058:
+                    if original_message.author.id != POKETWO_ID:
                         await ctx.reply(f"❌ The message with ID `{message_id}` is not from Poketwo.")
                         return
 
@@ -525,7 +414,10 @@ class Egg(commands.Cog):
             return
 
         # Send to starboard
-        await self.send_to_starboard_channels(ctx.guild, hatch_data, original_message)
+        result = await self.send_to_starboard_channels(ctx.guild, hatch_data, original_message)
+        if result != QUEUED:
+            await ctx.reply(f"ℹ️ This hatch was not sent: {NOT_SENT_REASONS[result]}.")
+            return
 
         criteria_text = ", ".join(criteria_met)
         # Format IV for success message
@@ -563,34 +455,27 @@ class Egg(commands.Cog):
             print(f"Unexpected error in eggcheck: {error}")
             await ctx.reply("❌ An unexpected error occurred. Please try again.")
 
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        """Listen for Poketwo hatch messages"""
-        # Only process messages from Poketwo
-        if message.author.id != 716390085896962058:
-            return
-
-        # Check if it's a hatch message - more flexible detection
-        if "has hatched into" in message.content and "Egg" in message.content:
-            # Get the user who hatched the egg from the reply
-            hatched_by_id = await self.get_hatched_by_user(message)
-            hatch_data = self.parse_poketwo_hatch_message(message.content, hatched_by_id)
+    async def handle_hatch_message(self, message):
+        """Handle a Poketwo hatch message routed here by the dispatcher"""
+        # Get the user who hatched the egg from the reply
+        hatched_by_id = await self.get_hatched_by_user(message)
+        hatch_data = self.parse_poketwo_hatch_message(message.content, hatched_by_id)
 
-            if not hatch_data:
-                print(f"DEBUG: Failed to parse hatch message: {message.content[:100]}...")
-                return
+        if not hatch_data:
+            print(f"DEBUG: Failed to parse hatch message: {message.content[:100]}...")
+            return
 
-            # Check if this hatch is worthy of starboard
-            is_shiny = hatch_data['is_shiny']
-            is_gigantamax = hatch_data['is_gigantamax']
-            iv = hatch_data['iv']
+        # Check if this hatch is worthy of starboard
+        is_shiny = hatch_data['is_shiny']
+        is_gigantamax = hatch_data['is_gigantamax']
+        iv = hatch_data['iv']
 
-            print(f"DEBUG: Hatch detected - Shiny: {is_shiny}, Gigantamax: {is_gigantamax}, IV: {iv}")
+        print(f"DEBUG: Hatch detected - Shiny: {is_shiny}, Gigantamax: {is_gigantamax}, IV: {iv}")
 
-            # Check criteria: shiny, gigantamax, or rare IV
-            if is_shiny or is_gigantamax or (isinstance(iv, (int, float)) and (iv >= 90 or iv <= 10)):
-                print(f"DEBUG: Sending to starboard - Pokemon: {hatch_data['pokemon_name']}")
-                await self.send_to_starboard_channels(message.guild, hatch_data, message)
+        # Check criteria: shiny, gigantamax, or rare IV
+        if is_shiny or is_gigantamax or (isinstance(iv, (int, float)) and (iv >= 90 or iv <= 10)):
+            print(f"DEBUG: Sending to starboard - Pokemon: {hatch_data['pokemon_name']}")
+            return await self.send_to_starboard_channels(message.guild, hatch_data, message)
 
 async def setup(bot):
     await bot.add_cog(Egg(bot))
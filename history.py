@@ -0,0 +1,320 @@
+import discord
+import re
+import shlex
+from datetime import timezone
+from discord.ext import commands
+from config import EMBED_COLOR
+from .core.embed_templates import GIGANTAMAX_EMOJI, format_iv
+from .core.events import RARE_IV_HIGH, RARE_IV_LOW
+from .core.leaderboards import GLOBAL_SCOPE, get_leaderboards
+
+USER_PATTERN = re.compile(r"<@!?(\d+)>|(\d{15,20})")
+IV_RANGE_PATTERN = re.compile(r"(\d+(?:\.\d+)?)-(\d+(?:\.\d+)?)")
+IV_BOUND_PATTERN = re.compile(r"(>=|<=|>|<)(\d+(?:\.\d+)?)")
+IV_OPERATORS = {'>=': '$gte', '<=': '$lte', '>': '$gt', '<': '$lt'}
+
+# Leaderboard names accepted by the command -> (category, title)
+LEADERBOARD_NAMES = {
+    'shiny': ('shiny', "✨ Top Shiny Hunters"),
+    'gmax': ('gigantamax', f"{GIGANTAMAX_EMOJI} Top Gigantamax Catchers"),
+    'gigantamax': ('gigantamax', f"{GIGANTAMAX_EMOJI} Top Gigantamax Catchers"),
+    'iv': ('rare_iv', "📈 Most Rare IV Rolls"),
+    'rareiv': ('rare_iv', "📈 Most Rare IV Rolls")
+}
+
+EVENT_TYPE_LABELS = {
+    'catch': "Catch",
+    'missingno': "MissingNo.",
+    'hatch': "Hatch",
+    'unbox': "Unbox"
+}
+
+# Only the fields a history page shows are read back
+HISTORY_PROJECTION = {
+    'user_id': 1, 'type': 1, 'species': 1, 'level': 1, 'iv': 1, 'shiny': 1,
+    'gigantamax': 1, 'message_id': 1, 'channel_id': 1, 'created_at': 1
+}
+
+
+def parse_history_filters(filter_text):
+    """Turn "user:@someone species:pikachu shiny gmax iv:>=90" into a query and a readable summary"""
+    query = {}
+    summary = []
+
+    for token in shlex.split(filter_text or ""):
+        key, _, value = token.partition(':')
+        key = key.lower()
+
+        if key == 'user' or (not value and USER_PATTERN.fullmatch(token)):
+            match = USER_PATTERN.fullmatch(value or token)
+            if not match:
+                raise ValueError(f"`{token}` isn't a user mention or ID")
+            user_id = int(match.group(1) or match.group(2))
+            query['user_id'] = user_id
+            summary.append(f"User: <@{user_id}>")
+        elif key == 'species' and value:
+            query['species_key'] = value.lower()
+            summary.append(f"Species: {value}")
+        elif key == 'shiny' and not value:
+            query['shiny'] = True
+            summary.append("Shiny")
+        elif key in ('gmax', 'gigantamax') and not value:
+            query['gigantamax'] = True
+            summary.append("Gigantamax")
+        elif key == 'iv' and value:
+            range_match = IV_RANGE_PATTERN.fullmatch(value)
+            bound_match = IV_BOUND_PATTERN.fullmatch(value)
+            if range_match:
+                low, high = sorted((float(range_match.group(1)), float(range_match.group(2))))
+                query['iv'] = {'$gte': low, '$lte': high}
+            elif bound_match:
+                operator, bound = bound_match.group(1), float(bound_match.group(2))
+                low, high = (bound, 100.0) if operator.startswith('>') else (0.0, bound)
+                query['iv'] = {IV_OPERATORS[operator]: bound}
+            else:
+                raise ValueError(f"`{token}` isn't an IV filter; use `iv:90-100`, `iv:>=90` or `iv:<=10`")
+            # Only the rare IV bands are indexed, so other ranges would scan the whole guild
+            if low < RARE_IV_HIGH and high > RARE_IV_LOW:
+                raise ValueError(f"`{token}` is outside the rare IV bands; history can filter on ≥{RARE_IV_HIGH}% or ≤{RARE_IV_LOW}%")
+            summary.append(f"IV: {value}")
+        else:
+            raise ValueError(f"Unknown filter `{token}`")
+
+    return query, summary
+
+
+def after_cursor(cursor):
+    """Query clause for events strictly older than a (created_at, _id) cursor"""
+    created_at, event_id = cursor
+    # The plain range on created_at keeps the index scan bounded; $or settles ties on _id
+    return {
+        'created_at': {'$lte': created_at},
+        '$or': [
+            {'created_at': {'$lt': created_at}},
+            {'created_at': created_at, '_id': {'$lt': event_id}}
+        ]
+    }
+
+
+class History(commands.Cog):
+    """Starboard history and leaderboards served from MongoDB"""
+
+    PAGE_SIZE = 10
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.leaderboards = get_leaderboards(bot)
+
+    @property
+    def db(self):
+        """Get database from main module"""
+        import __main__
+        return getattr(__main__, 'db', None)
+
+    async def fetch_history_page(self, query, cursor=None):
+        """Return one page of events newest first, plus whether another page follows
+
+        Pages resume from the last event's (created_at, _id) rather than skipping, so every page
+        is a bounded walk along the guild's index however deep into the history it is.
+        """
+        if cursor is not None:
+            query = {'$and': [query, after_cursor(cursor)]}
+
+        events = await self.db.starboard_events.find(query, HISTORY_PROJECTION).sort(
+            [('created_at', -1), ('_id', -1)]
+        ).limit(self.PAGE_SIZE + 1).to_list(length=self.PAGE_SIZE + 1)
+
+        return events[:self.PAGE_SIZE], len(events) > self.PAGE_SIZE
+
+    class HistoryPaginationView(discord.ui.View):
+        def __init__(self, cog, guild_id, query, summary, user_id, events, has_next, cursors=None):
+            super().__init__(timeout=60)
+            self.cog = cog
+            self.guild_id = guild_id
+            self.query = query
+            self.summary = summary
+            self.user_id = user_id
+            self.events = events
+            self.has_next = has_next
+            # Cursor each page was fetched from; the first page has none
+            self.cursors = cursors or [None]
+
+            # Add navigation buttons if needed
+            if self.has_next or len(self.cursors) > 1:
+                self.add_navigation_buttons()
+
+        @property
+        def current_page(self):
+            return len(self.cursors) - 1
+
+        def add_navigation_buttons(self):
+            # Previous button
+            prev_button = discord.ui.Button(
+                label="◀ Previous",
+                style=discord.ButtonStyle.secondary,
+                disabled=self.current_page == 0
+            )
+            prev_button.callback = self.previous_page
+            self.add_item(prev_button)
+
+            # Page indicator
+            page_info = discord.ui.Button(
+                label=f"Page {self.current_page + 1}",
+                style=discord.ButtonStyle.secondary,
+                disabled=True
+            )
+            self.add_item(page_info)
+
+            # Next button
+            next_button = discord.ui.Button(
+                label="Next ▶",
+                style=discord.ButtonStyle.secondary,
+                disabled=not self.has_next
+            )
+            next_button.callback = self.next_page
+            self.add_item(next_button)
+
+        def create_embed(self):
+            embed = discord.Embed(
+                title=f"📜 Starboard History (Page {self.current_page + 1})",
+                description=" | ".join(self.summary) if self.summary else None,
+                color=EMBED_COLOR
+            )
+
+            for event in self.events:
+                name = event['species']
+                if event.get('gigantamax'):
+                    name = f"{GIGANTAMAX_EMOJI} {name}"
+                if event.get('shiny'):
+                    name = f"✨ {name}"
+
+                event_label = EVENT_TYPE_LABELS.get(event.get('type'), "Event")
+                if event.get('user_id'):
+                    event_label = f"{event_label} by <@{event['user_id']}>"
+
+                iv = event.get('iv')
+                iv_display = format_iv(f"{iv:.2f}" if iv is not None else "Hidden")
+
+                # MongoDB hands datetimes back without a timezone; they are UTC
+                created_at = event['created_at'].replace(tzinfo=timezone.utc)
+                when = f"<t:{int(created_at.timestamp())}:R>"
+                if event.get('message_id') and event.get('channel_id'):
+                    when += f" • [Jump](https://discord.com/channels/{self.guild_id}/{event['channel_id']}/{event['message_id']})"
+
+                embed.add_field(
+                    name=name,
+                    value=f"{event_label}\nLevel {event.get('level') or '?'} • IV {iv_display}\n{when}",
+                    inline=True
+                )
+
+            embed.set_footer(text=f"Showing {len(self.events)} events, newest first")
+            return embed
+
+        async def show_page(self, interaction, cursors):
+            try:
+                events, has_next = await self.cog.fetch_history_page(self.query, cursors[-1])
+            except Exception as e:
+                print(f"Error fetching starboard history: {e}")
+                await interaction.response.send_message(f"Database error: {str(e)[:100]}", ephemeral=True)
+                return
+
+            new_view = History.HistoryPaginationView(
+                self.cog,
+                self.guild_id,
+                self.query,
+                self.summary,
+                self.user_id,
+                events,
+                has_next,
+                cursors
+            )
+            await interaction.response.edit_message(embed=new_view.create_embed(), view=new_view)
+
+        async def previous_page(self, interaction):
+            if interaction.user.id != self.user_id:
+                await interaction.response.send_message("❌ This is not your list.", ephemeral=True)
+                return
+
+            await self.show_page(interaction, self.cursors[:-1] or [None])
+
+        async def next_page(self, interaction):
+            if interaction.user.id != self.user_id:
+                await interaction.response.send_message("❌ This is not your list.", ephemeral=True)
+                return
+
+            last_event = self.events[-1]
+            await self.show_page(interaction, self.cursors + [(last_event['created_at'], last_event['_id'])])
+
+        async def on_timeout(self):
+            # Disable all buttons when timeout occurs
+            for item in self.children:
+                item.disabled = True
+
+    @commands.command(name="starboard-history", aliases=["sbhistory"])
+    @commands.guild_only()
+    async def starboard_history_command(self, ctx, *, filters=None):
+        """Browse this server's starboard events, e.g. `starboard-history user:@someone species:pikachu shiny gmax iv:>=90`"""
+        if self.db is None:
+            await ctx.reply("Database not available")
+            return
+
+        try:
+            query, summary = parse_history_filters(filters)
+        except ValueError as e:
+            await ctx.reply(f"❌ {e}")
+            return
+
+        query['guild_id'] = ctx.guild.id
+
+        try:
+            events, has_next = await self.fetch_history_page(query)
+        except Exception as e:
+            print(f"Error fetching starboard history: {e}")
+            await ctx.reply(f"Database error: {str(e)[:100]}")
+            return
+
+        if not events:
+            await ctx.reply("No starboard events match those filters.")
+            return
+
+        view = self.HistoryPaginationView(self, ctx.guild.id, query, summary, ctx.author.id, events, has_next)
+        await ctx.reply(embed=view.create_embed(), view=view if view.children else None, mention_author=False)
+
+    @commands.command(name="leaderboard", aliases=["lb"])
+    @commands.guild_only()
+    async def leaderboard_command(self, ctx, board="shiny", scope=None):
+        """Show the top shiny, Gigantamax or rare IV finders, e.g. `leaderboard gmax` or `leaderboard iv global`"""
+        if self.db is None:
+            await ctx.reply("Database not available")
+            return
+
+        if board.lower() not in LEADERBOARD_NAMES or (scope and scope.lower() != 'global'):
+            await ctx.reply("❌ Usage: `leaderboard <shiny|gmax|iv> [global]`")
+            return
+
+        category, title = LEADERBOARD_NAMES[board.lower()]
+        is_global = scope is not None
+
+        try:
+            entries = await self.leaderboards.top(self.db, GLOBAL_SCOPE if is_global else ctx.guild.id, category)
+        except Exception as e:
+            print(f"Error fetching leaderboard: {e}")
+            await ctx.reply(f"Database error: {str(e)[:100]}")
+            return
+
+        embed = discord.Embed(
+            title=f"{title} ({'Global' if is_global else ctx.guild.name})",
+            color=EMBED_COLOR
+        )
+        if entries:
+            embed.description = "\n".join(
+                f"**{rank}.** <@{user_id}> — {count}" for rank, (user_id, count) in enumerate(entries, start=1)
+            )
+        else:
+            embed.description = "Nobody is on this leaderboard yet."
+
+        await ctx.reply(embed=embed, mention_author=False)
+
+
+async def setup(bot):
+    await bot.add_cog(History(bot))
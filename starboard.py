@@ -1,15 +1,49 @@
 import discord
 import re
-import json
-import os
 from datetime import datetime
 from discord.ext import commands
 from config import EMBED_COLOR
+from .core.sprites import get_sprite_catalog
+from .core.settings_cache import get_settings_cache
+from .core.resolver import get_message_resolver
+from .core.dispatch import CATCH, MISSINGNO, POKETWO_ID, get_dispatcher
+from .core.dedupe import get_post_dedupe
+from .core.embed_templates import GENDER_EMOJIS, format_pokemon, jump_view, render_embed
+from .core.events import build_event, get_event_store
+from .core.leaderboards import get_leaderboards
+from .core.outbound import (ALREADY_POSTED, DROPPED, NO_STARBOARD, NOT_QUALIFYING, NOT_SENT_REASONS, QUEUED,
+                            get_post_queue, post_priority, starboard_targets)
+
+# Precompiled Poketwo catch patterns, shared by every parse
+CATCH_PATTERN = re.compile(r"Congratulations <@!?(\d+)>! You caught a Level (\d+) (.+?)(?:\s+\((\d+\.?\d*)%\))?!")
+GENDER_EMOJI_PATTERN = re.compile(r"<:(male|female|unknown):\d+>")
+GENDERS = ('male', 'female', 'unknown')
+GENDER_EMOJI_PATTERNS = {gender: re.compile(rf"<:{gender}:\d+>") for gender in GENDERS}
+SHINY_CHAIN_PATTERN = re.compile(r"Shiny streak reset\. \(\*\*(\d+)\*\*\)")
+SHINY_NOTICE = "These colors seem unusual... ✨"
+GIGANTAMAX_NOTICE = "Woah! It seems that this pokémon has the Gigantamax Factor..."
 
 class Starboard(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.pokemon_data = self.load_pokemon_data()
+        self.sprites = get_sprite_catalog(bot)
+        self.settings = get_settings_cache(bot)
+        self.post_queue = get_post_queue(bot)
+        self.dedupe = get_post_dedupe(bot)
+        self.events = get_event_store(bot)
+        self.leaderboards = get_leaderboards(bot)
+        self.resolver = get_message_resolver(bot)
+        self.dispatcher = get_dispatcher(bot)
+        self.dispatcher.register(MISSINGNO, self.handle_missingno_message)
+        self.dispatcher.register(CATCH, self.handle_catch_message)
+
+    async def cog_unload(self):
+        self.dispatcher.unregister(MISSINGNO, self.handle_missingno_message)
+        self.dispatcher.unregister(CATCH, self.handle_catch_message)
+        # Let posts and events this cog already queued go out before it disappears
+        await self.post_queue.drain(owner=self.qualified_name)
+        await self.events.flush()
+        await self.leaderboards.flush()
 
     @property
     def db(self):
@@ -17,111 +51,13 @@ class Starboard(commands.Cog):
         import __main__
         return getattr(__main__, 'db', None)
 
-    def load_pokemon_data(self):
-        """Load Pokemon data from starboard.txt file"""
-        try:
-            # Try to load from the same directory as the cog
-            starboard_file = os.path.join(os.path.dirname(__file__), '..', 'starboard.txt')
-            if not os.path.exists(starboard_file):
-                # Fallback to current directory
-                starboard_file = 'starboard.txt'
-
-            with open(starboard_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return data
-        except Exception as e:
-            print(f"Error loading Pokemon data: {e}")
-            return {}
-
     def get_gender_emoji(self, gender):
         """Get gender emoji based on gender"""
-        if gender == 'male':
-            return "<:male:1420708128785170453>"
-        elif gender == 'female':
-            return "<:female:1420708136943095889>"
-        elif gender == 'unknown':
-            return "<:unknown:1420708112310210560>"
-        else:
-            return ""
+        return GENDER_EMOJIS.get(gender, "")
 
     def find_pokemon_image_url(self, pokemon_name, is_shiny=False, gender=None, is_gigantamax=False):
         """Find Pokemon image URL from the loaded data with gender and Gigantamax support"""
-        # Normalize the pokemon name for matching
-        normalized_name = pokemon_name.strip().lower()
-
-        # Special case for Eternatus - use "eternamax" instead of "gigantamax" when it has gigantamax factor
-        if is_gigantamax and normalized_name == "eternatus":
-            # Search for Eternamax variant
-            eternamax_name = "eternamax eternatus"
-
-            for key, value in self.pokemon_data.items():
-                if key.startswith('variant_') and 'eternamax' in key.lower():
-                    pokemon_display_name = value.get('name', '').lower()
-                    if eternamax_name == pokemon_display_name:
-                        base_url = value.get('image_url', '')
-                        if is_shiny and base_url:
-                            # Replace 'images' with 'shiny' for shiny Eternamax
-                            return base_url.replace('/images/', '/shiny/')
-                        return base_url
-
-        # If it's Gigantamax (but not Eternatus), search for Gigantamax variant first
-        elif is_gigantamax:
-            # First try to find Gigantamax variant
-            gigantamax_name = f"gigantamax {normalized_name}"
-
-            for key, value in self.pokemon_data.items():
-                if key.startswith('variant_') and 'gigantamax' in key.lower():
-                    pokemon_display_name = value.get('name', '').lower()
-                    if gigantamax_name == pokemon_display_name:
-                        base_url = value.get('image_url', '')
-                        if is_shiny and base_url:
-                            # Replace 'images' with 'shiny' for shiny Gigantamax
-                            return base_url.replace('/images/', '/shiny/')
-                        return base_url
-
-        # Function to search for Pokemon with proper female variant handling
-        def search_pokemon(search_name, prefer_female=False):
-            # First, try to find exact match
-            for key, value in self.pokemon_data.items():
-                pokemon_entry_name = value.get('name', '').lower()
-
-                # Handle the case where female variants have "_female" in the name
-                if prefer_female and gender == 'female':
-                    # First try to find female variant
-                    if pokemon_entry_name == f"{search_name}_female":
-                        return value.get('image_url', '')
-
-                # Try exact match with the search name
-                if pokemon_entry_name == search_name:
-                    return value.get('image_url', '')
-
-            # If no exact match, try partial matching
-            for key, value in self.pokemon_data.items():
-                pokemon_entry_name = value.get('name', '').lower()
-
-                # Handle female variants in partial matching
-                if prefer_female and gender == 'female':
-                    if f"{search_name}_female" in pokemon_entry_name or pokemon_entry_name in f"{search_name}_female":
-                        return value.get('image_url', '')
-
-                # Regular partial matching
-                if search_name in pokemon_entry_name or pokemon_entry_name in search_name:
-                    return value.get('image_url', '')
-
-            return None
-
-        # Search for Pokemon image URL
-        base_url = search_pokemon(normalized_name, prefer_female=True)
-
-        # If female variant not found and we were looking for female, try the base name
-        if base_url is None and gender == 'female':
-            base_url = search_pokemon(normalized_name, prefer_female=False)
-
-        if base_url and is_shiny:
-            # Replace 'images' with 'shiny' for shiny Pokemon
-            return base_url.replace('/images/', '/shiny/')
-
-        return base_url
+        return self.sprites.find(pokemon_name, is_shiny, gender, is_gigantamax)
 
     async def set_starboard_channel(self, guild_id, channel_id):
         """Set the starboard channel for a guild"""
@@ -134,6 +70,7 @@ class Starboard(commands.Cog):
                 {"$set": {"starboard_channel_id": channel_id}},
                 upsert=True
             )
+            self.settings.invalidate_guild(guild_id)
             return "Starboard channel set successfully!"
         except Exception as e:
             print(f"Error setting starboard channel: {e}")
@@ -150,6 +87,7 @@ class Starboard(commands.Cog):
                 {"$set": {"global_starboard_channel_id": channel_id}},
                 upsert=True
             )
+            self.settings.invalidate_global()
             return "Global starboard channel set successfully!"
         except Exception as e:
             print(f"Error setting global starboard channel: {e}")
@@ -161,7 +99,7 @@ class Starboard(commands.Cog):
             return None
 
         try:
-            guild_settings = await self.db.guild_settings.find_one({"guild_id": guild_id})
+            guild_settings = await self.settings.get_guild_settings(self.db, guild_id)
             if guild_settings:
                 return guild_settings.get('starboard_channel_id')
         except Exception as e:
@@ -174,7 +112,7 @@ class Starboard(commands.Cog):
             return None
 
         try:
-            global_settings = await self.db.global_settings.find_one({"_id": "starboard"})
+            global_settings = await self.settings.get_global_settings(self.db)
             if global_settings:
                 return global_settings.get('global_starboard_channel_id')
         except Exception as e:
@@ -187,7 +125,7 @@ class Starboard(commands.Cog):
             return None, None, None
 
         try:
-            guild_settings = await self.db.guild_settings.find_one({"guild_id": guild_id})
+            guild_settings = await self.settings.get_guild_settings(self.db, guild_id)
             if guild_settings:
                 return (
                     guild_settings.get('rare_role_id'),
@@ -200,56 +138,39 @@ class Starboard(commands.Cog):
 
     def parse_poketwo_catch_message(self, message_content):
         """Parse Poketwo catch message to extract relevant information"""
-        # Updated pattern to properly capture everything including gender emoji
-        catch_pattern = r"Congratulations <@!?(\d+)>! You caught a Level (\d+) (.+?)(?:\s+\((\d+\.?\d*)%\))?!"
-
-        match = re.search(catch_pattern, message_content)
+        match = CATCH_PATTERN.search(message_content)
         if not match:
             return None
 
-        user_id = match.group(1)
-        level = match.group(2)
-        pokemon_name_with_gender = match.group(3).strip()
-        iv_str = match.group(4)  # This could be None if IV is hidden
+        user_id, level, pokemon_name_with_gender, iv_str = match.groups()
+        pokemon_name_with_gender = pokemon_name_with_gender.strip()
 
         # Handle IV - if not present, it's hidden
-        if iv_str:
-            # Keep the original string format to preserve trailing zeros
-            iv = iv_str
-        else:
-            iv = "Hidden"
+        # Keep the original string format to preserve trailing zeros
+        iv = iv_str if iv_str else "Hidden"
 
-        # Extract gender from emoji - check the entire message content for gender emojis
+        # One scan for every gender emoji; male wins over female over unknown as before
+        genders_found = GENDER_EMOJI_PATTERN.findall(message_content)
         gender = None
         pokemon_name = pokemon_name_with_gender
-
-        # First, let's check the full message content for gender emojis
-        if re.search(r'<:male:\d+>', message_content):
-            gender = 'male'
-            # Remove gender emoji from pokemon name if it's there
-            pokemon_name = re.sub(r'<:male:\d+>', '', pokemon_name_with_gender).strip()
-        elif re.search(r'<:female:\d+>', message_content):
-            gender = 'female'
-            # Remove gender emoji from pokemon name if it's there
-            pokemon_name = re.sub(r'<:female:\d+>', '', pokemon_name_with_gender).strip()
-        elif re.search(r'<:unknown:\d+>', message_content):
-            gender = 'unknown'
-            # Remove gender emoji from pokemon name if it's there
-            pokemon_name = re.sub(r'<:unknown:\d+>', '', pokemon_name_with_gender).strip()
-
-
-        # Check for shiny
-        is_shiny = "These colors seem unusual... ✨" in message_content
-
-        # Check for gigantamax
-        is_gigantamax = "Woah! It seems that this pokémon has the Gigantamax Factor..." in message_content
-
-        # Check for shiny streak reset
+        for candidate in GENDERS:
+            if candidate in genders_found:
+                gender = candidate
+                # Remove gender emoji from pokemon name if it's there
+                if '<:' in pokemon_name_with_gender:
+                    pokemon_name = GENDER_EMOJI_PATTERNS[candidate].sub('', pokemon_name_with_gender).strip()
+                break
+
+        # Check for shiny and gigantamax
+        is_shiny = SHINY_NOTICE in message_content
+        is_gigantamax = GIGANTAMAX_NOTICE in message_content
+
+        # Check for shiny streak reset, only running the regex when the notice is present
         shiny_chain = None
-        chain_pattern = r"Shiny streak reset\. \(\*\*(\d+)\*\*\)"
-        chain_match = re.search(chain_pattern, message_content)
-        if chain_match:
-            shiny_chain = chain_match.group(1)
+        if "Shiny streak reset" in message_content:
+            chain_match = SHINY_CHAIN_PATTERN.search(message_content)
+            if chain_match:
+                shiny_chain = chain_match.group(1)
 
         return {
             'user_id': user_id,
@@ -306,211 +227,59 @@ class Starboard(commands.Cog):
         """Create embed for catch messages with combined criteria"""
         message_type = catch_data.get('message_type', 'catch')
         pokemon_name = catch_data['pokemon_name']
-        level = catch_data['level']
-        iv = catch_data['iv']
         is_shiny = catch_data['is_shiny']
         is_gigantamax = catch_data['is_gigantamax']
         gender = catch_data.get('gender')
-
-        # Format IV display
-        if iv == "Hidden":
-            iv_display = "Hidden"
-        elif iv == "???":
-            iv_display = "???"
-        else:
-            iv_display = f"{iv}%"
-
-        # Get gender emoji
-        gender_emoji = self.get_gender_emoji(gender)
+        is_eternatus = pokemon_name.lower() == "eternatus"
 
         # Special handling for Eternatus with Gigantamax factor
         display_pokemon_name = pokemon_name
-        if is_gigantamax and pokemon_name.lower() == "eternatus":
-            display_pokemon_name = "Eternamax Eternatus"
-        elif is_gigantamax:
-            display_pokemon_name = f"Gigantamax {pokemon_name}"
-
-        # Format Pokemon name with gender emoji - always include if we have gender info
-        if gender_emoji:
-            pokemon_display = f"{display_pokemon_name} {gender_emoji}"
-        else:
-            pokemon_display = display_pokemon_name
-
-        # Get Pokemon image URL with gender and Gigantamax support
-        image_url = self.find_pokemon_image_url(pokemon_name, is_shiny, gender, is_gigantamax)
-
-        embed = discord.Embed(color=EMBED_COLOR, timestamp=datetime.utcnow())
-
-        if message_type == 'catch':
-            user_id = catch_data['user_id']
-            shiny_chain = catch_data.get('shiny_chain')
-
-            # Determine embed type and title based on all combinations
-            if embed_type == 'shiny_gigantamax_rare_iv_high':
-                # Triple combo - Shiny + Gigantamax + High IV
-                if pokemon_name.lower() == "eternatus":
-                    embed.title = "✨ <:gigantamax:1420708122267226202> 📈 Shiny Eternamax High IV Catch Detected 📈 <:gigantamax:1420708122267226202> ✨"
-                else:
-                    embed.title = "✨ <:gigantamax:1420708122267226202> 📈 Shiny Gmax High IV Catch Detected 📈 <:gigantamax:1420708122267226202> ✨"
-
-            elif embed_type == 'shiny_gigantamax_rare_iv_low':
-                # Triple combo - Shiny + Gigantamax + Low IV
-                if pokemon_name.lower() == "eternatus":
-                    embed.title = "✨ <:gigantamax:1420708122267226202> 📉 Shiny Eternamax Low IV Catch Detected 📉 <:gigantamax:1420708122267226202> ✨"
-                else:
-                    embed.title = "✨ <:gigantamax:1420708122267226202> 📉 Shiny Gmax Low IV Catch Detected 📉 <:gigantamax:1420708122267226202> ✨"
-
-            elif embed_type == 'shiny_gigantamax':
-                # Shiny + Gigantamax
-                if pokemon_name.lower() == "eternatus":
-                    embed.title = "✨ <:gigantamax:1420708122267226202> Shiny Eternamax Catch Detected <:gigantamax:1420708122267226202> ✨"
-                else:
-                    embed.title = "✨ <:gigantamax:1420708122267226202> Shiny Gigantamax Catch Detected <:gigantamax:1420708122267226202> ✨"
-
-            elif embed_type == 'shiny_rare_iv_high':
-                # Shiny + High IV
-                embed.title = "✨ 📈 Shiny High IV Catch Detected 📈 ✨"
-
-            elif embed_type == 'shiny_rare_iv_low':
-                # Shiny + Low IV
-                embed.title = "✨ 📉 Shiny Low IV Catch Detected 📉 ✨"
-
-            elif embed_type == 'gigantamax_rare_iv_high':
-                # Gigantamax + High IV
-                if pokemon_name.lower() == "eternatus":
-                    embed.title = "<:gigantamax:1420708122267226202> 📈 Eternamax High IV Catch Detected 📈 <:gigantamax:1420708122267226202>"
-                else:
-                    embed.title = "<:gigantamax:1420708122267226202> 📈 Gigantamax High IV Catch Detected 📈 <:gigantamax:1420708122267226202>"
-
-            elif embed_type == 'gigantamax_rare_iv_low':
-                # Gigantamax + Low IV
-                if pokemon_name.lower() == "eternatus":
-                    embed.title = "<:gigantamax:1420708122267226202> 📉 Eternamax Low IV Catch Detected 📉 <:gigantamax:1420708122267226202>"
-                else:
-                    embed.title = "<:gigantamax:1420708122267226202> 📉 Gigantamax Low IV Catch Detected 📉 <:gigantamax:1420708122267226202>"
-
-            elif embed_type == 'gigantamax':
-                # Gigantamax only
-                if pokemon_name.lower() == "eternatus":
-                    embed.title = "<:gigantamax:1420708122267226202> Eternamax Catch Detected <:gigantamax:1420708122267226202>"
-                else:
-                    embed.title = "<:gigantamax:1420708122267226202> Gigantamax Catch Detected <:gigantamax:1420708122267226202>"
-
-            elif embed_type == 'shiny':
-                # Shiny only
-                embed.title = "✨ Shiny Catch Detected ✨"
-
-            elif embed_type == 'iv_high':
-                # High IV only
-                embed.title = "📈 High IV Catch Detected 📈"
-
-            elif embed_type == 'iv_low':
-                # Low IV only
-                embed.title = "📉 Low IV Catch Detected 📉"
-
-            # Standard description for all catch types
-            embed.description = f"**Caught By:** <@{user_id}>\n**Pokémon:** {pokemon_display}\n**Level:** {level}\n**IV:** {iv_display}"
-            if shiny_chain:
-                embed.description += f"\n**Chain:** {shiny_chain}"
-
-        elif message_type == 'missingno':
-            user_id = catch_data['user_id']
-
-            # Handle shiny MissingNo.
-            if is_shiny:
-                embed.title = "✨ Shiny MissingNo. Detected ✨"
-            else:
-                embed.title = "<:missingno:1420713960465760357> MissingNo. Detected <:missingno:1420713960465760357>"
+        if is_gigantamax:
+            display_pokemon_name = "Eternamax Eternatus" if is_eternatus else f"Gigantamax {pokemon_name}"
 
-            embed.description = f"**Caught By:** <@{user_id}>\n**Pokémon:** {pokemon_display}\n**Level:** ???\n**IV:** {iv_display}"
-
-        if image_url:
-            embed.set_thumbnail(url=image_url)
+        # Shiny MissingNo. has its own title
+        if message_type == 'missingno':
+            embed_type = 'shiny' if is_shiny else 'missingno'
+
+        embed = render_embed(
+            message_type, embed_type, is_eternatus,
+            format_pokemon(display_pokemon_name, gender),
+            catch_data['level'],
+            catch_data['iv'],
+            user_id=catch_data['user_id'],
+            image_url=self.find_pokemon_image_url(pokemon_name, is_shiny, gender, is_gigantamax)
+        )
 
-        # Create view with jump to message button
-        view = discord.ui.View()
-        if message:
-            jump_button = discord.ui.Button(
-                label="Jump to Message",
-                url=message.jump_url,
-                emoji="🔗",
-                style=discord.ButtonStyle.link
-            )
-            view.add_item(jump_button)
+        shiny_chain = catch_data.get('shiny_chain')
+        if message_type == 'catch' and shiny_chain:
+            embed.description += f"\n**Chain:** {shiny_chain}"
 
-        return embed, view
+        return embed, jump_view(message)
 
-    async def send_to_starboard_channels(self, guild, catch_data, original_message=None):
-        """Send catch data to appropriate starboard channels with combined criteria"""
+    def determine_embed_type(self, catch_data):
+        """Pick the single combined embed type for a catch, or None if it doesn't qualify"""
         is_shiny = catch_data['is_shiny']
         is_gigantamax = catch_data['is_gigantamax']
         iv = catch_data['iv']
         message_type = catch_data.get('message_type', 'catch')
         pokemon_name = catch_data['pokemon_name']
 
-        # Get server starboard channel
-        server_starboard_id = await self.get_starboard_channel(guild.id)
-        server_starboard_channel = None
-        if server_starboard_id:
-            server_starboard_channel = guild.get_channel(server_starboard_id)
-
-        # Get global starboard channel
-        global_starboard_id = await self.get_global_starboard_channel()
-        global_starboard_channel = None
-        if global_starboard_id:
-            global_starboard_channel = self.bot.get_channel(global_starboard_id)
-
         # Handle MissingNo. - always send regardless of other criteria
         if message_type == 'missingno':
-            embed, view = self.create_catch_embed(catch_data, 'missingno', original_message)
-
-            # Send to server starboard
-            if server_starboard_channel:
-                try:
-                    await server_starboard_channel.send(embed=embed, view=view)
-                except Exception as e:
-                    print(f"Error sending to server starboard: {e}")
-
-            # Send to global starboard
-            if global_starboard_channel:
-                try:
-                    await global_starboard_channel.send(embed=embed, view=view)
-                except Exception as e:
-                    print(f"Error sending to global starboard: {e}")
-            return
+            return 'missingno'
 
         # Handle Eternatus - only shiny and gigantamax criteria, no IV
         if pokemon_name.lower() == "eternatus":
-            embed_type = None
-
             if is_shiny and is_gigantamax:
-                embed_type = 'shiny_gigantamax'
+                return 'shiny_gigantamax'
             elif is_gigantamax:
-                embed_type = 'gigantamax'
+                return 'gigantamax'
             elif is_shiny:
-                embed_type = 'shiny'
-
-            if embed_type:
-                embed, view = self.create_catch_embed(catch_data, embed_type, original_message)
-
-                # Send to server starboard
-                if server_starboard_channel:
-                    try:
-                        await server_starboard_channel.send(embed=embed, view=view)
-                    except Exception as e:
-                        print(f"Error sending to server starboard: {e}")
-
-                # Send to global starboard
-                if global_starboard_channel:
-                    try:
-                        await global_starboard_channel.send(embed=embed, view=view)
-                    except Exception as e:
-                        print(f"Error sending to global starboard: {e}")
-            return
+                return 'shiny'
+            return None
 
         # Handle regular Pokemon with all combinations
         # Check IV criteria first
-        iv_value = None
         iv_type = None
         if iv != "Hidden" and iv != "???":
             try:
@@ -520,68 +289,83 @@ class Starboard(commands.Cog):
                 elif iv_value <= 10:
                     iv_type = 'low'
             except ValueError:
-                iv_value = None
+                pass
 
         # Determine the single embed type based on all combinations
-        embed_type = None
-
         if is_shiny and is_gigantamax and iv_type:
             # Triple combination
-            if iv_type == 'high':
-                embed_type = 'shiny_gigantamax_rare_iv_high'
-            else:  # low
-                embed_type = 'shiny_gigantamax_rare_iv_low'
-
+            return f'shiny_gigantamax_rare_iv_{iv_type}'
         elif is_shiny and is_gigantamax:
             # Shiny + Gigantamax
-            embed_type = 'shiny_gigantamax'
-
+            return 'shiny_gigantamax'
         elif is_shiny and iv_type:
             # Shiny + Rare IV
-            if iv_type == 'high':
-                embed_type = 'shiny_rare_iv_high'
-            else:  # low
-                embed_type = 'shiny_rare_iv_low'
-
+            return f'shiny_rare_iv_{iv_type}'
         elif is_gigantamax and iv_type:
             # Gigantamax + Rare IV
-            if iv_type == 'high':
-                embed_type = 'gigantamax_rare_iv_high'
-            else:  # low
-                embed_type = 'gigantamax_rare_iv_low'
-
+            return f'gigantamax_rare_iv_{iv_type}'
         elif is_shiny:
             # Shiny only
-            embed_type = 'shiny'
-
+            return 'shiny'
         elif is_gigantamax:
             # Gigantamax only
-            embed_type = 'gigantamax'
-
+            return 'gigantamax'
         elif iv_type:
             # Rare IV only
-            if iv_type == 'high':
-                embed_type = 'iv_high'
-            else:  # low
-                embed_type = 'iv_low'
+            return f'iv_{iv_type}'
+        return None
 
-        # Send the single combined embed if any criteria met
-        if embed_type:
-            embed, view = self.create_catch_embed(catch_data, embed_type, original_message)
+    async def send_to_starboard_channels(self, guild, catch_data, original_message=None):
+        """Send catch data to appropriate starboard channels with combined criteria
 
-            # Send to server starboard
-            if server_starboard_channel:
-                try:
-                    await server_starboard_channel.send(embed=embed, view=view)
-                except Exception as e:
-                    print(f"Error sending to server starboard: {e}")
+        Returns what happened to the post: QUEUED, or why nothing was queued.
+        """
+        embed_type = self.determine_embed_type(catch_data)
 
-            # Send to global starboard
-            if global_starboard_channel:
-                try:
-                    await global_starboard_channel.send(embed=embed, view=view)
-                except Exception as e:
-                    print(f"Error sending to global starboard: {e}")
+        # If no criteria met, don't send
+        if embed_type is None:
+            return NOT_QUALIFYING
+
+        # Skip messages the listener or a manual check already posted
+        if original_message is not None and not await self.dedupe.claim(self.db, original_message.id):
+            return ALREADY_POSTED
+
+        # Get server starboard channel
+        server_starboard_id = await self.get_starboard_channel(guild.id)
+        server_starboard_channel = None
+        if server_starboard_id:
+            server_starboard_channel = guild.get_channel(server_starboard_id)
+
+        # Get global starboard channel
+        global_starboard_id = await self.get_global_starboard_channel()
+        global_starboard_channel = None
+        if global_starboard_id:
+            global_starboard_channel = self.bot.get_channel(global_starboard_id)
+
+        result = NO_STARBOARD
+        targets = starboard_targets(server_starboard_channel, global_starboard_channel)
+        if targets:
+            # Queue the single combined embed for both starboards
+            embed, view = self.create_catch_embed(catch_data, embed_type, original_message)
+            accepted = self.post_queue.submit(
+                [(target, channel, {'embed': embed, 'view': view}) for target, channel in targets],
+                post_priority(catch_data),
+                owner=self.qualified_name
+            )
+            result = QUEUED if accepted else DROPPED
+
+        # Pasted text can't be verified or deduplicated, so it is posted but never recorded or counted
+        if original_message is not None:
+            if result == QUEUED:
+                # Recorded together with the claim, so a released claim is never counted twice
+                event = build_event(catch_data, [embed_type], guild.id, catch_data['user_id'], original_message)
+                self.events.record(event)
+                self.leaderboards.record(event, guild.id)
+            else:
+                # Nothing went out; leave it for a later check or backfill
+                await self.dedupe.release(self.db, original_message.id)
+
+        return result
 
     # Update the manualcheck command to work with new system
     @commands.command(name="manualcheck")
@@ -609,29 +393,16 @@ class Starboard(commands.Cog):
             if input_data.strip().isdigit():
                 message_id = int(input_data.strip())
                 try:
-                    # Try to fetch the message from the current channel first
-                    try:
-                        original_message = await ctx.channel.fetch_message(message_id)
-                    except discord.NotFound:
-                        # If not found in current channel, search in all channels in the guild
-                        found_message = None
-                        for channel in ctx.guild.text_channels:
-                            if channel.permissions_for(ctx.guild.me).read_message_history:
-                                try:
-                                    found_message = await channel.fetch_message(message_id)
-                                    original_message = found_message
-                                    break
-                                except (discord.NotFound, discord.Forbidden):
-                                    continue
-
-                        if not found_message:
-                            await ctx.reply(f"❌ Could not find message with ID `{message_id}` in this server.")
-                            return
+                    # Look the message up across the server, starting with this channel
+                    original_message = await self.resolver.resolve(ctx.guild, message_id, ctx.channel)
+                    if original_message is None:
+                        await ctx.reply(f"❌ Could not find message with ID `{message_id}` in this server.")
+                        return
 
                     catch_message = original_message.content
 
                     # Check if the message is from Poketwo
-                    if original_message.author.id != 716390085896962058:
+                    if original_message.author.id != POKETWO_ID:
                         await ctx.reply(f"❌ The message with ID `{message_id}` is not from Poketwo.")
                         return
 
@@ -730,7 +501,10 @@ class Starboard(commands.Cog):
             return
 
         # Send to starboard using the new combined system
-        await self.send_to_starboard_channels(ctx.guild, catch_data, original_message)
+        result = await self.send_to_starboard_channels(ctx.guild, catch_data, original_message)
+        if result != QUEUED:
+            await ctx.reply(f"ℹ️ This {message_type} was not sent: {NOT_SENT_REASONS[result]}.")
+            return
 
         criteria_text = ", ".join(criteria_met)
         # Format IV for success message
@@ -831,6 +605,112 @@ class Starboard(commands.Cog):
         elif isinstance(error, commands.BadArgument):
             await ctx.reply("Invalid channel mention or ID.")
 
+    @commands.command(name="reloadsprites")
+    @commands.is_owner()
+    async def reload_sprites_command(self, ctx):
+        """Reload starboard.txt into the shared sprite catalog (bot owner only)"""
+        entry_count = self.sprites.reload()
+        if entry_count is None:
+            await ctx.reply("❌ Could not load starboard.txt, keeping the current sprite catalog.")
+            return
+
+        await ctx.reply(f"✅ Sprite catalog reloaded with {entry_count} entries.")
+
+    @reload_sprites_command.error
+    async def reload_sprites_error(self, ctx, error):
+        if isinstance(error, commands.NotOwner):
+            await ctx.reply("Only the bot owner can use this command.")
+
+    @commands.command(name="starboardstats")
+    @commands.is_owner()
+    async def starboard_stats_command(self, ctx):
+        """Show message dispatch, cache, queue, dedupe, event store and lookup counters (bot owner only)"""
+        dispatch_stats = self.dispatcher.stats()
+        cache_stats = self.settings.stats()
+        queue_stats = self.post_queue.stats()
+        dedupe_stats = self.dedupe.stats()
+        event_stats = self.events.stats()
+        resolver_stats = self.resolver.stats()
+        recent_stats = self.resolver.recent.stats()
+
+        embed = discord.Embed(
+            title="Starboard Pipeline Stats",
+            color=EMBED_COLOR,
+            timestamp=datetime.utcnow()
+        )
+
+        # Poketwo messages by class
+        dispatch_lines = [
+            f"{message_class.capitalize()}: {dispatch_stats[message_class]}"
+            for message_class in ('catch', 'missingno', 'hatch', 'box', 'irrelevant', 'unhandled')
+        ]
+        dispatch_lines.append(f"Discarded early: {dispatch_stats['discarded_ratio']:.1%} of {dispatch_stats['total']}")
+        embed.add_field(name="Message Dispatch", value="\n".join(dispatch_lines), inline=True)
+
+        # Settings lookups served from memory vs MongoDB
+        embed.add_field(
+            name="Settings Cache",
+            value=f"Hits: {cache_stats['hits']}\n"
+                  f"Misses: {cache_stats['misses']}\n"
+                  f"Hit ratio: {cache_stats['hit_ratio']:.1%}\n"
+                  f"Entries: {cache_stats['entries']}",
+            inline=True
+        )
+
+        # Outbound posts waiting on per-channel rate limits
+        embed.add_field(
+            name="Outbound Queue",
+            value=f"Pending: {queue_stats['pending']} (peak {queue_stats['pending_high_water']}/{queue_stats['max_pending']})\n"
+                  f"Sent: {queue_stats.get('sent', 0)}\n"
+                  f"Failed: {queue_stats.get('failed', 0)}\n"
+                  f"Dropped: {queue_stats.get('dropped', 0)}\n"
+                  f"Throttled: {queue_stats.get('throttled', 0)}\n"
+                  f"Longest wait: {queue_stats['max_wait']:.1f}s",
+            inline=True
+        )
+
+        # Posts skipped because they were already made
+        embed.add_field(
+            name="Post Dedupe",
+            value=f"Claimed: {dedupe_stats.get('claimed', 0)}\n"
+                  f"Duplicates: {dedupe_stats.get('duplicates', 0)} ({dedupe_stats.get('persisted_duplicates', 0)} from MongoDB)\n"
+                  f"Entries: {dedupe_stats['entries']}/{dedupe_stats['max_entries']}\n"
+                  f"Persist errors: {dedupe_stats.get('persist_errors', 0)}",
+            inline=True
+        )
+
+        # Events waiting for, or already in, starboard_events
+        embed.add_field(
+            name="Event Store",
+            value=f"Recorded: {event_stats.get('recorded', 0)}\n"
+                  f"Written: {event_stats.get('written', 0)} in {event_stats.get('batches', 0)} batches\n"
+                  f"Buffered: {event_stats['buffered']}\n"
+                  f"Failed batches: {event_stats.get('failed_batches', 0)}\n"
+                  f"Rejected: {event_stats.get('rejected', 0)}, dropped: {event_stats.get('dropped', 0)}",
+            inline=True
+        )
+
+        # Manual check lookups by message ID
+        embed.add_field(
+            name="Message Lookup",
+            value=f"Lookups: {resolver_stats.get('lookups', 0)} (avg {resolver_stats['average_lookup']:.2f}s)\n"
+                  f"Buffer hits: {resolver_stats.get('buffer_hits', 0)} ({recent_stats['messages']} buffered)\n"
+                  f"Reply authors found locally: {recent_stats['reply_hit_rate']:.0%} "
+                  f"({recent_stats.get('reply_misses', 0)} fetched)\n"
+                  f"Remembered hits: {resolver_stats.get('seen_hits', 0)}\n"
+                  f"Same channel hits: {resolver_stats.get('direct_hits', 0)}\n"
+                  f"Found by probing: {resolver_stats.get('probe_hits', 0)} ({resolver_stats.get('probes', 0)} probes)\n"
+                  f"Not found: {resolver_stats.get('not_found', 0)}",
+            inline=True
+        )
+
+        await ctx.send(embed=embed)
+
+    @starboard_stats_command.error
+    async def starboard_stats_error(self, ctx, error):
+        if isinstance(error, commands.NotOwner):
+            await ctx.reply("Only the bot owner can use this command.")
+
     @commands.command(name="serverpage")
     async def serverpage_command(self, ctx):
         """Show server settings including rare role, regional role, and starboard channel"""
@@ -864,22 +744,17 @@ class Starboard(commands.Cog):
         await ctx.send(embed=embed)
 
 
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        """Listen for Poketwo catch messages"""
-        # Only process messages from Poketwo
-        if message.author.id != 716390085896962058:
-            return
-
-        catch_data = None
+    async def handle_missingno_message(self, message):
+        """Handle a Poketwo MissingNo. message routed here by the dispatcher"""
+        catch_data = self.parse_poketwo_missingno_message(message.content)
 
-        # Check for MissingNo. catch (most specific first)
-        if "MissingNo." in message.content:
-            catch_data = self.parse_poketwo_missingno_message(message.content)
+        # MissingNo. always goes to starboard
+        if catch_data:
+            return await self.send_to_starboard_channels(message.guild, catch_data, message)
 
-        # Check if it's a catch message
-        elif message.content.startswith("Congratulations"):
-            catch_data = self.parse_poketwo_catch_message(message.content)
+    async def handle_catch_message(self, message):
+        """Handle a Poketwo catch message routed here by the dispatcher"""
+        catch_data = self.parse_poketwo_catch_message(message.content)
 
         if not catch_data:
             return
@@ -888,23 +763,17 @@ class Starboard(commands.Cog):
         is_shiny = catch_data['is_shiny']
         is_gigantamax = catch_data['is_gigantamax']
         iv = catch_data['iv']
-        message_type = catch_data.get('message_type', 'catch')
 
-        # MissingNo. always goes to starboard
-        if message_type == 'missingno':
-            await self.send_to_starboard_channels(message.guild, catch_data, message)
-        else:
-            # For catches, check criteria
-            # Convert IV string to float for comparison, but keep original string for display
-            iv_value = None
-            if iv != "Hidden" and iv != "???":
-                try:
-                    iv_value = float(iv)
-                except ValueError:
-                    iv_value = None
+        # Convert IV string to float for comparison, but keep original string for display
+        iv_value = None
+        if iv != "Hidden" and iv != "???":
+            try:
+                iv_value = float(iv)
+            except ValueError:
+                iv_value = None
 
-            if is_shiny or is_gigantamax or (iv_value is not None and (iv_value >= 90 or iv_value <= 10)):
-                await self.send_to_starboard_channels(message.guild, catch_data, message)
+        if is_shiny or is_gigantamax or (iv_value is not None and (iv_value >= 90 or iv_value <= 10)):
+            return await self.send_to_starboard_channels(message.guild, catch_data, message)
 
 async def setup(bot):
     await bot.add_cog(Starboard(bot))
@@ -1,15 +1,41 @@
 import discord
 import re
-import json
-import os
-from datetime import datetime
 from discord.ext import commands
-from config import EMBED_COLOR
+from .core.sprites import get_sprite_catalog
+from .core.settings_cache import get_settings_cache
+from .core.recent import get_recent_messages
+from .core.resolver import get_message_resolver
+from .core.dispatch import BOX, POKETWO_ID, get_dispatcher, is_box_opening_title
+from .core.dedupe import get_post_dedupe
+from .core.embed_templates import GENDER_EMOJIS, format_pokemon, jump_view, render_embed
+from .core.events import build_event, get_event_store
+from .core.leaderboards import get_leaderboards
+from .core.outbound import (ALREADY_POSTED, DROPPED, NO_STARBOARD, NOT_QUALIFYING, NOT_SENT_REASONS, QUEUED,
+                            get_post_queue, pack_embeds, post_priority, starboard_targets)
 
 class Unbox(commands.Cog):
+    # Post a box's qualifying embeds together, up to 10 per message, instead of one message each
+    BATCH_EMBEDS = True
+
     def __init__(self, bot):
         self.bot = bot
-        self.pokemon_data = self.load_pokemon_data()
+        self.sprites = get_sprite_catalog(bot)
+        self.settings = get_settings_cache(bot)
+        self.post_queue = get_post_queue(bot)
+        self.dedupe = get_post_dedupe(bot)
+        self.events = get_event_store(bot)
+        self.leaderboards = get_leaderboards(bot)
+        self.recent = get_recent_messages(bot)
+        self.resolver = get_message_resolver(bot)
+        self.dispatcher = get_dispatcher(bot)
+        self.dispatcher.register(BOX, self.handle_box_message)
+
+    async def cog_unload(self):
+        self.dispatcher.unregister(BOX, self.handle_box_message)
+        # Let posts and events this cog already queued go out before it disappears
+        await self.post_queue.drain(owner=self.qualified_name)
+        await self.events.flush()
+        await self.leaderboards.flush()
 
     @property
     def db(self):
@@ -17,96 +43,13 @@ class Unbox(commands.Cog):
         import __main__
         return getattr(__main__, 'db', None)
 
-    def load_pokemon_data(self):
-        """Load Pokemon data from starboard.txt file"""
-        try:
-            # Try to load from the same directory as the cog
-            starboard_file = os.path.join(os.path.dirname(__file__), '..', 'starboard.txt')
-            if not os.path.exists(starboard_file):
-                # Fallback to current directory
-                starboard_file = 'starboard.txt'
-
-            with open(starboard_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return data
-        except Exception as e:
-            print(f"Error loading Pokemon data: {e}")
-            return {}
-
     def get_gender_emoji(self, gender):
         """Get gender emoji based on gender"""
-        if gender == 'male':
-            return "<:male:1420708128785170453>"
-        elif gender == 'female':
-            return "<:female:1420708136943095889>"
-        elif gender == 'unknown':
-            return "<:unknown:1420708112310210560>"
-        else:
-            return ""
+        return GENDER_EMOJIS.get(gender, "")
 
     def find_pokemon_image_url(self, pokemon_name, is_shiny=False, gender=None, is_gigantamax=False):
         """Find Pokemon image URL from the loaded data with gender and Gigantamax support"""
-        # Normalize the pokemon name for matching
-        normalized_name = pokemon_name.strip().lower()
-
-        # If it's Gigantamax, search for Gigantamax variant first
-        if is_gigantamax:
-            # First try to find Gigantamax variant
-            gigantamax_name = f"gigantamax {normalized_name}"
-
-            for key, value in self.pokemon_data.items():
-                if key.startswith('variant_') and 'gigantamax' in key.lower():
-                    pokemon_display_name = value.get('name', '').lower()
-                    if gigantamax_name == pokemon_display_name:
-                        base_url = value.get('image_url', '')
-                        if is_shiny and base_url:
-                            # Replace 'images' with 'shiny' for shiny Gigantamax
-                            return base_url.replace('/images/', '/shiny/')
-                        return base_url
-
-        # Function to search for Pokemon with proper female variant handling
-        def search_pokemon(search_name, prefer_female=False):
-            # First, try to find exact match
-            for key, value in self.pokemon_data.items():
-                pokemon_entry_name = value.get('name', '').lower()
-
-                # Handle the case where female variants have "_female" in the name
-                if prefer_female and gender == 'female':
-                    # First try to find female variant
-                    if pokemon_entry_name == f"{search_name}_female":
-                        return value.get('image_url', '')
-
-                # Try exact match with the search name
-                if pokemon_entry_name == search_name:
-                    return value.get('image_url', '')
-
-            # If no exact match, try partial matching
-            for key, value in self.pokemon_data.items():
-                pokemon_entry_name = value.get('name', '').lower()
-
-                # Handle female variants in partial matching
-                if prefer_female and gender == 'female':
-                    if f"{search_name}_female" in pokemon_entry_name or pokemon_entry_name in f"{search_name}_female":
-                        return value.get('image_url', '')
-
-                # Regular partial matching
-                if search_name in pokemon_entry_name or pokemon_entry_name in search_name:
-                    return value.get('image_url', '')
-
-            return None
-
-        # Search for Pokemon image URL
-        base_url = search_pokemon(normalized_name, prefer_female=True)
-
-        # If female variant not found and we were looking for female, try the base name
-        if base_url is None and gender == 'female':
-            base_url = search_pokemon(normalized_name, prefer_female=False)
-
-        if base_url and is_shiny:
-            # Replace 'images' with 'shiny' for shiny Pokemon
-            return base_url.replace('/images/', '/shiny/')
-
-        return base_url
+        return self.sprites.find(pokemon_name, is_shiny, gender, is_gigantamax)
 
     async def get_starboard_channel(self, guild_id):
         """Get the starboard channel for a guild"""
@@ -114,7 +57,7 @@ class Unbox(commands.Cog):
             return None
 
         try:
-            guild_settings = await self.db.guild_settings.find_one({"guild_id": guild_id})
+            guild_settings = await self.settings.get_guild_settings(self.db, guild_id)
             if guild_settings:
                 return guild_settings.get('starboard_channel_id')
         except Exception as e:
@@ -127,7 +70,7 @@ class Unbox(commands.Cog):
             return None
 
         try:
-            global_settings = await self.db.global_settings.find_one({"_id": "starboard"})
+            global_settings = await self.settings.get_global_settings(self.db)
             if global_settings:
                 return global_settings.get('global_starboard_channel_id')
         except Exception as e:
@@ -139,12 +82,13 @@ class Unbox(commands.Cog):
         if not message.reference:
             return None
 
-        try:
-            # Try cached first
-            if message.reference.resolved:
-                return message.reference.resolved.author.id
+        # Resolved locally when possible: gateway data, then the recent message caches
+        reply_author_id = self.recent.reply_author_id(message)
+        if reply_author_id:
+            return reply_author_id
 
-            # Fetch if not cached
+        try:
+            # Fetch as a last resort
             referenced_message = await message.channel.fetch_message(message.reference.message_id)
             return referenced_message.author.id
 
@@ -228,13 +172,7 @@ class Unbox(commands.Cog):
         pokemon_found = []
 
         # Check if this is a box opening message by looking at title keywords
-        title = embed.title or ""
-
-        # More flexible title checking - includes all bundle types
-        opening_keywords = ['open', 'opening', 'box', 'chest', 'mystery', 'egg', 'eggs', 'bundle', 'puddle', 'rain', 'storm']
-        is_opening_message = any(keyword.lower() in title.lower() for keyword in opening_keywords)
-
-        if not is_opening_message:
+        if not is_box_opening_title(embed.title or ""):
             return []
 
         # Try to extract Pokemon from description first
@@ -255,74 +193,80 @@ class Unbox(commands.Cog):
                     pokemon_data['message_type'] = 'unbox'
                     pokemon_found.append(pokemon_data)
 
+        # Position in the box, so each Pokemon can be told apart when deduplicating posts
+        for box_index, pokemon_data in enumerate(pokemon_found):
+            pokemon_data['box_index'] = box_index
+
         return pokemon_found
 
     def create_unbox_embed(self, pokemon_data, embed_type, message=None):
         """Create embed for unbox"""
         pokemon_name = pokemon_data['pokemon_name']
-        level = pokemon_data['level']
-        iv = pokemon_data['iv']
         is_shiny = pokemon_data['is_shiny']
         is_gigantamax = pokemon_data['is_gigantamax']
         gender = pokemon_data.get('gender')
-        unboxed_by_id = pokemon_data.get('unboxed_by_id')
+        pokemon_display = format_pokemon(pokemon_name, gender)
 
-        # Format IV display
-        iv_display = f"{iv}%"
-
-        # Get gender emoji
-        gender_emoji = self.get_gender_emoji(gender)
+        # Debug print to help troubleshoot
+        print(f"DEBUG: Creating unbox embed - Pokemon: '{pokemon_name}', Gender: '{gender}', Gender Emoji: '{GENDER_EMOJIS.get(gender, '')}', Display: '{pokemon_display}'")
+
+        embed = render_embed(
+            'unbox', embed_type, False,
+            pokemon_display,
+            pokemon_data['level'],
+            pokemon_data['iv'],
+            user_id=pokemon_data.get('unboxed_by_id'),
+            image_url=self.find_pokemon_image_url(pokemon_name, is_shiny, gender, is_gigantamax)
+        )
+        return embed, jump_view(message)
+
+    def determine_embed_types(self, pokemon_data):
+        """List the embed types to post for one unboxed Pokemon; empty if it doesn't qualify"""
+        is_shiny = pokemon_data['is_shiny']
+        is_gigantamax = pokemon_data['is_gigantamax']
+        iv = pokemon_data['iv']
 
-        # Format Pokemon name with gender emoji - always include if we have gender info
-        if gender_emoji:
-            pokemon_display = f"{pokemon_name} {gender_emoji}"
-        else:
-            pokemon_display = pokemon_name
+        embed_types = []
+
+        # Determine what type of unbox this is and create separate embeds for each criteria met
+        if is_gigantamax and is_shiny:
+            # Gigantamax Shiny (very rare) - send one combined embed
+            embed_types.append('gigantamax_shiny')
+        elif is_gigantamax:
+            # Gigantamax only
+            embed_types.append('gigantamax')
+        elif is_shiny:
+            # Shiny only
+            embed_types.append('shiny')
+
+        # Check for rare IV - send separate embed even if Pokemon is already shiny/gigantamax
+        # (unless it's gigantamax + shiny combo which gets special treatment above)
+        if not (is_gigantamax and is_shiny):
+            if iv >= 90:
+                embed_types.append('iv_high')
+            elif iv <= 10:
+                embed_types.append('iv_low')
+
+        return embed_types
 
-        # Debug print to help troubleshoot
-        print(f"DEBUG: Creating unbox embed - Pokemon: '{pokemon_name}', Gender: '{gender}', Gender Emoji: '{gender_emoji}', Display: '{pokemon_display}'")
-
-        # Get Pokemon image URL with gender and Gigantamax support
-        image_url = self.find_pokemon_image_url(pokemon_name, is_shiny, gender, is_gigantamax)
-
-        embed = discord.Embed(color=EMBED_COLOR, timestamp=datetime.utcnow())
-
-        if embed_type == 'gigantamax_shiny':
-            embed.title = "<:gigantamax:1420708122267226202> ✨ Gigantamax Shiny Unbox Detected ✨ <:gigantamax:1420708122267226202>"
-        elif embed_type == 'gigantamax':
-            embed.title = "<:gigantamax:1420708122267226202> Gigantamax Unbox Detected <:gigantamax:1420708122267226202>"
-        elif embed_type == 'shiny':
-            embed.title = "<a:animatedgiftbox:1421047436625055754>  ✨ Shiny Unbox Detected ✨ <a:animatedgiftbox:1421047436625055754> "
-        elif embed_type == 'iv_high':
-            embed.title = "<:giftbox:1421047453511323658> 📈 High IV Unboxed 📈 <:giftbox:1421047453511323658>"
-        elif embed_type == 'iv_low':
-            embed.title = "<:giftbox:1421047453511323658> 📉 Low IV Unboxed 📉 <:giftbox:1421047453511323658>"
-
-        # Build description
-        base_description = f"**Pokémon:** {pokemon_display}\n**Level:** {level}\n**IV:** {iv_display}"
-        if unboxed_by_id:
-            embed.description = f"**Unboxed By:** <@{unboxed_by_id}>\n{base_description}"
-        else:
-            embed.description = base_description
-
-        if image_url:
-            embed.set_thumbnail(url=image_url)
-
-        # Create view with jump to message button
-        view = discord.ui.View()
-        if message:
-            jump_button = discord.ui.Button(
-                label="Jump to Message",
-                url=message.jump_url,
-                emoji="🔗",
-                style=discord.ButtonStyle.link
+    async def send_to_starboard_channels(self, guild, pokemon_list, original_message=None):
+        """Send unbox data to appropriate starboard channels; returns QUEUED, or why nothing was queued"""
+        # Skip Pokemon from this box that the listener or a manual check already posted
+        if original_message is not None:
+            claimed = await self.dedupe.claim_many(
+                self.db, original_message.id, [pokemon_data.get('box_index', 0) for pokemon_data in pokemon_list]
             )
-            view.add_item(jump_button)
+            if not claimed:
+                return ALREADY_POSTED
+            pokemon_list = [pokemon_data for pokemon_data in pokemon_list if pokemon_data.get('box_index', 0) in claimed]
 
-        return embed, view
+        # Work out each Pokemon's embed types once
+        qualifying = []
+        for pokemon_data in pokemon_list:
+            embed_types = self.determine_embed_types(pokemon_data)
+            if embed_types:
+                qualifying.append((pokemon_data, embed_types))
 
-    async def send_to_starboard_channels(self, guild, pokemon_list, original_message=None):
-        """Send unbox data to appropriate starboard channels"""
         # Get server starboard channel
         server_starboard_id = await self.get_starboard_channel(guild.id)
         server_starboard_channel = None
@@ -335,57 +279,51 @@ class Unbox(commands.Cog):
         if global_starboard_id:
             global_starboard_channel = self.bot.get_channel(global_starboard_id)
 
-        # Process each Pokemon that meets criteria
-        for pokemon_data in pokemon_list:
-            is_shiny = pokemon_data['is_shiny']
-            is_gigantamax = pokemon_data['is_gigantamax']
-            iv = pokemon_data['iv']
-
-            # Check if this Pokemon meets starboard criteria
-            if not (is_shiny or is_gigantamax or iv >= 90 or iv <= 10):
-                continue
-
+        targets = starboard_targets(server_starboard_channel, global_starboard_channel)
+        if not qualifying:
+            result = NOT_QUALIFYING
+        elif not targets:
+            result = NO_STARBOARD
+        else:
+            # Build every embed first, one per criteria met, for each Pokemon that qualifies
             embeds_to_send = []
+            priority = None
+            for pokemon_data, embed_types in qualifying:
+                for embed_type in embed_types:
+                    embeds_to_send.append(self.create_unbox_embed(pokemon_data, embed_type, original_message))
+                pokemon_priority = post_priority(pokemon_data)
+                priority = pokemon_priority if priority is None else min(priority, pokemon_priority)
+
+            # Pack the box into as few messages as possible; every embed shares the same jump button
+            if self.BATCH_EMBEDS:
+                view = embeds_to_send[0][1]
+                messages = [{'embeds': group, 'view': view} for group in pack_embeds([embed for embed, _ in embeds_to_send])]
+            else:
+                messages = [{'embed': embed, 'view': view} for embed, view in embeds_to_send]
+
+            # The whole box goes out at its best Pokemon's priority, so its messages stay in order
+            posts = []
+            for target, channel in targets:
+                for send_kwargs in messages:
+                    posts.append((target, channel, send_kwargs))
+            result = QUEUED if self.post_queue.submit(posts, priority, owner=self.qualified_name) else DROPPED
+
+        # Pasted text can't be verified or deduplicated, so it is posted but never recorded or counted
+        if original_message is not None:
+            if result == QUEUED:
+                # Recorded together with the claims, so a released claim is never counted twice
+                for pokemon_data, embed_types in qualifying:
+                    event = build_event(
+                        pokemon_data, embed_types, guild.id, pokemon_data.get('unboxed_by_id'),
+                        original_message, pokemon_data.get('box_index', 0)
+                    )
+                    self.events.record(event)
+                    self.leaderboards.record(event, guild.id)
+            else:
+                # Nothing went out; leave the box for a later check or backfill
+                await self.dedupe.release(self.db, original_message.id, claimed)
 
-            # Determine what type of unbox this is and create separate embeds for each criteria met
-            if is_gigantamax and is_shiny:
-                # Gigantamax Shiny (very rare) - send one combined embed
-                embed, view = self.create_unbox_embed(pokemon_data, 'gigantamax_shiny', original_message)
-                embeds_to_send.append((embed, view))
-            elif is_gigantamax:
-                # Gigantamax only
-                embed, view = self.create_unbox_embed(pokemon_data, 'gigantamax', original_message)
-                embeds_to_send.append((embed, view))
-            elif is_shiny:
-                # Shiny only
-                embed, view = self.create_unbox_embed(pokemon_data, 'shiny', original_message)
-                embeds_to_send.append((embed, view))
-
-            # Check for rare IV - send separate embed even if Pokemon is already shiny/gigantamax
-            # (unless it's gigantamax + shiny combo which gets special treatment above)
-            if not (is_gigantamax and is_shiny):
-                if iv >= 90:
-                    embed, view = self.create_unbox_embed(pokemon_data, 'iv_high', original_message)
-                    embeds_to_send.append((embed, view))
-                elif iv <= 10:
-                    embed, view = self.create_unbox_embed(pokemon_data, 'iv_low', original_message)
-                    embeds_to_send.append((embed, view))
-
-            # Send each embed separately to server starboard
-            if server_starboard_channel and embeds_to_send:
-                for embed, view in embeds_to_send:
-                    try:
-                        await server_starboard_channel.send(embed=embed, view=view)
-                    except Exception as e:
-                        print(f"Error sending to server starboard: {e}")
-
-            # Send each embed separately to global starboard
-            if global_starboard_channel and embeds_to_send:
-                for embed, view in embeds_to_send:
-                    try:
-                        await global_starboard_channel.send(embed=embed, view=view)
-                    except Exception as e:
-                        print(f"Error sending to global starboard: {e}")
+        return result
 
     @commands.command(name="bcheck")
     @commands.has_permissions(administrator=True)
@@ -418,27 +356,14 @@ class Unbox(commands.Cog):
             if input_data.strip().isdigit():
                 message_id = int(input_data.strip())
                 try:
-                    # Try to fetch the message from the current channel first
-                    try:
-                        original_message = await ctx.channel.fetch_message(message_id)
-                    except discord.NotFound:
-                        # If not found in current channel, search in all channels in the guild
-                        found_message = None
-                        for channel in ctx.guild.text_channels:
-                            if channel.permissions_for(ctx.guild.me).read_message_history:
-                                try:
-                                    found_message = await channel.fetch_message(message_id)
-                                    original_message = found_message
-                                    break
-                                except (discord.NotFound, discord.Forbidden):
-                                    continue
-
-                        if not found_message:
-                            await ctx.reply(f"❌ Could not find message with ID `{message_id}` in this server.")
-                            return
+                    # Look the message up across the server, starting with this channel
+                    original_message = await self.resolver.resolve(ctx.guild, message_id, ctx.channel)
+                    if original_message is None:
+                        await ctx.reply(f"❌ Could not find message with ID `{message_id}` in this server.")
+                        return
 
                     # Check if the message is from Poketwo
-                    if original_message.author.id != 716390085896962058:
+                    if original_message.author.id != POKETWO_ID:
                         await ctx.reply(f"❌ The message with ID `{message_id}` is not from Poketwo.")
                         return
 
@@ -490,7 +415,10 @@ class Unbox(commands.Cog):
             return
 
         # Send to starboard
-        await self.send_to_starboard_channels(ctx.guild, qualifying_pokemon, original_message)
+        result = await self.send_to_starboard_channels(ctx.guild, qualifying_pokemon, original_message)
+        if result != QUEUED:
+            await ctx.reply(f"ℹ️ These Pokemon were not sent: {NOT_SENT_REASONS[result]}.")
+            return
 
         # Create summary of what was sent
         summary_lines = []
@@ -535,27 +463,8 @@ class Unbox(commands.Cog):
             print(f"Unexpected error in boxcheck: {error}")
             await ctx.reply("❌ An unexpected error occurred. Please try again.")
 
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        """Listen for Poketwo box opening messages"""
-        # Only process messages from Poketwo
-        if message.author.id != 716390085896962058:
-            return
-
-        # Check if it's a box opening message (must have embeds)
-        if not message.embeds:
-            return
-
-        embed = message.embeds[0]
-        title = embed.title or ""
-
-        # More flexible title checking for all bundle types and opening formats
-        opening_keywords = ['open', 'opening', 'box', 'chest', 'mystery', 'egg', 'eggs', 'bundle', 'puddle', 'rain', 'storm']
-        is_opening_message = any(keyword.lower() in title.lower() for keyword in opening_keywords)
-
-        if not is_opening_message:
-            return
-
+    async def handle_box_message(self, message):
+        """Handle a Poketwo box opening message routed here by the dispatcher"""
         # Get the user who opened the box from the reply
         unboxed_by_id = await self.get_unboxed_by_user(message)
         pokemon_list = self.parse_poketwo_unbox_message(message, unboxed_by_id)
@@ -575,7 +484,7 @@ class Unbox(commands.Cog):
                 qualifying_pokemon.append(pokemon_data)
 
         if qualifying_pokemon:
-            await self.send_to_starboard_channels(message.guild, qualifying_pokemon, message)
+            return await self.send_to_starboard_channels(message.guild, qualifying_pokemon, message)
 
 async def setup(bot):
     await bot.add_cog(Unbox(bot))